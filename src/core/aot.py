@@ -0,0 +1,88 @@
+"""
+Tradução antecipada (AOT) do segmento .text inteiro para um módulo Python salvo em disco.\n
+A partir do ponto de entrada, `program_source` percorre estaticamente os blocos básicos alcançáveis (destinos de desvios,
+de `jal` e os endereços de retorno das chamadas) e gera um único módulo com a função de cada bloco, no mesmo formato do `BlockEngine`.
+O módulo é identificado pelo hash do conteúdo e do endereço do .text (e da versão do tradutor) e guardado em um diretório de cache,
+de forma que execuções seguintes do mesmo programa - mesmo com segmentos .data diferentes - apenas importam o módulo,
+sem decodificar nem traduzir nada. Blocos que só são alcançados por `jalr` são traduzidos sob demanda pelo `BlockEngine`.
+"""
+
+import hashlib
+import importlib.util
+import os
+import tempfile
+from core.block_engine import Block, TRANSLATOR_VERSION
+
+CACHE_ENV = 'SIMULADOR_RISCV_CACHE'
+"""Variável de ambiente com o diretório da cache em disco."""
+
+def cache_dir(path=None):
+    """Diretório da cache em disco: `path`, a variável de ambiente `SIMULADOR_RISCV_CACHE` ou `~/.cache/simulador-riscv`. É criado se não existir."""
+    if path is None:
+        path = os.environ.get(CACHE_ENV) or os.path.join(os.path.expanduser('~'), '.cache', 'simulador-riscv')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def program_hash(memory, backend='numpy'):
+    """
+    Hash SHA-256 do conteúdo do segmento .text, do intervalo que ele ocupa, da versão do tradutor, do backend de registradores e
+    do ajuste de endereços do `lw` (`memory.remap_low`): o código gerado depende deles (os blocos usam PCs absolutos).
+    """
+    extent = memory.text_extent() # A mesma parte do .text coberta pelos blocos (ver `Executor`)
+    digest = hashlib.sha256(f'v{TRANSLATOR_VERSION}:{backend}:{int(memory.remap_low)}:{memory.text_base:#x}:{extent:#x}:'.encode())
+    digest.update(memory.text_words(extent).tobytes())
+    return digest.hexdigest()
+
+def program_source(engine):
+    """Gera o código-fonte do módulo com todos os blocos básicos alcançáveis estaticamente a partir do PC atual do `engine`."""
+    pending = [int(engine.executor.pc)]
+    seen = set()
+    blocks = []
+    while pending:
+        pc = pending.pop()
+        if pc in seen:
+            continue
+        seen.add(pc)
+        generated = engine.block_source(pc)
+        if generated is None:
+            continue
+        name, source, size, successors = generated
+        blocks.append((pc, name, source, size))
+        pending.extend(successors)
+
+    blocks.sort()
+    key = program_hash(engine.memory, engine.executor.instruction_set.BACKEND)
+    lines = [f'"""Blocos básicos traduzidos do programa {key}. Gerado por core.aot."""', '']
+    for _, _, source, _ in blocks:
+        lines += [source]
+    lines += ['BLOCKS = {']
+    lines += [f'    {pc:#06x}: ({name}, {size}),' for pc, name, _, size in blocks]
+    lines += ['}', '']
+    return '\n'.join(lines)
+
+def load_program(engine, path=None):
+    """
+    Carrega no `engine` os blocos do módulo traduzido do programa que está na memória, gerando e salvando o módulo em `cache_dir(path)` se ainda não existir.\n
+    O .text só é decodificado (`Executor.predecode`) para gerar o módulo: com o módulo na cache, as instruções que ficam fora
+    dos blocos são decodificadas sob demanda. Retorna o módulo importado.
+    """
+    key = program_hash(engine.memory, engine.executor.instruction_set.BACKEND)
+    file = os.path.join(cache_dir(path), f'programa_{key}.py')
+    if not os.path.exists(file):
+        engine.executor.predecode()
+        # Escreve em um arquivo temporário e renomeia, para que processos concorrentes nunca importem um módulo incompleto
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(file))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(program_source(engine))
+            os.replace(temp, file)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    spec = importlib.util.spec_from_file_location(f'programa_{key[:16]}', file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for start, (function, size) in module.BLOCKS.items():
+        engine.add(Block(start, size, None, function))
+    return module
@@ -0,0 +1,175 @@
+"""
+Execução de muitos programas em um conjunto limitado de processos.\n
+`run_batch` recebe uma lista de `Job` (pares .text/.data) e os executa em um `multiprocessing.Pool` com um processo por núcleo
+(ou `workers` processos). A saída de cada programa é capturada e devolvida em um `ProgramResult`, com o código de saída,
+a mensagem de erro (se houver), o número de instruções executadas e o tempo de execução.\n
+`load_manifest` lê a lista de programas de um diretório (pares `*_text.txt`/`*_data.txt`), de um arquivo JSON ou de um arquivo
+de texto com um par de caminhos por linha. Pela linha de comando (a partir de `src/`):
+
+    python -m core.batch tests/files --engine block --backend int
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from core.cpu import CPU
+from core.output import BufferSink
+
+class Job:
+    """Programa a executar: caminhos dos arquivos .text e .data (`data_path` pode ser `None`) e um nome para o relatório."""
+    __slots__ = ('name', 'code_path', 'data_path')
+
+    def __init__(self, code_path, data_path=None, name=None) -> None:
+        self.code_path = code_path
+        self.data_path = data_path
+        self.name = name or os.path.basename(code_path).removesuffix('.txt').removesuffix('_text')
+
+    def __repr__(self):
+        return f'Job({self.name!r}, {self.code_path!r}, {self.data_path!r})'
+
+
+class ProgramResult:
+    """Resultado da execução de um `Job`."""
+    __slots__ = ('name', 'code_path', 'data_path', 'output', 'exit_code', 'error', 'instructions', 'seconds', 'stats')
+
+    def __init__(self, job, output, exit_code, error, instructions, seconds, stats=None) -> None:
+        self.name = job.name
+        self.code_path = job.code_path
+        self.data_path = job.data_path
+        self.output = output
+        """Tudo o que o programa imprimiu."""
+        self.exit_code = exit_code
+        """Código passado à chamada de sistema de encerramento, ou `None` se o programa não terminou normalmente."""
+        self.error = error
+        """Mensagem do erro que interrompeu a execução, ou `None`."""
+        self.instructions = instructions
+        self.seconds = seconds
+        """Tempo de execução (construção da CPU e execução), em segundos."""
+        self.stats = stats
+        """Mix de instruções (`InstructionStats.as_dict`), se a execução foi feita com `counters`."""
+
+    @property
+    def ok(self):
+        """`True` se o programa terminou com código de saída 0."""
+        return self.error is None and self.exit_code == 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f'ProgramResult({self.name!r}, exit_code={self.exit_code}, error={self.error!r}, instructions={self.instructions})'
+
+
+def run_job(job, engine='step', backend='numpy', cache_dir=None, image_cache=False, max_instructions=None, max_seconds=None,
+            counters=False) -> ProgramResult:
+    """
+    Executa `job` no processo atual, capturando a saída do programa.\n
+    `max_instructions` e `max_seconds` limitam a execução (ver `CPU.run`); um programa interrompido por um limite tem `error` preenchido.
+    Com `counters`, o resultado inclui o mix de instruções executadas (ver `core.stats`).
+    """
+    output = BufferSink()
+    start = time.perf_counter()
+    try:
+        cpu = CPU(job.code_path, job.data_path, engine, cache_dir, backend, image_cache=image_cache, output=output,
+                  counters=counters)
+    except Exception as e: # Arquivo inexistente ou inválido: o lote continua
+        return ProgramResult(job, output.getvalue(), None, f"{type(e).__name__}: {e}", 0, time.perf_counter() - start)
+    result = cpu.run(max_instructions, max_seconds)
+    error = result.error
+    if result.limit is not None:
+        error = f"Execução interrompida: limite {result.limit} atingido."
+    stats = None if cpu.stats is None else cpu.stats.as_dict()
+    return ProgramResult(job, output.getvalue(), result.exit_code, error, result.instructions, time.perf_counter() - start, stats)
+
+def _run_job(arguments):
+    job, options = arguments
+    return run_job(job, **options)
+
+def run_batch(jobs, workers=None, engine='step', backend='numpy', cache_dir=None, image_cache=False, max_instructions=None, max_seconds=None,
+              counters=False):
+    """
+    Executa `jobs` em até `workers` processos (padrão: `os.cpu_count()`) e retorna os `ProgramResult` na mesma ordem.\n
+    Com `workers=1`, os programas são executados no processo atual. `max_instructions` e `max_seconds` valem para cada programa.
+    """
+    jobs = list(jobs)
+    options = dict(engine=engine, backend=backend, cache_dir=cache_dir, image_cache=image_cache,
+                   max_instructions=max_instructions, max_seconds=max_seconds, counters=counters)
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers == 1:
+        return [run_job(job, **options) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(_run_job, [(job, options) for job in jobs], chunksize)
+
+def load_manifest(path):
+    """
+    Lê a lista de programas de `path`:\n
+    - diretório: cada `<nome>_text.txt` com o `<nome>_data.txt` correspondente (se existir);
+    - `.json`: lista de objetos `{"text": ..., "data": ..., "name": ...}` ou de pares `[text, data]`;
+    - outro arquivo: uma linha `text [data]` por programa; linhas vazias e iniciadas por `#` são ignoradas.
+
+    Caminhos relativos nos arquivos de manifesto são relativos ao diretório do manifesto.
+    """
+    if os.path.isdir(path):
+        jobs = []
+        for code_path in sorted(glob.glob(os.path.join(path, '*_text.txt'))):
+            data_path = code_path.removesuffix('_text.txt') + '_data.txt'
+            jobs.append(Job(code_path, data_path if os.path.exists(data_path) else None))
+        return jobs
+
+    base = os.path.dirname(path)
+    def resolve(file):
+        return None if file is None else os.path.join(base, file)
+
+    with open(path) as f:
+        if path.endswith('.json'):
+            entries = json.load(f)
+            return [Job(resolve(entry[0]), resolve(entry[1] if len(entry) > 1 else None)) if isinstance(entry, list)
+                    else Job(resolve(entry['text']), resolve(entry.get('data')), entry.get('name')) for entry in entries]
+        jobs = []
+        for line in f:
+            fields = line.split()
+            if fields and not fields[0].startswith('#'):
+                jobs.append(Job(resolve(fields[0]), resolve(fields[1]) if len(fields) > 1 else None))
+        return jobs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa um lote de programas RV32I em paralelo.")
+    parser.add_argument('manifest', help="diretório com pares *_text.txt/*_data.txt, arquivo JSON ou lista de pares")
+    parser.add_argument('--engine', choices=CPU.ENGINES, default='step')
+    parser.add_argument('--backend', choices=CPU.BACKENDS, default='numpy')
+    parser.add_argument('--workers', type=int, default=None, help="número de processos (padrão: número de núcleos)")
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--image-cache', action='store_true', help="lê os arquivos pela cache de imagens")
+    parser.add_argument('--max-instructions', type=int, default=None, help="limite de instruções por programa")
+    parser.add_argument('--max-seconds', type=float, default=None, help="limite de tempo de execução por programa")
+    parser.add_argument('--counters', action='store_true', help="conta as instruções executadas por tipo (ver core.stats)")
+    parser.add_argument('--output', action='store_true', help="mostra a saída de cada programa")
+    parser.add_argument('--json', action='store_true', help="imprime os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_batch(load_manifest(args.manifest), args.workers, args.engine, args.backend, args.cache_dir, args.image_cache,
+                        args.max_instructions, args.max_seconds, args.counters)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        json.dump([result.as_dict() for result in results], sys.stdout, indent=2)
+        print()
+    else:
+        for result in results:
+            status = f"exit {result.exit_code}" if result.error is None else f"erro: {result.error}"
+            print(f"{result.name:<20} {status:<30} {result.instructions:>10} instruções {result.seconds * 1000:>9.1f} ms")
+            if result.stats is not None:
+                print('    ' + ', '.join(f"{name} {count}" for name, count in result.stats['instructions'].items()))
+            if args.output:
+                print(result.output)
+        failed = sum(not result.ok for result in results)
+        print(f"\n{len(results)} programas, {failed} com falha, {elapsed:.2f} s")
+    return 0 if all(result.ok for result in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Suíte de desempenho do simulador.\n
+Executa os programas de `src/tests/files` (`ultraT`, `test4-*`, `test5-*`, `test6-*`) e laços sintéticos longos (`KERNELS`) em
+cada motor de execução e representação de registradores, e mede para cada caso:\n
+- `load_seconds`: construção da `CPU` (leitura dos arquivos, decodificação antecipada e, no motor `aot`, carga do módulo traduzido);
+- `run_seconds` e `mips`: execução do programa, em milhões de instruções por segundo;
+- `peak_rss_kib`: pico de memória residente do processo (`resource.getrusage`), em KiB.
+
+Cada caso é executado `repeat` vezes e os tempos são os menores medidos, que variam menos entre execuções. Por padrão, cada caso roda
+em um processo novo (`spawn`), de forma que o pico de memória é o do próprio caso; com `isolate=False`, tudo roda no processo atual e
+o pico é o do processo inteiro. No motor `aot`, a primeira execução pode gerar o módulo traduzido na cache: os tempos de carga são os
+da cache já preenchida.\n
+Os resultados são salvos em JSON (`save`) e comparados com uma referência (`compare`), que aponta as quedas de MIPS e os aumentos do
+tempo de carga e da memória acima de `threshold`. Pela linha de comando (a partir de `src/`):
+
+    python -m core.benchmark run --save antes.json
+    python -m core.benchmark run --engines block aot --backends int --baseline antes.json
+    python -m core.benchmark compare antes.json depois.json --threshold 0.05
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from core.batch import Job, load_manifest
+from core.cpu import CPU
+from core.output import BufferSink
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+FILES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'files')
+PROGRAMS = ('ultraT', 'test4-*', 'test5-*', 'test6-*')
+"""Programas de `FILES` incluídos na suíte."""
+
+KERNELS = {
+    # Operações lógicas e aritméticas entre registradores: 9 instruções por iteração
+    'alu': [
+        0x000023B7, # 0x00: lui x7, 0x2
+        0x0003A303, # 0x04: lw x6, 0(x7)        (iterações)
+        0x00000293, # 0x08: addi x5, x0, 0
+        0x00100513, # 0x0c: addi x10, x0, 1
+        0x00A282B3, # 0x10: add x5, x5, x10
+        0x00554533, # 0x14: xor x10, x10, x5
+        0x00329593, # 0x18: slli x11, x5, 3
+        0x0025D613, # 0x1c: srli x12, x11, 2
+        0x00C5F6B3, # 0x20: and x13, x11, x12
+        0x40D282B3, # 0x24: sub x5, x5, x13
+        0x00656533, # 0x28: or x10, x10, x6
+        0xFFF30313, # 0x2c: addi x6, x6, -1
+        0xFE0310E3, # 0x30: bne x6, x0, 0x10
+        0x00028513, # 0x34: addi x10, x5, 0
+        0x00100893, # 0x38: addi x17, x0, 1
+        0x00000073, # 0x3c: ecall                (imprime x5)
+        0x00A00893, # 0x40: addi x17, x0, 10
+        0x00000073, # 0x44: ecall
+    ],
+    # Leituras e escritas de palavras e bytes em um vetor circular de 1 KiB do .data: 11 instruções por iteração
+    'memory': [
+        0x000023B7, # 0x00: lui x7, 0x2
+        0x0003A303, # 0x04: lw x6, 0(x7)        (iterações)
+        0x00000293, # 0x08: addi x5, x0, 0
+        0x00000413, # 0x0c: addi x8, x0, 0
+        0x008384B3, # 0x10: add x9, x7, x8
+        0x0064A223, # 0x14: sw x6, 4(x9)
+        0x0044A583, # 0x18: lw x11, 4(x9)
+        0x00B282B3, # 0x1c: add x5, x5, x11
+        0x00B482A3, # 0x20: sb x11, 5(x9)
+        0x0054C603, # 0x24: lbu x12, 5(x9)
+        0x00C282B3, # 0x28: add x5, x5, x12
+        0x00440413, # 0x2c: addi x8, x8, 4
+        0x3FC47413, # 0x30: andi x8, x8, 1020
+        0xFFF30313, # 0x34: addi x6, x6, -1
+        0xFC031CE3, # 0x38: bne x6, x0, 0x10
+        0x00028513, # 0x3c: addi x10, x5, 0
+        0x00100893, # 0x40: addi x17, x0, 1
+        0x00000073, # 0x44: ecall                (imprime x5)
+        0x00A00893, # 0x48: addi x17, x0, 10
+        0x00000073, # 0x4c: ecall
+    ],
+    # Chamada e retorno de uma função curta: 7 instruções por iteração, em blocos de 3 e 4 instruções
+    'calls': [
+        0x000023B7, # 0x00: lui x7, 0x2
+        0x0003A303, # 0x04: lw x6, 0(x7)        (iterações)
+        0x00000293, # 0x08: addi x5, x0, 0
+        0x010000EF, # 0x0c: jal x1, 0x1c
+        0xFFF30313, # 0x10: addi x6, x6, -1
+        0xFE031CE3, # 0x14: bne x6, x0, 0xc
+        0x0140006F, # 0x18: jal x0, 0x2c
+        0x00328293, # 0x1c: addi x5, x5, 3
+        0x00129593, # 0x20: slli x11, x5, 1
+        0x00B2C2B3, # 0x24: xor x5, x5, x11
+        0x00008067, # 0x28: jalr x0, 0(x1)
+        0x00028513, # 0x2c: addi x10, x5, 0
+        0x00100893, # 0x30: addi x17, x0, 1
+        0x00000073, # 0x34: ecall                (imprime x5)
+        0x00A00893, # 0x38: addi x17, x0, 10
+        0x00000073, # 0x3c: ecall
+    ],
+}
+"""Laços sintéticos longos. A primeira palavra do .data é o número de iterações; no fim, o programa imprime `x5`."""
+
+def write_kernels(directory, iterations=20000, names=None) -> list:
+    '''Escreve em `directory` os arquivos .text/.data dos laços `names` (padrão: todos) com `iterations` iterações e retorna os `Job`.'''
+    jobs = []
+    for name in names or KERNELS:
+        code_path = os.path.join(directory, f'kernel-{name}_text.txt')
+        data_path = os.path.join(directory, f'kernel-{name}_data.txt')
+        with open(code_path, 'w') as f:
+            f.write(''.join(f'{word:032b}\n' for word in KERNELS[name]))
+        with open(data_path, 'w') as f:
+            f.write(f'{iterations:032b}\n')
+        jobs.append(Job(code_path, data_path))
+    return jobs
+
+def suite_jobs(directory, iterations=20000, patterns=None, files=FILES) -> list:
+    '''Programas da suíte: os `PROGRAMS` de `files` e os `KERNELS`, escritos em `directory`, filtrados pelos padrões de nome `patterns`.'''
+    jobs = [job for job in load_manifest(files) if any(fnmatch.fnmatch(job.name, pattern) for pattern in PROGRAMS)]
+    jobs += write_kernels(directory, iterations)
+    if patterns:
+        jobs = [job for job in jobs if any(fnmatch.fnmatch(job.name, pattern) for pattern in patterns)]
+    return jobs
+
+def peak_rss_kib():
+    '''Pico de memória residente do processo atual, em KiB, ou `None` sem o módulo `resource`.'''
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak # Em bytes no macOS
+
+
+class Measurement:
+    """Medidas de um programa em um motor e representação de registradores (ver o módulo)."""
+    __slots__ = ('name', 'engine', 'backend', 'instructions', 'load_seconds', 'run_seconds', 'peak_rss_kib', 'error')
+
+    def __init__(self, name, engine, backend, instructions, load_seconds, run_seconds, peak_rss_kib=None, error=None) -> None:
+        self.name = name
+        self.engine = engine
+        self.backend = backend
+        self.instructions = instructions
+        self.load_seconds = load_seconds
+        self.run_seconds = run_seconds
+        self.peak_rss_kib = peak_rss_kib
+        self.error = error
+        """Mensagem do erro, se o programa não pôde ser executado ou não terminou com código de saída 0."""
+
+    @property
+    def key(self):
+        return f'{self.name}/{self.engine}/{self.backend}'
+
+    @property
+    def mips(self):
+        return self.instructions / self.run_seconds / 1e6 if self.run_seconds else 0.0
+
+    def as_dict(self):
+        return {**{name: getattr(self, name) for name in self.__slots__}, 'mips': self.mips}
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(*(entry.get(name) for name in cls.__slots__))
+
+    def __repr__(self):
+        return f'Measurement({self.key!r}, instructions={self.instructions}, mips={self.mips:.3f})'
+
+
+def measure(job, engine='step', backend='numpy', repeat=3, cache_dir=None) -> Measurement:
+    '''Executa `job` `repeat` vezes no processo atual, cada vez com uma `CPU` nova, e retorna os menores tempos medidos.'''
+    load_seconds = run_seconds = float('inf')
+    instructions = 0
+    error = None
+    for _ in range(repeat):
+        output = BufferSink()
+        start = time.perf_counter()
+        try:
+            cpu = CPU(job.code_path, job.data_path, engine, cache_dir, backend, output=output)
+        except Exception as e: # Arquivo inexistente ou inválido: a suíte continua
+            return Measurement(job.name, engine, backend, 0, 0.0, 0.0, peak_rss_kib(), f"{type(e).__name__}: {e}")
+        loaded = time.perf_counter()
+        result = cpu.run()
+        end = time.perf_counter()
+        load_seconds = min(load_seconds, loaded - start)
+        run_seconds = min(run_seconds, end - loaded)
+        instructions = result.instructions
+        if result.error is not None:
+            error = result.error
+        elif result.exit_code != 0:
+            error = f"Código de saída {result.exit_code}"
+    return Measurement(job.name, engine, backend, instructions, load_seconds, run_seconds, peak_rss_kib(), error)
+
+def _measure(arguments):
+    job, engine, backend, options = arguments
+    return measure(job, engine, backend, **options)
+
+def run_suite(jobs, engines=CPU.ENGINES, backends=CPU.BACKENDS, repeat=3, cache_dir=None, isolate=True, progress=None) -> list:
+    """
+    Mede cada programa de `jobs` em cada motor de `engines` e representação de `backends`, um caso por vez, e retorna os `Measurement`.\n
+    Com `isolate`, cada caso roda em um processo novo. `progress`, se informado, é chamado com cada `Measurement` assim que ele fica pronto.
+    """
+    options = dict(repeat=repeat, cache_dir=cache_dir)
+    tasks = [(job, engine, backend, options) for job in jobs for engine in engines for backend in backends]
+    results = []
+    if isolate:
+        with multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+            for measurement in pool.imap(_measure, tasks):
+                results.append(measurement)
+                if progress is not None:
+                    progress(measurement)
+    else:
+        for task in tasks:
+            results.append(_measure(task))
+            if progress is not None:
+                progress(results[-1])
+    return results
+
+def save(measurements, path):
+    '''Salva os resultados em JSON em `path`, com a versão do Python e a plataforma da medição.'''
+    report = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [measurement.as_dict() for measurement in measurements],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+def load(path) -> dict:
+    '''Lê os resultados salvos por `save`: `{chave: Measurement}`, com chaves `programa/motor/backend`.'''
+    with open(path) as f:
+        report = json.load(f)
+    measurements = (Measurement.from_dict(entry) for entry in report['results'])
+    return {measurement.key: measurement for measurement in measurements}
+
+
+class Regression:
+    """Piora de uma medida em relação à referência. `metric` é `'mips'`, `'load_seconds'`, `'peak_rss_kib'` ou `'error'`."""
+    __slots__ = ('key', 'metric', 'before', 'after')
+
+    def __init__(self, key, metric, before, after) -> None:
+        self.key = key
+        self.metric = metric
+        self.before = before
+        self.after = after
+
+    @property
+    def change(self):
+        """Variação relativa da medida (negativa para quedas)."""
+        if self.metric == 'error' or not self.before:
+            return None
+        return self.after / self.before - 1
+
+    def __str__(self):
+        if self.metric == 'error':
+            return f'{self.key}: {self.after}'
+        return f'{self.key}: {self.metric} {self.before:.6g} -> {self.after:.6g} ({100 * self.change:+.1f}%)'
+
+    def __repr__(self):
+        return f'Regression({self.key!r}, {self.metric!r}, {self.before!r}, {self.after!r})'
+
+def compare(baseline, current, threshold=0.10, min_seconds=0.005) -> list:
+    """
+    Compara os resultados `current` com a referência `baseline` (`{chave: Measurement}`, como em `load`) e retorna as `Regression`.\n
+    É uma regressão a queda de MIPS, ou o aumento do tempo de carga ou do pico de memória, maior que a fração `threshold`, e um erro que
+    não havia na referência. Tempos da referência abaixo de `min_seconds` não são comparados: nessa escala, a medida é só ruído.
+    Casos que existem em apenas um dos lados são ignorados.
+    """
+    regressions = []
+    for key, after in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if after.error is not None and before.error is None:
+            regressions.append(Regression(key, 'error', None, after.error))
+            continue
+        if before.run_seconds >= min_seconds and after.mips < before.mips * (1 - threshold):
+            regressions.append(Regression(key, 'mips', before.mips, after.mips))
+        if before.load_seconds >= min_seconds and after.load_seconds > before.load_seconds * (1 + threshold):
+            regressions.append(Regression(key, 'load_seconds', before.load_seconds, after.load_seconds))
+        if before.peak_rss_kib and after.peak_rss_kib and after.peak_rss_kib > before.peak_rss_kib * (1 + threshold):
+            regressions.append(Regression(key, 'peak_rss_kib', before.peak_rss_kib, after.peak_rss_kib))
+    return regressions
+
+def report_regressions(regressions, compared) -> int:
+    '''Mostra as regressões de uma comparação de `compared` casos e retorna o código de saída da linha de comando (1 se houver).'''
+    for regression in regressions:
+        print(f'REGRESSÃO {regression}')
+    print(f'\n{compared} casos comparados, {len(regressions)} regressões')
+    return 1 if regressions else 0
+
+def format_measurement(measurement) -> str:
+    rss = f'{measurement.peak_rss_kib / 1024:>8.1f} MiB' if measurement.peak_rss_kib is not None else f'{"-":>12}'
+    line = (f'{measurement.name:<16} {measurement.engine:<6} {measurement.backend:<6} {measurement.instructions:>10} instruções '
+            f'{measurement.mips:>8.3f} MIPS carga {measurement.load_seconds * 1000:>8.2f} ms {rss}')
+    return line if measurement.error is None else f'{line}  erro: {measurement.error}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o desempenho do simulador nos programas de teste e em laços sintéticos.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="executa a suíte")
+    run.add_argument('--engines', nargs='+', choices=CPU.ENGINES, default=list(CPU.ENGINES))
+    run.add_argument('--backends', nargs='+', choices=CPU.BACKENDS, default=list(CPU.BACKENDS))
+    run.add_argument('--programs', nargs='+', default=None, help="padrões de nome dos programas (ex.: 'kernel-*' 'test4-*')")
+    run.add_argument('--iterations', type=int, default=20000, help="iterações dos laços sintéticos")
+    run.add_argument('--repeat', type=int, default=3, help="execuções de cada caso (vale o menor tempo)")
+    run.add_argument('--cache-dir', default=None)
+    run.add_argument('--in-process', action='store_true', help="executa todos os casos no processo atual")
+    run.add_argument('--save', default=None, help="arquivo JSON de saída com os resultados")
+    run.add_argument('--baseline', default=None, help="arquivo JSON de referência para comparar os resultados")
+    compare_command = commands.add_parser('compare', help="compara dois resultados salvos")
+    compare_command.add_argument('baseline')
+    compare_command.add_argument('current')
+    for command in (run, compare_command):
+        command.add_argument('--threshold', type=float, default=0.10, help="piora relativa tolerada (padrão: 0.10)")
+        command.add_argument('--min-seconds', type=float, default=0.005, help="tempos menores não são comparados")
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        baseline, current = load(args.baseline), load(args.current)
+        regressions = compare(baseline, current, args.threshold, args.min_seconds)
+        return report_regressions(regressions, len(current.keys() & baseline.keys()))
+
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = suite_jobs(directory, args.iterations, args.programs)
+        measurements = run_suite(jobs, args.engines, args.backends, args.repeat, args.cache_dir, not args.in_process,
+                                 lambda measurement: print(format_measurement(measurement), flush=True))
+    if args.save:
+        save(measurements, args.save)
+    if args.baseline:
+        baseline = load(args.baseline)
+        current = {measurement.key: measurement for measurement in measurements}
+        return report_regressions(compare(baseline, current, args.threshold, args.min_seconds), len(current.keys() & baseline.keys()))
+    return 0 if all(measurement.error is None for measurement in measurements) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
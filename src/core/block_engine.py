@@ -0,0 +1,360 @@
+"""
+Motor de execução por blocos básicos.\n
+Em vez de buscar, decodificar e despachar uma instrução por vez como o `Executor.step`, este motor encontra blocos básicos
+no segmento .text - sequências de instruções que terminam em um desvio (`beq`, `bne`, ...), `jal`, `jalr` ou `ecall` - e
+traduz cada bloco, uma única vez, para uma função Python. A função aplica todos os efeitos do bloco nos registradores e na memória
+e retorna o endereço da próxima instrução.\n
+Dentro do bloco, os registradores ficam em variáveis locais (inteiros Python de 32 bits) e são escritos de volta em `xregs`
+no fim do bloco, de forma que o estado arquitetural é exato nas fronteiras entre blocos. Se um acesso à memória lança um erro no meio
+do bloco, as instruções anteriores são escritas de volta antes de o erro seguir, e o PC e o `global_counter` ficam como o
+`Executor.step` os deixaria (o PC aponta para a instrução seguinte à que falhou, que não é contada).
+Com o backend `int` (`RegisterFile`), o bloco lê e escreve diretamente a lista de inteiros do banco, sem conversões.
+Instruções que o tradutor não conhece (não implementadas, inválidas, imediatos desalinhados) encerram o bloco
+e são executadas pelo `Executor.step`, que reproduz o erro original.\n
+Escritas na memória que atingem o .text descartam os blocos que contêm o endereço escrito. Uma escrita no .text feita pelo próprio
+bloco o encerra logo depois da escrita, de forma que as instruções seguintes são traduzidas novamente a partir da memória alterada,
+como o `Executor.step` as decodificaria.\n
+Com os contadores do `Executor` ligados (`stats`, ver `core.stats`), cada bloco é traduzido com duas linhas a mais, que contam suas
+execuções e, se termina em um desvio condicional, quantas vezes o desvio foi tomado. Com o perfil ligado (`profiler`, ver
+`core.profiler`), a função de cada bloco é envolvida por outra que conta suas execuções e informa as chamadas e retornos; com a
+medição de tempos (`timing`, ver `core.timing`), a tradução e a execução de cada bloco são cronometradas.
+"""
+
+from time import perf_counter_ns
+from core.profiler import transfer
+
+TRANSLATOR_VERSION = 4
+"""Versão do código gerado. Deve ser incrementada sempre que a tradução mudar, para invalidar módulos salvos por `core.aot`."""
+
+class Block:
+    """Bloco básico traduzido: endereço inicial, quantidade de instruções, código-fonte gerado e a função compilada."""
+    __slots__ = ('start', 'size', 'source', 'function')
+
+    def __init__(self, start, size, source, function) -> None:
+        self.start = start
+        self.size = size
+        self.source = source
+        self.function = function
+
+
+FALLBACK = Block(None, 0, '', None)
+"""Marca um endereço cuja primeira instrução não pode ser traduzida e deve ser executada por `Executor.step`."""
+
+
+class BlockEngine:
+    """Motor de execução que traduz e executa blocos básicos de um `Executor`."""
+    MAX_BLOCK = 64
+    """Quantidade máxima de instruções em um bloco."""
+    BRANCHES = {
+        'beq':  '{a} == {b}',
+        'bne':  '{a} != {b}',
+        'blt':  '(({a} ^ 0x80000000) - 0x80000000) < (({b} ^ 0x80000000) - 0x80000000)',
+        'bge':  '(({a} ^ 0x80000000) - 0x80000000) >= (({b} ^ 0x80000000) - 0x80000000)',
+        'bltu': '{a} < {b}',
+        'bgeu': '{a} >= {b}',
+    }
+    """Condição de cada desvio, sobre os valores sem sinal dos registradores `a` e `b`."""
+    ALU = {
+        'add':  '({a} + {b}) & 0xffffffff',
+        'sub':  '({a} - {b}) & 0xffffffff',
+        'xor':  '{a} ^ {b}',
+        'or':   '{a} | {b}',
+        'and':  '{a} & {b}',
+        'slt':  '1 if (({a} ^ 0x80000000) - 0x80000000) < (({b} ^ 0x80000000) - 0x80000000) else 0',
+        'sltu': '1 if {a} < {b} else 0',
+        'addi': '({a} + {imm}) & 0xffffffff',
+        'andi': '({a} & {imm}) & 0xffffffff',
+        'ori':  '({a} | {imm}) & 0xffffffff',
+        'slli': '({a} << {shamt}) & 0xffffffff',
+        'srli': '{a} >> {shamt}',
+        'srai': '((({a} ^ 0x80000000) - 0x80000000) >> {shamt}) & 0xffffffff',
+    }
+    """Expressão de cada operação lógica/aritmética, sobre o registrador `a` e o registrador `b` ou o imediato."""
+
+    def __init__(self, executor) -> None:
+        self.executor = executor
+        self.memory = executor.memory
+        self.blocks = {}
+        """Blocos já traduzidos, indexados pelo endereço inicial."""
+        self.covering = {}
+        """Endereços iniciais dos blocos que contêm cada palavra do .text, indexados por `(endereço - text_base) >> 2`."""
+        self.memory.text_watchers.append(self.invalidate)
+        if executor.timing is not None:
+            self.translate = self._timed_translate
+
+    def invalidate(self, address):
+        """Descarta os blocos que contêm o byte `address` do segmento .text."""
+        index = (int(address) - self.executor.text_base) >> 2
+        for start in self.covering.pop(index, ()):
+            self.blocks.pop(start, None)
+
+    def run_block(self):
+        """Executa o bloco básico que começa no PC atual, traduzindo-o se necessário."""
+        executor = self.executor
+        pc = int(executor.pc)
+        block = self.blocks.get(pc)
+        if block is None:
+            block = self.translate(pc)
+        if block is FALLBACK:
+            executor.step()
+        else:
+            executor.pc = block.function(executor)
+
+    def run(self, count):
+        """
+        Executa até `count` instruções, bloco a bloco, e para antes se o programa encerrar (`instruction_set.exit_code`).\n
+        Um bloco maior que o restante do orçamento é executado instrução a instrução pelo `Executor.step`, de forma que o limite é exato.
+        """
+        executor = self.executor
+        isa = executor.instruction_set
+        blocks = self.blocks
+        step = executor.step
+        end = executor.global_counter + count
+        while isa.exit_code is None:
+            remaining = end - executor.global_counter
+            if remaining <= 0:
+                break
+            pc = int(executor.pc)
+            block = blocks.get(pc)
+            if block is None:
+                block = self.translate(pc)
+            if block.size > remaining or block is FALLBACK:
+                step()
+            else:
+                executor.pc = block.function(executor)
+
+    def translate(self, pc) -> Block:
+        """Traduz o bloco básico que começa em `pc` e o guarda na cache de blocos."""
+        stats = self.executor.stats
+        counter = None if stats is None else len(stats.block_ids)
+        generated = self.block_source(pc, counter)
+        if generated is None:
+            self.blocks[pc] = FALLBACK
+            return FALLBACK
+        name, source, size, _ = generated
+        namespace = {}
+        if stats is not None:
+            namespace['counts'] = stats.block_counts
+            namespace['retired'] = stats.retired
+            stats.count_block([stats.ids[self.executor.instruction_at(pc + (i << 2)).key] for i in range(size)])
+        exec(compile(source, f'<bloco {pc:#06x}>', 'exec'), namespace)
+        block = Block(pc, size, source, namespace[name])
+        self.add(block)
+        return block
+
+    def add(self, block):
+        """Registra um bloco traduzido na cache, marcando as palavras do .text que ele cobre."""
+        self.blocks[block.start] = block
+        first = (block.start - self.executor.text_base) >> 2
+        for index in range(first, first + block.size):
+            self.covering.setdefault(index, []).append(block.start)
+        if self.executor.profiler is not None:
+            self._profile(block)
+        if self.executor.timing is not None:
+            self._time(block)
+
+    def _timed_translate(self, pc) -> Block:
+        timing = self.executor.timing
+        start = perf_counter_ns()
+        block = BlockEngine.translate(self, pc)
+        timing.ns['decode'] += perf_counter_ns() - start
+        timing.decodes += 1
+        return block
+
+    def _time(self, block):
+        '''Troca a função de `block` por uma que soma o tempo de cada execução do bloco em `timing`.'''
+        timing = self.executor.timing
+        function = block.function
+        def timed(executor):
+            start = perf_counter_ns()
+            next_pc = function(executor)
+            timing.ns['execute'] += perf_counter_ns() - start
+            timing.blocks += 1
+            return next_pc
+        block.function = timed
+
+    def _profile(self, block):
+        '''Troca a função de `block` por uma que conta suas execuções em `profiler` e informa as chamadas e retornos do fim do bloco.'''
+        executor = self.executor
+        profiler = executor.profiler
+        hits = profiler.block_hits
+        k = profiler.add_block((block.start - executor.text_base) >> 2, block.size)
+        kind = transfer(executor.instruction_at(block.start + ((block.size - 1) << 2)))
+        function = block.function
+        if kind == 'call':
+            def profiled(executor):
+                next_pc = function(executor)
+                hits[k] += 1
+                profiler.call(next_pc)
+                return next_pc
+        elif kind == 'return':
+            def profiled(executor):
+                next_pc = function(executor)
+                hits[k] += 1
+                profiler.ret()
+                return next_pc
+        else:
+            def profiled(executor):
+                next_pc = function(executor)
+                hits[k] += 1
+                return next_pc
+        block.function = profiled
+
+    def block_source(self, pc, counter=None):
+        """
+        Gera o código-fonte Python do bloco básico que começa em `pc`.\n
+        Retorna `(nome_da_função, código, quantidade_de_instruções, sucessores)`, ou `None` se a primeira instrução não pode ser traduzida.
+        `sucessores` são os endereços conhecidos em tempo de tradução para onde o bloco pode seguir (o destino de `jalr` não é conhecido).
+        Com `counter`, o bloco soma suas execuções em `counts[2 * counter]` e os desvios tomados em `counts[2 * counter + 1]`
+        (`counts` é a lista `InstructionStats.block_counts`, global do código gerado); se o bloco é interrompido por um erro,
+        as instruções já executadas são somadas em `retired` (`InstructionStats.retired`).
+        """
+        executor = self.executor
+        text_base = executor.text_base
+        text_end = text_base + (len(executor.decode_cache) << 2)
+        if pc % 4 != 0 or not text_base <= pc < text_end:
+            return None
+
+        body = []
+        loaded = []  # Registradores lidos antes de serem escritos no bloco
+        written = set()
+        size = 0
+        address = pc
+        terminator = None
+        successors = []
+        faults = []  # (índice, registradores escritos antes, ids das instruções anteriores) de cada acesso à memória
+        ids = []
+        stats = executor.stats if counter is not None else None
+
+        def read(reg):
+            if reg == 0:
+                return '0'
+            if reg not in written and reg not in loaded:
+                loaded.append(reg)
+            return f'r{reg}'
+
+        def write(reg, expression):
+            if reg != 0:
+                body.append(f'r{reg} = {expression}')
+                written.add(reg)
+
+        while address < text_end and size < self.MAX_BLOCK:
+            try:
+                ic = executor.instruction_at(address)
+            except ValueError: # Opcode inválido: Executor.step lança o erro se a instrução for executada
+                break
+            operation = executor.dispatch[ic.key]
+            if operation is None or operation.extractor is None:
+                break
+            name = operation.name
+            if name in self.BRANCHES or name in ('jal', 'jalr'):
+                if ic.imm % 4 != 0:
+                    break # Executor.step lança o erro de alinhamento
+            if name == 'ecall' and ic.imm != 0:
+                break
+            size += 1
+            body.append(f'# {address:#06x}: {name}')
+            if name in ('lb', 'lbu', 'lw', 'sb', 'sw'): # Podem lançar erro (endereço desalinhado ou fora da memória)
+                body.append(f'n = {size - 1}')
+                faults.append((size - 1, sorted(written), list(ids)))
+            if stats is not None:
+                ids.append(stats.ids[ic.key])
+
+            if name in self.ALU:
+                if ic.rd != 0: # Sem efeito em x0
+                    b = read(ic.rs2) if ic.ins_format == 'R_FORMAT' else None
+                    shamt = ic.imm & 0x1F if ic.imm is not None else None
+                    write(ic.rd, self.ALU[name].format(a=read(ic.rs1), b=b, imm=ic.imm, shamt=shamt))
+            elif name in ('lui', 'auipc'):
+                write(ic.rd, f'{ic.target:#x}')
+            elif name in ('lb', 'lbu', 'lw'):
+                target = f'{read(ic.rs1)} + {ic.imm}'
+                if name == 'lw' and self.memory.remap_low:
+                    body.append(f'a = {target}')
+                    target = 'a + 0x1ffe if a < 0x2000 else a' # Mesmo ajuste de InstructionSet.lw
+                load = f'int(mem.{name}({target}))'
+                if ic.rd != 0:
+                    write(ic.rd, load)
+                else:
+                    body.append(load)
+            elif name in ('sb', 'sw'):
+                body.append(f'a = {read(ic.rs1)} + {ic.imm}')
+                body.append(f'mem.{name}(a, {read(ic.rs2)})')
+                # Escrita no .text (código automodificável): o bloco termina aqui, com o estado das instruções já executadas
+                body.append('if mem.text_base <= a & 0xffffffff < mem.text_end:')
+                body += [f'    x[{reg}] = r{reg}' for reg in sorted(written)]
+                if stats is not None:
+                    body += [f'    retired[{i}] += 1' for i in ids]
+                body += [f'    executor.global_counter += {size}', f'    return {address + 4:#x}']
+            elif name in self.BRANCHES:
+                condition = self.BRANCHES[name].format(a=read(ic.rs1), b=read(ic.rs2))
+                taken = ic.target
+                if counter is None:
+                    terminator = [f'return {taken:#x} if {condition} else {address + 4:#x}']
+                else:
+                    terminator = [f'if {condition}:', f'    counts[{2 * counter + 1}] += 1', f'    return {taken:#x}', f'return {address + 4:#x}']
+                successors = [taken, address + 4]
+                break
+            elif name == 'jal':
+                write(ic.rd, f'{address + 4:#x}')
+                terminator = [f'return {ic.target:#x}']
+                successors = [ic.target, address + 4] # address + 4: retorno da função chamada
+                break
+            elif name == 'jalr':
+                body.append(f't = ({read(ic.rs1)} + {ic.imm}) & ~1')
+                write(ic.rd, f'{address + 4:#x}')
+                terminator = ['return t']
+                break
+            elif name == 'ecall':
+                terminator = [
+                    f'executor.pc = {address + 4:#x}',
+                    f'executor.global_counter += {size - 1}',
+                    'executor.instruction_set.ecall()',
+                    'executor.global_counter += 1',
+                    f'return {address + 4:#x}',
+                ]
+                successors = [address + 4]
+                break
+            address += 4
+
+        if size == 0:
+            return None
+        if terminator is None:
+            terminator = [f'return {pc + (size << 2):#x}']
+            successors = [pc + (size << 2)]
+        if not terminator[0].startswith('executor.pc'): # O bloco do ecall conta as instruções antes da chamada
+            terminator.insert(0, f'executor.global_counter += {size}')
+        if counter is not None:
+            terminator.insert(0, f'counts[{2 * counter}] += 1')
+
+        name = f'bloco_{pc:04x}'
+        if executor.instruction_set.BACKEND == 'int':
+            lines = [f'def {name}(executor):', '    x = executor.xregs.values', '    mem = executor.memory']
+            lines += [f'    r{reg} = x[{reg}]' for reg in loaded]
+        else:
+            lines = [f'def {name}(executor):', '    x = executor.xregs', '    mem = executor.memory']
+            lines += [f'    r{reg} = int(x[{reg}])' for reg in loaded]
+        if faults:
+            lines.append('    try:')
+            lines += [f'        {line}' for line in body]
+            lines.append('    except Exception:')
+            lines += [f'        {line}' for line in self._fault_handler(pc, faults)]
+        else:
+            lines += [f'    {line}' for line in body]
+        lines += [f'    x[{reg}] = r{reg}' for reg in sorted(written)]
+        lines += [f'    {line}' for line in terminator]
+        return name, '\n'.join(lines) + '\n', size, successors
+
+    @staticmethod
+    def _fault_handler(pc, faults):
+        '''Código que, após um erro na instrução `n` do bloco de `pc`, escreve de volta o estado das instruções anteriores e relança o erro.'''
+        lines = []
+        for index, written, ids in faults:
+            effects = [f'x[{reg}] = r{reg}' for reg in written] + [f'retired[{i}] += 1' for i in ids]
+            if effects:
+                lines.append(f'{"elif" if lines else "if"} n == {index}:')
+                lines += [f'    {effect}' for effect in effects]
+        lines.append(f'executor.pc = {pc + 4:#x} + (n << 2)') # Como em `Executor.step`: o PC já passou da instrução que falhou
+        lines.append('executor.global_counter += n')
+        lines.append('raise')
+        return lines
@@ -0,0 +1,135 @@
+"""
+Memória copy-on-write sobre uma imagem base compartilhada.\n
+Ao executar o mesmo programa com várias entradas, cada CPU teria sua própria cópia do .text e do .data.
+`MemoryImage` guarda as páginas de uma memória já carregada como arrays somente leitura, e `MemoryImage.memory()` cria uma
+`CopyOnWriteMemory`: uma `PagedMemory` cujas páginas começam como referências às páginas da imagem e são copiadas apenas na
+primeira escrita. Criar uma instância custa uma cópia do dicionário de páginas, e cada instância ocupa apenas as páginas que escreveu.\n
+Entre processos, `MemoryImage.share()` copia as páginas para um bloco de `multiprocessing.shared_memory`; o `SharedImage` retornado
+pode ser enviado a outros processos, onde `SharedImage.attach()` cria uma `MemoryImage` sobre o mesmo bloco, sem cópia.
+"""
+
+import numpy as np
+from multiprocessing import shared_memory
+from core.memory import Memory
+from core.paged_memory import PagedMemory
+
+class MemoryImage:
+    '''
+    Imagem somente leitura de uma memória: páginas (`número -> array uint8`) e layout (`text_base`, `data_base`, `text_end`,
+    `stack_top`, `remap_low`, `page_bits`).
+    '''
+    def __init__(self, pages, layout, page_bits=12) -> None:
+        self.pages = pages
+        self.layout = layout
+        self.page_bits = page_bits
+        self.page_words = {}
+        for number, page in pages.items():
+            page.flags.writeable = False # Escritas acidentais na imagem lançam ValueError
+            self.page_words[number] = page.view('<u4')
+
+    @classmethod
+    def from_memory(cls, memory):
+        """Cria a imagem com uma cópia do conteúdo de `memory` (`PagedMemory` ou `Memory`)."""
+        layout = dict(text_base=memory.text_base, data_base=memory.data_base,
+                      text_size=memory.text_end - memory.text_base, stack_top=memory.stack_top, remap_low=memory.remap_low)
+        if isinstance(memory, Memory):
+            # As páginas de 4 KiB de `Memory` são os trechos de MEM (o layout compacto cabe em 4 páginas)
+            pages = {number: memory.MEM[number << 12:(number + 1) << 12].copy() for number in range(len(memory.MEM) >> 12)}
+            return cls(pages, layout, 12)
+        pages = {number: page.copy() for number, page in memory.pages.items()}
+        return cls(pages, layout, memory.page_bits)
+
+    @classmethod
+    def load(cls, code_path, data_path, memory=None, format=None):
+        """Carrega os arquivos de programa em `memory` (padrão: `PagedMemory()`) e retorna a imagem resultante."""
+        if memory is None:
+            memory = PagedMemory()
+        memory.load_mem(code_path, data_path, format)
+        return cls.from_memory(memory)
+
+    def memory(self):
+        """Cria uma nova `CopyOnWriteMemory` sobre esta imagem."""
+        return CopyOnWriteMemory(self)
+
+    def share(self):
+        """Copia as páginas para um bloco de memória compartilhada e retorna o `SharedImage` que o descreve."""
+        numbers = sorted(self.pages)
+        size = len(numbers) << self.page_bits
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        buffer = np.ndarray(size, dtype=np.uint8, buffer=block.buf)
+        for index, number in enumerate(numbers):
+            buffer[index << self.page_bits:(index + 1) << self.page_bits] = self.pages[number]
+        del buffer
+        return SharedImage(block, numbers, self.layout, self.page_bits)
+
+
+class SharedImage:
+    '''
+    Descrição de uma `MemoryImage` em memória compartilhada: nome do bloco, números das páginas e layout.\n
+    Pode ser serializada com `pickle` (ex.: argumento de um `multiprocessing.Pool`). O processo que chamou `MemoryImage.share()`
+    deve chamar `unlink()` quando nenhum outro processo precisar mais da imagem.
+    '''
+    def __init__(self, block, numbers, layout, page_bits) -> None:
+        self.name = block.name
+        self.numbers = numbers
+        self.layout = layout
+        self.page_bits = page_bits
+        self._block = block
+
+    def __getstate__(self):
+        return {**self.__dict__, '_block': None}
+
+    def attach(self):
+        """Cria uma `MemoryImage` cujas páginas são visões do bloco compartilhado (sem cópia)."""
+        if self._block is None:
+            self._block = shared_memory.SharedMemory(name=self.name)
+        size = len(self.numbers) << self.page_bits
+        buffer = np.ndarray(size, dtype=np.uint8, buffer=self._block.buf)
+        pages = {number: buffer[index << self.page_bits:(index + 1) << self.page_bits] for index, number in enumerate(self.numbers)}
+        image = MemoryImage(pages, self.layout, self.page_bits)
+        image.block = self._block # Mantém o bloco aberto enquanto a imagem existir
+        return image
+
+    def unlink(self):
+        """Libera o bloco de memória compartilhada."""
+        if self._block is None:
+            self._block = shared_memory.SharedMemory(name=self.name)
+        self._block.unlink()
+
+
+class CopyOnWriteMemory(PagedMemory):
+    '''
+    `PagedMemory` que compartilha as páginas de uma `MemoryImage`.\n
+    Leituras usam as páginas da imagem diretamente; a primeira escrita em uma página a copia para esta instância (`dirty_pages`).
+    '''
+    def __init__(self, image) -> None:
+        super().__init__(page_bits=image.page_bits, **image.layout)
+        self.image = image
+        self.pages = dict(image.pages)
+        self.page_words = dict(image.page_words)
+        self.shared = set(image.pages)
+        """Números das páginas ainda compartilhadas com a imagem."""
+
+    def _page(self, number):
+        '''Retorna a página `number` para escrita, copiando-a da imagem ou alocando-a se necessário.'''
+        if number in self.shared:
+            self.shared.discard(number)
+            page = self.pages[number] = self.pages[number].copy()
+            self.page_words[number] = page.view('<u4')
+            return page
+        return super()._page(number)
+
+    def snapshot(self):
+        '''Cópia apenas das páginas próprias desta instância (as demais continuam na imagem).'''
+        self._text_snapshot = {number: self.pages[number].copy() for number in self.dirty_pages()}
+        return self._text_snapshot
+
+    def _clear(self):
+        '''Volta a compartilhar todas as páginas da imagem.'''
+        self.pages = dict(self.image.pages)
+        self.page_words = dict(self.image.page_words)
+        self.shared = set(self.image.pages)
+
+    def dirty_pages(self):
+        """Números das páginas próprias desta instância (copiadas da imagem ou alocadas)."""
+        return sorted(set(self.pages) - self.shared)
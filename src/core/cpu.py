@@ -2,42 +2,216 @@
 Módulo de inicialização do processador com banco de registradores e definição de variáveis globais.
 """
 
+import time
 import numpy as np
 from core.memory import Memory
 from core.executor import Executor
+from core.int_instruction_set import RegisterFile
+from core.block_engine import BlockEngine
+from core.aot import load_program
+from core.image_cache import ImageCache
+from core.output import StdoutSink
+from core.elf import read_elf, memory_for, load_segments
 
 class ProgramCounterOverflowError(Exception):
     """Exceção lançada quando o Program Counter excede o limite do segmento de código."""
     pass
 
+class RunResult:
+    """Resultado de `CPU.run`."""
+    __slots__ = ('exit_code', 'instructions', 'seconds', 'pc', 'error', 'limit')
+
+    def __init__(self, exit_code, instructions, seconds, pc, error, limit=None) -> None:
+        self.exit_code = exit_code
+        """Código passado à chamada de sistema de encerramento, ou `None` se o programa não terminou."""
+        self.instructions = instructions
+        """Instruções executadas (`global_counter`), sem contar a chamada de encerramento."""
+        self.seconds = seconds
+        self.pc = pc
+        """PC no fim da execução."""
+        self.error = error
+        """Mensagem do erro que interrompeu a execução, ou `None`."""
+        self.limit = limit
+        """Limite que interrompeu a execução (`'max_instructions'` ou `'max_seconds'`), ou `None`."""
+
+    @property
+    def halted(self):
+        """`True` se o programa terminou pela chamada de sistema de encerramento."""
+        return self.exit_code is not None
+
+    def __repr__(self):
+        limit = f', limit={self.limit!r}' if self.limit else ''
+        return f'RunResult(exit_code={self.exit_code}, instructions={self.instructions}, pc={self.pc:#x}, error={self.error!r}{limit})'
+
+
 class CPU(Executor):
-    def __init__(self, code_path, data_path):
-        self.PC = np.uint32(0)
+    ENGINES = ('step', 'block', 'aot')
+    """
+    Motores de execução:
+    - `step`: executa uma instrução por vez (`Executor.step`);
+    - `block`: executa blocos básicos traduzidos sob demanda (`BlockEngine`);
+    - `aot`: como `block`, mas com o programa inteiro traduzido antecipadamente e guardado em `cache_dir` (`core.aot`).
+    """
+    BACKENDS = ('numpy', 'int')
+    """
+    Representação dos registradores:
+    - `numpy`: array `uint32` operado por `InstructionSet`;
+    - `int`: inteiros Python mascarados para 32 bits (`RegisterFile`), operados por `IntInstructionSet`.
+    """
+    BATCH = 10000
+    """Instruções executadas por `run` entre duas verificações do tempo (`max_seconds`)."""
+
+    def __init__(self, code_path, data_path, engine='step', cache_dir=None, backend='numpy', memory=None, entry=None, image_cache=False, output=None, counters=False, profile=False, timing=False):
+        """
+        `memory` é a memória do sistema (ex.: `PagedMemory`, com outro layout); se `None`, é criada uma `Memory` de 16 KiB.
+        O PC começa em `entry` (padrão: `memory.text_base`) e, se `memory.stack_top` não for `None`, o `sp` começa nesse endereço.
+        Com `image_cache`, os arquivos do programa são lidos da cache de imagens em `cache_dir` (`core.image_cache`) em vez de convertidos novamente.
+        `output` recebe a saída do programa e as mensagens de `run` (ver `core.output`); o padrão é um `StdoutSink`, esvaziado no fim de `run`.
+        Com `counters`, o mix de instruções executadas fica em `stats` (ver `core.stats`); com `profile`, as execuções de cada PC
+        e a pilha de chamadas ficam em `profiler` (ver `core.profiler`); com `timing`, os tempos das etapas do ciclo de instrução
+        ficam em `timing` (ver `core.timing`).
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend de registradores não reconhecido: {backend}")
+        if memory is None:
+            memory = Memory()
+        if entry is None:
+            entry = memory.text_base
+        self.entry = entry
+        self.PC = np.uint32(entry) if backend == 'numpy' else entry
         """Program Counter. Endereço da próxima instrução a ser executada."""
-        self.xregs = np.zeros(32, dtype=np.uint32)
+        self.xregs = np.zeros(32, dtype=np.uint32) if backend == 'numpy' else RegisterFile()
         """Banco de registradores. Cada registrador é um inteiro de 32 bits sem sinal."""
+        self.initial_registers = {} if memory.stack_top is None else {2: memory.stack_top}
+        """Valores iniciais dos registradores que não começam zerados (`sp` e, em executáveis ELF, `gp`)."""
+        for reg, value in self.initial_registers.items():
+            self.xregs[reg] = value
 
-        memory = Memory()
         # Carregar os dados do programa na memória:
-        memory.load_mem(code_path, data_path)
-        super().__init__(self.xregs, memory, self.PC) # Inicializa o Executor com o banco de registradores e a memória
+        memory.load_mem(code_path, data_path, cache=ImageCache(cache_dir) if image_cache else None)
+        super().__init__(self.xregs, memory, self.PC, counters, profile, timing) # Inicializa o Executor com o banco de registradores e a memória
+        self.output = self.instruction_set.output = StdoutSink() if output is None else output
+        self.exit_code = None
+        self.error = None
+
+        if engine not in self.ENGINES:
+            raise ValueError(f"Motor de execução não reconhecido: {engine}")
+        self.engine = engine
+        self.block_engine = BlockEngine(self) if engine in ('block', 'aot') else None
+        if engine == 'aot' and not counters: # Os blocos do módulo AOT não têm contadores: com `counters`, são traduzidos sob demanda
+            load_program(self.block_engine, cache_dir) # Decodifica o .text apenas se o módulo ainda não está na cache
+        else:
+            self.predecode()                           # Decodifica todo o .text de uma vez
 
-    def run(self):
+    @classmethod
+    def from_elf(cls, elf_path, engine='step', cache_dir=None, backend='numpy', memory=None, output=None, counters=False, profile=False,
+                 timing=False):
         """
-        Executa o programa até encontrar uma chamada de sistema para encerramento, ou até o pc ultrapassar o limite do segmento de código (2k words).
+        Cria a CPU com o executável ELF32 RISC-V `elf_path` (ver `core.elf`).\n
+        Os segmentos `PT_LOAD` são copiados para `memory` (padrão: uma `PagedMemory` com o .text no segmento executável do arquivo),
+        o PC começa no ponto de entrada e o `gp` recebe o símbolo `__global_pointer$`, se existir.
         """
-        try:
-            while True:
-                self.step()
-                # if self.PC >= 2048 * 4: # 2k words
-                #     raise ProgramCounterOverflowError("Profram Counter ultrapassou o limite do segmento de código.")
-        except ProgramCounterOverflowError as e:
-            print(e)
-        except SystemExit as e:
-            print(f"System Exit: {e}")
-        except Exception as e:
-            print(f"Erro inesperado: {e}")
+        image = read_elf(elf_path)
+        if memory is None:
+            memory = memory_for(image)
+        memory.remap_low = False # Os ajustes do `lw` e do `ecall` são dos arquivos do RARS, não de executáveis ligados em qualquer endereço
+        load_segments(image, memory)
+        cpu = cls(None, None, engine, cache_dir, backend, memory, entry=image.entry, output=output, counters=counters,
+                  profile=profile, timing=timing)
+        if '__global_pointer$' in image.symbols:
+            cpu.initial_registers[3] = cpu.xregs[3] = image.symbols['__global_pointer$']
+        if cpu.profiler is not None:
+            cpu.profiler.add_symbols(image.symbols)
+        return cpu
 
+    def reset(self):
+        """
+        Volta os registradores, o PC e os contadores ao estado inicial, sem alterar a memória.\n
+        As instruções decodificadas e os blocos traduzidos são mantidos (ver `core.sweep`).
+        """
+        for reg in range(32):
+            self.xregs[reg] = self.initial_registers.get(reg, 0)
+        self.PC = self.pc = np.uint32(self.entry) if isinstance(self.xregs, np.ndarray) else self.entry
+        self.global_counter = 0
+        self.instruction_set.exit_code = self.exit_code = None
+        self.error = None
+        if self.stats is not None:
+            self.stats.clear()
+        if self.profiler is not None:
+            self.profiler.clear()
+        if self.timing is not None:
+            self.timing.clear()
+
+    def run_batch(self, n):
+        """
+        Executa até `n` instruções e retorna quantas foram executadas; para antes se o programa encerrar.\n
+        Não há tratamento de exceções nem verificação de tempo dentro do laço: um erro de execução é propagado para quem chamou.
+        Com os motores por blocos, um bloco que não cabe no restante do lote é executado instrução a instrução.
+        A saída do programa não é esvaziada ao fim do lote (ver `output.flush()`).
+        """
+        start = self.global_counter
+        isa = self.instruction_set
+        if isa.exit_code is not None:
+            return 0
+        if self.block_engine is not None:
+            self.block_engine.run(n)
+        else:
+            step = self.step
+            for _ in range(n):
+                step()
+                if isa.exit_code is not None:
+                    break
+        return self.global_counter - start
+
+    def run(self, max_instructions=None, max_seconds=None) -> RunResult:
+        """
+        Executa o programa até a chamada de sistema de encerramento ou até um erro, e retorna o `RunResult` da execução.\n
+        O encerramento não usa exceções: `ecall` define `instruction_set.exit_code` e o laço termina. O código de saída e a mensagem
+        de um erro de execução também ficam em `exit_code` e `error`.\n
+        `max_instructions` e `max_seconds` limitam esta chamada: ao atingir um deles, a execução para com `RunResult.limit` indicando
+        o limite, e uma nova chamada a `run` continua de onde parou. O programa é executado em lotes de até `BATCH` instruções
+        (`run_batch`), e o tempo é verificado apenas entre os lotes.
+        """
+        isa = self.instruction_set
+        run_batch = self.run_batch
+        batch = self.BATCH
+        self.error = None
+        limit = None
+        start = time.perf_counter()
+        if isa.exit_code is None:
+            deadline = None if max_seconds is None else start + max_seconds
+            end = None if max_instructions is None else self.global_counter + max_instructions
+            try:
+                while isa.exit_code is None:
+                    n = batch
+                    if end is not None:
+                        n = min(n, end - self.global_counter)
+                        if n <= 0:
+                            limit = 'max_instructions'
+                            break
+                    run_batch(n)
+                    if deadline is not None and isa.exit_code is None and time.perf_counter() >= deadline:
+                        limit = 'max_seconds'
+                        break
+            except ProgramCounterOverflowError as e:
+                self.error = str(e)
+                self.output.write(f"{e}\n")
+            except Exception as e:
+                self.error = str(e)
+                self.output.write(f"Erro inesperado: {e}\n")
+            except BaseException: # Ex.: KeyboardInterrupt em um laço infinito: a saída já produzida não se perde
+                self.output.flush()
+                raise
+        if self.profiler is not None:
+            self.profiler.flush() # Antes do ajuste do contador: o perfil inclui a chamada de encerramento, como `pc_counts`
+        if isa.exit_code is not None and self.exit_code is None: # Encerramento ainda não registrado (também por `run_batch`)
+            self.global_counter -= 1 # A chamada de encerramento não é contada
+            if self.profiler is not None:
+                self.profiler.mark = self.global_counter # ... mas já foi atribuída à pilha corrente do perfil
+            self.output.write(f"System Exit: {isa.exit_code}\n")
+        self.output.flush()
+        self.exit_code = isa.exit_code
+        return RunResult(self.exit_code, self.global_counter, time.perf_counter() - start, int(self.pc), self.error, limit)
 
 """
 Os registradores pc e ri, e também os campos da instrução (opcode, rs1, rs2, rd,
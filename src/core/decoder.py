@@ -1,7 +1,12 @@
 """
 Módulo para decodificar instruções do conjunto RV32I.\n
 A partir da instrução em binário, extrai os campos da instrução e determina seu formato.\n
-O retorno é no padrão:
+`Decoder.decode_ins` retorna um `DecodedInstruction`, registro de layout fixo usado pelo `Executor`.
+Os imediatos dos formatos I, S, B e J já saem com o sinal estendido, prontos para somar; o do formato U é o campo de 20 bits.
+`DecodedInstruction.resolve` completa o registro com o valor que depende do endereço da instrução (destino de desvios, resultado de `lui`/`auipc`).
+`Decoder.decode_array` decodifica um vetor inteiro de instruções (ex.: todo o segmento .text) com operações vetorizadas do NumPy,
+retornando um array estruturado com o formato `DECODED_DTYPE`.
+`Decoder.decode` mantém o retorno antigo, no padrão:
 ```python
 {
     'opcode': opcode,
@@ -23,6 +28,98 @@ O retorno é no padrão:
 
 import numpy as np
 
+FORMATS = (None, 'R_FORMAT', 'I_FORMAT', 'S_FORMAT', 'B_FORMAT', 'U_FORMAT', 'J_FORMAT')
+"""Formatos de instrução, na ordem do campo `format` de `DECODED_DTYPE`. O índice 0 indica opcode não reconhecido."""
+
+DECODED_DTYPE = np.dtype([
+    ('word', np.uint32),
+    ('format', np.uint8),
+    ('opcode', np.uint8),
+    ('rd', np.uint8),
+    ('rs1', np.uint8),
+    ('rs2', np.uint8),
+    ('funct3', np.uint8),
+    ('funct7', np.uint8),
+    ('key', np.int32),
+    ('imm_i', np.int32),
+    ('imm_s', np.int32),
+    ('imm_b', np.int32),
+    ('imm_u', np.int32),
+    ('imm_j', np.int32),
+])
+"""Layout de cada instrução decodificada por `Decoder.decode_array`: a palavra original, o índice em `FORMATS`, os campos e todos os imediatos."""
+
+def pack_key(opcode, funct3, funct7):
+    """Empacota `opcode`, `funct3` e `funct7` na chave de 17 bits da tabela de despacho do `Executor`: `funct7 | funct3 | opcode`."""
+    return opcode | (funct3 << 7) | (funct7 << 10)
+
+
+class DecodedInstruction:
+    """
+    Instrução decodificada com layout fixo (`__slots__`).\n
+    O imediato de cada formato fica em `imm`, `key` é a chave de despacho (ver `pack_key`) e `handler` guarda a função
+    do `Executor` que executa a instrução, resolvida uma única vez quando a instrução entra na cache de decodificação.
+    `target` é preenchido por `resolve`.
+    """
+    __slots__ = ('opcode', 'rd', 'rs1', 'rs2', 'funct3', 'funct7', 'imm', 'ins_format', 'key', 'handler', 'target')
+
+    FIELDS = {
+        'R_FORMAT': ('opcode', 'funct7', 'rs2', 'rs1', 'funct3', 'rd', 'ins_format'),
+        'I_FORMAT': ('opcode', 'funct7', 'imm12_i', 'rs1', 'funct3', 'rd', 'ins_format'),
+        'S_FORMAT': ('opcode', 'imm12_s', 'rs2', 'rs1', 'funct3', 'ins_format'),
+        'B_FORMAT': ('opcode', 'imm13', 'rs2', 'rs1', 'funct3', 'ins_format'),
+        'U_FORMAT': ('opcode', 'imm20_u', 'rd', 'ins_format'),
+        'J_FORMAT': ('opcode', 'imm21', 'rs1', 'rd', 'ins_format'),
+    }
+    """Campos presentes no dicionário de cada formato, na ordem de `Decoder.decode`."""
+    IMM_KEYS = {'imm12_i', 'imm12_s', 'imm13', 'imm20_u', 'imm21'}
+
+    def __init__(self, opcode, rd, rs1, rs2, funct3, funct7, imm, ins_format) -> None:
+        self.opcode = opcode
+        self.rd = rd
+        self.rs1 = rs1
+        self.rs2 = rs2
+        self.funct3 = funct3
+        self.funct7 = funct7
+        self.imm = imm
+        self.ins_format = ins_format
+        self.key = pack_key(opcode or 0, funct3 or 0, funct7 or 0)
+        self.handler = None
+        self.target = None
+
+    def resolve(self, address):
+        """
+        Calcula `target` para a instrução no endereço `address`:
+        - formatos B e J: endereço de destino do desvio (`address + imm`);
+        - `lui`: `imm << 12`; `auipc`: `address + (imm << 12)`, em 32 bits.
+        """
+        match self.ins_format:
+            case 'B_FORMAT' | 'J_FORMAT':
+                self.target = address + self.imm
+            case 'U_FORMAT':
+                upper = self.imm << 12
+                self.target = upper if self.opcode == 0x37 else (address + upper) & 0xffffffff
+
+    def as_dict(self) -> dict:
+        """Converte o registro para o dicionário retornado por `Decoder.decode`."""
+        return {
+            key: (self.imm if key in self.IMM_KEYS else getattr(self, key))
+            for key in self.FIELDS[self.ins_format]
+        }
+
+    @classmethod
+    def from_dict(cls, ic: dict):
+        """Constrói o registro a partir de um dicionário no formato de `Decoder.decode`. Campos ausentes ficam `None`."""
+        imm = None
+        for key in cls.IMM_KEYS:
+            if key in ic:
+                imm = ic[key]
+        return cls(
+            ic.get('opcode'), ic.get('rd'), ic.get('rs1'), ic.get('rs2'),
+            ic.get('funct3'), ic.get('funct7'), imm, ic.get('ins_format'),
+        )
+
+
 class Decoder:
     """Classe para decodificar instruções do conjunto RV32I."""
 
@@ -30,7 +127,13 @@ class Decoder:
         pass
 
     def decode(self, instruction):
-        """Extrai os campos da instrução e determina seu formato."""
+        """Extrai os campos da instrução e determina seu formato. Retorna um dicionário (ver docstring do módulo)."""
+        return self.decode_ins(instruction).as_dict()
+
+    def decode_ins(self, instruction) -> DecodedInstruction:
+        """Extrai os campos da instrução e determina seu formato. Retorna um `DecodedInstruction`."""
+        instruction = int(instruction)
+        signed = (instruction ^ 0x80000000) - 0x80000000 # Instrução interpretada como inteiro de 32 bits com sinal
 
         # Extrai os campos da instrução:
         opcode = instruction & 0x7F
@@ -40,69 +143,78 @@ class Decoder:
         funct3 = (instruction >> 12) & 0x7
         funct7 = (instruction >> 25)
 
-        if opcode in [0x33, 0x3B]:  # R-type
-            ins_format = 'R_FORMAT'
-            return {
-                'opcode': opcode,
-                'funct7': funct7,
-                'rs2': rs2,
-                'rs1': rs1,
-                'funct3': funct3,
-                'rd': rd,
-                'ins_format': ins_format,
-            }
-        elif opcode in [0x13, 0x67, 0x03, 0x73]:  # I-type
-            ins_format = 'I_FORMAT'
-            imm12_i = np.int32(instruction) >> 20
-            return {
-                'opcode': opcode,
-                'funct7': funct7,
-                'imm12_i': imm12_i,
-                'rs1': rs1,
-                'funct3': funct3,
-                'rd': rd,
-                'ins_format': ins_format,
-            }
-        elif opcode in [0x23]:  # S-type
-            ins_format = 'S_FORMAT'
-            imm12_s = ((np.int32(instruction) >> 25) << 5) | ((instruction >> 7) & 0x1F)
-            return {
-                'opcode': opcode,
-                'imm12_s': imm12_s,
-                'rs2': rs2,
-                'rs1': rs1,
-                'funct3': funct3,
-                'ins_format': ins_format,
-            }
-        elif opcode in [0x63]: # B-type
-            ins_format = 'B_FORMAT'
-            imm13 = ((np.int32(instruction) >> 31) << 12) | (((instruction >> 25) & 0x3F) << 5) | (((instruction >> 8) & 0xF) << 1) | ((instruction >> 7) & 0x1)
-            return {
-                'opcode': opcode,
-                'imm13': imm13,
-                'rs2': rs2,
-                'rs1': rs1,
-                'funct3': funct3,
-                'ins_format': ins_format,
-            }
-        elif opcode in [0x37, 0x17]:  # U-type
-            ins_format = 'U_FORMAT'
+        if opcode in (0x33, 0x3B):  # R-type
+            return DecodedInstruction(opcode, rd, rs1, rs2, funct3, funct7, None, 'R_FORMAT')
+        elif opcode in (0x13, 0x67, 0x03, 0x73):  # I-type
+            imm12_i = signed >> 20
+            return DecodedInstruction(opcode, rd, rs1, None, funct3, funct7, imm12_i, 'I_FORMAT')
+        elif opcode == 0x23:  # S-type
+            imm12_s = ((signed >> 25) << 5) | ((instruction >> 7) & 0x1F)
+            return DecodedInstruction(opcode, None, rs1, rs2, funct3, None, imm12_s, 'S_FORMAT')
+        elif opcode == 0x63: # B-type
+            imm13 = ((signed >> 31) << 12) | (((instruction >> 7) & 0x1) << 11) | (((instruction >> 25) & 0x3F) << 5) | (((instruction >> 8) & 0xF) << 1)
+            return DecodedInstruction(opcode, None, rs1, rs2, funct3, None, imm13, 'B_FORMAT')
+        elif opcode in (0x37, 0x17):  # U-type
             imm20_u = instruction >> 12 #& 0xFFFFF000
-            return {
-                'opcode': opcode,
-                'imm20_u': imm20_u,
-                'rd': rd,
-                'ins_format': ins_format,
-            }
-        elif opcode in [0x6F]:  # J-type
-            ins_format = 'J_FORMAT'
-            imm21 = ((instruction >> 31) << 20) | (((instruction >> 12) & 0xFF) << 12) | (((instruction >> 20) & 0x1) << 11) | (((instruction >> 21) & 0x3FF) << 1)
-            return {
-                'opcode': opcode,
-                'imm21': imm21,
-                'rs1': rs1,
-                'rd': rd,
-                'ins_format': ins_format,
-            }
+            return DecodedInstruction(opcode, rd, None, None, None, None, imm20_u, 'U_FORMAT')
+        elif opcode == 0x6F:  # J-type
+            imm21 = ((signed >> 31) << 20) | (((instruction >> 12) & 0xFF) << 12) | (((instruction >> 20) & 0x1) << 11) | (((instruction >> 21) & 0x3FF) << 1)
+            return DecodedInstruction(opcode, rd, rs1, None, None, None, imm21, 'J_FORMAT')
         else:
             raise ValueError(f"Opcode não reconhecido: {bin(opcode)}")
+
+    def decode_array(self, words) -> np.ndarray:
+        """
+        Decodifica todas as instruções de `words` (vetor de `uint32`) de uma vez, com as mesmas regras de `decode_ins`.\n
+        Retorna um array estruturado (`DECODED_DTYPE`) com uma linha por instrução; linhas com `format == 0` têm opcode não reconhecido.
+        """
+        w = np.asarray(words, dtype=np.uint32).astype(np.int64)
+        signed = np.asarray(words, dtype=np.uint32).view(np.int32).astype(np.int64)
+        decoded = np.zeros(len(w), dtype=DECODED_DTYPE)
+        decoded['word'] = w
+        opcode = w & 0x7F
+        decoded['opcode'] = opcode
+        decoded['rd'] = (w >> 7) & 0x1F
+        decoded['rs1'] = (w >> 15) & 0x1F
+        decoded['rs2'] = (w >> 20) & 0x1F
+        decoded['funct3'] = (w >> 12) & 0x7
+        decoded['funct7'] = w >> 25
+        decoded['key'] = opcode | (((w >> 12) & 0x7) << 7) | ((w >> 25) << 10)
+        decoded['imm_i'] = signed >> 20
+        decoded['imm_s'] = ((signed >> 25) << 5) | ((w >> 7) & 0x1F)
+        decoded['imm_b'] = ((signed >> 31) << 12) | (((w >> 7) & 0x1) << 11) | (((w >> 25) & 0x3F) << 5) | (((w >> 8) & 0xF) << 1)
+        decoded['imm_u'] = w >> 12
+        decoded['imm_j'] = ((signed >> 31) << 20) | (((w >> 12) & 0xFF) << 12) | (((w >> 20) & 0x1) << 11) | (((w >> 21) & 0x3FF) << 1)
+        decoded['format'] = np.select(
+            [np.isin(opcode, (0x33, 0x3B)), np.isin(opcode, (0x13, 0x67, 0x03, 0x73)), opcode == 0x23,
+             opcode == 0x63, np.isin(opcode, (0x37, 0x17)), opcode == 0x6F],
+            [1, 2, 3, 4, 5, 6],
+            default=0,
+        )
+        return decoded
+
+    def records(self, decoded) -> list:
+        """Converte as linhas de `decode_array` em `DecodedInstruction` (ou `None`, para opcode não reconhecido), iguais aos de `decode_ins`."""
+        columns = {name: decoded[name].tolist() for name in DECODED_DTYPE.names}
+        records = []
+        for i, fmt in enumerate(columns['format']):
+            opcode = columns['opcode'][i]
+            rd, rs1, rs2 = columns['rd'][i], columns['rs1'][i], columns['rs2'][i]
+            funct3, funct7 = columns['funct3'][i], columns['funct7'][i]
+            match FORMATS[fmt]:
+                case 'R_FORMAT':
+                    ic = DecodedInstruction(opcode, rd, rs1, rs2, funct3, funct7, None, 'R_FORMAT')
+                case 'I_FORMAT':
+                    ic = DecodedInstruction(opcode, rd, rs1, None, funct3, funct7, columns['imm_i'][i], 'I_FORMAT')
+                case 'S_FORMAT':
+                    ic = DecodedInstruction(opcode, None, rs1, rs2, funct3, None, columns['imm_s'][i], 'S_FORMAT')
+                case 'B_FORMAT':
+                    ic = DecodedInstruction(opcode, None, rs1, rs2, funct3, None, columns['imm_b'][i], 'B_FORMAT')
+                case 'U_FORMAT':
+                    ic = DecodedInstruction(opcode, rd, None, None, None, None, columns['imm_u'][i], 'U_FORMAT')
+                case 'J_FORMAT':
+                    ic = DecodedInstruction(opcode, rd, rs1, None, None, None, columns['imm_j'][i], 'J_FORMAT')
+                case _:
+                    ic = None
+            records.append(ic)
+        return records
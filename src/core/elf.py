@@ -0,0 +1,107 @@
+"""
+Carregamento de executáveis ELF32 RISC-V (little-endian).\n
+`read_elf` lê os cabeçalhos com `struct`: o ponto de entrada, os segmentos `PT_LOAD` e a tabela de símbolos (se existir).
+`load_segments` copia cada segmento de uma vez para a memória (`Memory.write_bytes`/`PagedMemory.write_bytes`),
+completando com zeros a parte que não está no arquivo (`.bss`).
+`memory_for` cria uma `PagedMemory` com o .text no segmento executável do arquivo.\n
+O `sp` inicial vem do símbolo `__stack_top` (se existir) ou do `stack_top` da memória; o `gp`, do símbolo `__global_pointer$`.
+"""
+
+import struct
+from core.paged_memory import PagedMemory
+
+ELF_MAGIC = b'\x7fELF'
+EM_RISCV = 243
+PT_LOAD = 1
+PF_X = 0x1
+SHT_SYMTAB = 2
+STACK_TOP = 0x7ffffff0
+"""`sp` inicial padrão de programas ELF (alinhado em 16 bytes, como pede a ABI)."""
+
+_HEADER = struct.Struct('<16sHHIIIIIHHHHHH')
+_PROGRAM_HEADER = struct.Struct('<IIIIIIII')
+_SECTION_HEADER = struct.Struct('<IIIIIIIIII')
+_SYMBOL = struct.Struct('<IIIBBH')
+
+class Segment:
+    """Segmento `PT_LOAD`: endereço virtual, bytes do arquivo, tamanho na memória e flags (`PF_X`, `PF_W`, `PF_R`)."""
+    __slots__ = ('vaddr', 'data', 'memsz', 'flags')
+
+    def __init__(self, vaddr, data, memsz, flags) -> None:
+        self.vaddr = vaddr
+        self.data = data
+        self.memsz = memsz
+        self.flags = flags
+
+
+class ElfImage:
+    """Conteúdo de um executável ELF32 RISC-V: ponto de entrada, segmentos carregáveis e símbolos (nome -> endereço)."""
+    def __init__(self, entry, segments, symbols) -> None:
+        self.entry = entry
+        self.segments = segments
+        self.symbols = symbols
+
+    def text_range(self):
+        """Intervalo `[início, fim)` coberto pelos segmentos executáveis."""
+        executable = [s for s in self.segments if s.flags & PF_X] or self.segments
+        return min(s.vaddr for s in executable), max(s.vaddr + s.memsz for s in executable)
+
+
+def read_elf(path) -> ElfImage:
+    """Lê o executável ELF32 RISC-V `path`. Lança `ValueError` se o arquivo não for um ELF32 little-endian para RISC-V."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size or data[:4] != ELF_MAGIC:
+        raise ValueError(f"{path} não é um arquivo ELF.")
+    (ident, _, machine, _, entry, phoff, shoff, _, _, phentsize, phnum, shentsize, shnum, _) = _HEADER.unpack_from(data)
+    if ident[4] != 1:
+        raise ValueError("Apenas ELF de 32 bits é suportado.")
+    if ident[5] != 1:
+        raise ValueError("Apenas ELF little-endian é suportado.")
+    if machine != EM_RISCV:
+        raise ValueError(f"O ELF não é RISC-V (e_machine = {machine}).")
+
+    view = memoryview(data) # Segmentos referenciam os bytes do arquivo, sem cópia
+    segments = []
+    for i in range(phnum):
+        p_type, offset, vaddr, _, filesz, memsz, flags, _ = _PROGRAM_HEADER.unpack_from(data, phoff + i * phentsize)
+        if p_type == PT_LOAD and memsz > 0:
+            segments.append(Segment(vaddr, view[offset:offset + filesz], memsz, flags))
+    if not segments:
+        raise ValueError("O ELF não tem segmentos PT_LOAD.")
+    return ElfImage(entry, segments, _read_symbols(data, shoff, shentsize, shnum))
+
+def _read_symbols(data, shoff, shentsize, shnum):
+    '''Símbolos da primeira seção `SHT_SYMTAB`, como um dicionário nome -> endereço.'''
+    sections = [_SECTION_HEADER.unpack_from(data, shoff + i * shentsize) for i in range(shnum)] if shoff else []
+    for _, sh_type, _, _, offset, size, link, _, _, entsize in sections:
+        if sh_type != SHT_SYMTAB:
+            continue
+        strtab_offset, strtab_size = sections[link][4], sections[link][5]
+        strtab = data[strtab_offset:strtab_offset + strtab_size]
+        symbols = {}
+        for position in range(offset, offset + size, entsize or _SYMBOL.size):
+            name, value, _, _, _, _ = _SYMBOL.unpack_from(data, position)
+            if name:
+                symbols[strtab[name:strtab.index(b'\0', name)].decode(errors='replace')] = value
+        return symbols
+    return {}
+
+def memory_for(image, stack_top=STACK_TOP, page_bits=12) -> PagedMemory:
+    '''
+    Cria a `PagedMemory` para o executável `image`: o .text é o intervalo dos segmentos executáveis e o .data começa no
+    menor segmento não executável (ou no fim do .text, se não houver). Os ajustes de endereços baixos do `lw` e do `ecall`
+    (`remap_low`, pensados para os arquivos do RARS) ficam desligados.
+    '''
+    text_start, text_end = image.text_range()
+    text_start, text_end = text_start & ~3, (text_end + 3) & ~3 # .text em palavras inteiras
+    data = [s.vaddr for s in image.segments if not s.flags & PF_X]
+    return PagedMemory(text_base=text_start, data_base=min(data, default=text_end), text_size=text_end - text_start,
+                       stack_top=image.symbols.get('__stack_top', stack_top), page_bits=page_bits, remap_low=False)
+
+def load_segments(image, memory):
+    '''Copia os segmentos `PT_LOAD` de `image` para `memory`, zerando o restante de cada segmento (`.bss`).'''
+    for segment in image.segments:
+        memory.write_bytes(segment.vaddr, segment.data)
+        if segment.memsz > len(segment.data):
+            memory.write_bytes(segment.vaddr + len(segment.data), bytes(segment.memsz - len(segment.data)))
@@ -3,25 +3,92 @@ Módulo de execução das instruções do RISC-V.\n
 É responsável por:
 - Buscar a instrução na memória;
 - Decodificar a instrução por meio do módulo `Decoder`;
-- Executar a instrução de acordo com o formato.
+- Executar a instrução por meio da tabela de despacho.
+
+As instruções decodificadas do segmento .text ficam guardadas em uma cache indexada pelo endereço da palavra,
+preenchida na primeira execução de cada endereço. Escritas na memória que atingem o .text invalidam a entrada correspondente.
+
+A tabela de despacho é uma lista plana indexada pela chave `funct7 | funct3 | opcode` (ver `decoder.pack_key`),
+montada uma única vez na construção do `Executor`. Cada entrada é uma `Operation`, que liga o método de `InstructionSet`
+ao extrator dos seus operandos. Campos que não selecionam a operação (ex.: `funct7` de instruções do tipo I, que faz parte do imediato)
+são preenchidos com a mesma entrada para todos os valores possíveis, de forma que a execução é sempre um único acesso indexado.
 """
 
 from core.instruction_set import InstructionSet
-from core.decoder import Decoder
-import numpy as np
+from core.int_instruction_set import IntInstructionSet, RegisterFile
+from core.decoder import Decoder, DecodedInstruction, pack_key
+from core.stats import InstructionStats
+from core.profiler import Profiler, transfer
+from core.timing import Timing
+from time import perf_counter_ns
+
+FUNCT3_ANY = range(8)
+FUNCT7_ANY = range(128)
+
+class Operation:
+    """
+    Entrada da tabela de despacho.\n
+    - `name`: mnemônico da instrução;
+    - `handler`: método de `InstructionSet` (ou do `Executor`) que executa a instrução;
+    - `extractor`: operandos passados a `handler`, nomeados pelos campos do `DecodedInstruction` (`->pc` indica que o retorno é o novo PC);
+    - `run`: função que recebe o `DecodedInstruction` e executa `handler` com os operandos extraídos;
+    - `resolved`: versão de `run` para instruções já resolvidas por `DecodedInstruction.resolve`, que usa `target` e não repete
+      as verificações feitas na decodificação (ex.: alinhamento do destino de desvios), ou `None`.
+    """
+    __slots__ = ('name', 'handler', 'extractor', 'run', 'resolved')
+
+    def __init__(self, name, handler, extractor, run) -> None:
+        self.name = name
+        self.handler = handler
+        self.extractor = extractor
+        self.run = run
+        self.resolved = None
+
 
 class Executor:
     """
-    Função execute(): executa a instrução que foi lida pela função `fetch()` e decodificada por `Decoder.decode()`.
+    Função execute(): executa a instrução que foi lida pela função `fetch()` e decodificada por `Decoder.decode()`.\n
+    Com `counters`, `step` passa a contar as instruções retiradas por operação em `stats` (ver `core.stats`); com `profile`,
+    conta as execuções de cada PC e acompanha a pilha de chamadas em `profiler` (ver `core.profiler`); com `timing`, mede o tempo
+    de cada etapa do ciclo de instrução em `timing` (ver `core.timing`).
     """
-    def __init__(self, registers, memory, pc) -> None:
+    def __init__(self, registers, memory, pc, counters=False, profile=False, timing=False) -> None:
         self.global_counter = 0
         self.ins_flag = ''
         self.xregs = registers
         self.memory = memory
         self.pc = pc
         self.decoder = Decoder()
-        self.instruction_set = InstructionSet(self.xregs, self.memory)
+        # O conjunto de instruções segue a representação do banco de registradores
+        instruction_set = IntInstructionSet if isinstance(registers, RegisterFile) else InstructionSet
+        self.instruction_set = instruction_set(self.xregs, self.memory)
+        self.dispatch = self._build_dispatch()
+        """Tabela de despacho: `Operation` de cada chave `funct7 | funct3 | opcode`, ou `None` se a instrução não existe."""
+        self.stats = InstructionStats(self.dispatch) if counters else None
+        """Contadores do mix de instruções, ou `None` sem `counters`."""
+        if counters:
+            self.operation_ids = self.stats.ids
+            self.retired = self.stats.retired
+            self.step = self._counting_step
+        self.timing = Timing(self.dispatch) if timing else None
+        """Tempos das etapas do ciclo de instrução, ou `None` sem `timing`."""
+        if timing:
+            self.step = self._timed_step
+            self.predecode = self._timed_predecode
+        self.text_base = memory.text_base
+        self.decode_cache = [None] * ((memory.text_extent() - memory.text_base) >> 2)
+        """
+        Instruções já decodificadas do segmento .text, indexadas por `(pc - text_base) >> 2`. Cobre apenas a parte do .text que
+        contém o programa (`memory.text_extent()`); instruções fora dela são decodificadas a cada execução.
+        """
+        self.profiler = Profiler(self) if profile else None
+        """Perfil por PC e pilha de chamadas, ou `None` sem `profile`."""
+        if profile:
+            self._profiled_step = self.step
+            self.step = self._profiling_step
+        self.decoded_text = None
+        """Decodificação vetorizada do .text feita por `predecode` (array estruturado `decoder.DECODED_DTYPE`)."""
+        memory.text_watchers.append(self.invalidate)
 
     def fetch(self):
         '''Lê a instrução da memória e incrementa o PC.'''
@@ -29,295 +96,331 @@ class Executor:
         self.pc += 4
         return instruction
 
-    def execute(self, ic: dict[str]):
+    def execute(self, ic):
         '''
-        Executa a instrução de acordo com o formato.\n
-        `ic` é a instrução decodificada, que contém os campos da instrução e seu formato.
+        Executa a instrução por meio da tabela de despacho.\n
+        `ic` é a instrução decodificada (`DecodedInstruction` ou o dicionário de `Decoder.decode`), que contém os campos da instrução e seu formato.
         '''
-        match ic['ins_format']:
-            case 'R_FORMAT':
-                self.ins_flag = 'R_FORMAT'
-                self.execute_r(ic)
-            case 'I_FORMAT':
-                self.ins_flag = 'I_FORMAT'
-                self.execute_i(ic)
-            case 'S_FORMAT':
-                self.ins_flag = 'S_FORMAT'
-                self.execute_s(ic)
-            case 'B_FORMAT':
-                self.ins_flag = 'B_FORMAT'
-                self.execute_b(ic)
-            case 'U_FORMAT':
-                self.ins_flag = 'U_FORMAT'
-                self.execute_u(ic)
-            case 'J_FORMAT':
-                self.ins_flag = 'J_FORMAT'
-                self.execute_j(ic)
-            case _:
-                raise ValueError(f"Formato de instrução não reconhecido: {ic['ins_format']}")
+        if isinstance(ic, dict):
+            ic = DecodedInstruction.from_dict(ic)
+        operation = self.lookup(ic)
+        self.ins_flag = ic.ins_format
+        operation.run(ic)
+
+    def lookup(self, ic) -> Operation:
+        '''Retorna a `Operation` da instrução decodificada `ic`.'''
+        operation = self.dispatch[ic.key]
+        if operation is None:
+            raise ValueError(f"Instrução não reconhecida: opcode={ic.opcode}, funct3={ic.funct3}, funct7={ic.funct7}")
+        return operation
+
+    def decode(self, instruction, address=None) -> DecodedInstruction:
+        '''
+        Decodifica a instrução do endereço `address` e associa a ela a função de execução da tabela de despacho.\n
+        Se `address` não for informado, a instrução é a última lida por `fetch()` (`pc - 4`).
+        '''
+        ic = self.decoder.decode_ins(instruction)
+        self._prepare(ic, self.pc - 4 if address is None else address)
+        return ic
+
+    def _prepare(self, ic, address):
+        '''
+        Resolve `ic` para o endereço `address` e escolhe sua função de execução.\n
+        Desvios com imediato desalinhado ficam com a versão completa (`Operation.run`), que lança o erro quando a instrução é executada.
+        '''
+        operation = self.lookup(ic)
+        ic.resolve(int(address))
+        if operation.resolved is not None and (ic.ins_format == 'U_FORMAT' or ic.imm % 4 == 0):
+            ic.handler = operation.resolved
+        else:
+            ic.handler = operation.run
+        if self.stats is not None and ic.opcode == 0x63: # Desvio condicional: conta quando a condição é verdadeira
+            ic.handler = self._counting_branch(ic.handler, self.stats.ids[ic.key], InstructionStats.CONDITIONS[operation.name])
+
+    def _counting_branch(self, handler, index, condition):
+        '''
+        Envolve a função de execução de um desvio condicional para contar em `stats.taken` as vezes em que é tomado.\n
+        O desvio é tomado quando `condition` é verdadeira para os registradores, como no código dos blocos traduzidos; comparar o PC
+        seguinte com o destino não serve, porque o destino de um desvio com deslocamento 4 é a própria instrução seguinte.
+        '''
+        xregs = self.xregs
+        taken = self.stats.taken
+        def run(ic):
+            if condition(int(xregs[ic.rs1]), int(xregs[ic.rs2])):
+                taken[index] += 1
+            handler(ic)
+        return run
+
+    def predecode(self):
+        '''
+        Decodifica de uma vez (`Decoder.decode_array`) a parte do .text coberta pela cache de decodificação e a preenche.\n
+        O resultado fica em `decoded_text`, um retrato do .text no momento da chamada, que pode ser indexado por `(pc - text_base) >> 2`.
+        Palavras com opcode ou combinação de campos não reconhecidos ficam fora da cache e são tratadas por `step` ao serem executadas.
+        '''
+        self.decoded_text = self.decoder.decode_array(self.memory.text_words(self.text_base + (len(self.decode_cache) << 2)))
+        for index, ic in enumerate(self.decoder.records(self.decoded_text)):
+            if ic is None or self.dispatch[ic.key] is None:
+                continue
+            self._prepare(ic, self.text_base + (index << 2))
+            self.decode_cache[index] = ic
+
+    def instruction_at(self, address) -> DecodedInstruction:
+        '''Retorna a instrução decodificada do endereço `address`, da cache de decodificação se possível. Lança `ValueError` se o opcode não for reconhecido.'''
+        index = (int(address) - self.text_base) >> 2
+        if 0 <= index < len(self.decode_cache) and self.decode_cache[index] is not None:
+            return self.decode_cache[index]
+        ic = self.decoder.decode_ins(self.memory.lw(address))
+        ic.resolve(int(address))
+        return ic
+
+    def invalidate(self, address):
+        '''Descarta a instrução decodificada que contém o byte `address` do segmento .text.'''
+        index = (int(address) - self.text_base) >> 2
+        if 0 <= index < len(self.decode_cache):
+            self.decode_cache[index] = None
 
     def step(self):
-        '''Executa um ciclo de instrução'''
-        instruction = self.fetch()                            # Lê a instrução da memória
-        ic = self.decoder.decode(np.uint32(int(instruction))) # Retorna os campos da instrução e seu formato
-        self.execute(ic)                                      # Executa a instrução
+        '''Executa um ciclo de instrução e retorna a instrução executada.'''
+        index = (int(self.pc) - self.text_base) >> 2
+        if 0 <= index < len(self.decode_cache):
+            ic = self.decode_cache[index]
+            if ic is None:
+                instruction = self.fetch()                # Lê a instrução da memória
+                ic = self.decode(instruction)             # Retorna os campos da instrução e sua função de execução
+                self.decode_cache[index] = ic
+            else:
+                self.pc += 4                              # Mesmo incremento que o fetch() faria
+        else:
+            ic = self.decode(self.fetch())
+        ic.handler(ic)                                    # Executa a instrução
+        self.global_counter += 1
+        return ic
+
+    def _counting_step(self):
+        '''`step` com a contagem da instrução retirada em `stats` (os desvios tomados são contados pelo `_prepare`).'''
+        index = (int(self.pc) - self.text_base) >> 2
+        if 0 <= index < len(self.decode_cache):
+            ic = self.decode_cache[index]
+            if ic is None:
+                ic = self.decode(self.fetch())
+                self.decode_cache[index] = ic
+            else:
+                self.pc += 4
+        else:
+            ic = self.decode(self.fetch())
+        ic.handler(ic)
+        self.global_counter += 1
+        self.retired[self.operation_ids[ic.key]] += 1
+        return ic
+
+    def _timed_step(self):
+        '''`step` com a medição das etapas de busca, decodificação e execução em `timing` (e a contagem de `_counting_step`, se ligada).'''
+        timing = self.timing
+        t0 = perf_counter_ns()
+        index = (int(self.pc) - self.text_base) >> 2
+        cached = 0 <= index < len(self.decode_cache)
+        ic = self.decode_cache[index] if cached else None
+        if ic is not None:
+            self.pc += 4
+            t1 = t2 = perf_counter_ns()
+        else:
+            instruction = self.fetch()
+            t1 = perf_counter_ns()
+            ic = self.decode(instruction)
+            if cached:
+                self.decode_cache[index] = ic
+            t2 = perf_counter_ns()
+            timing.decodes += 1
+        ic.handler(ic)
+        t3 = perf_counter_ns()
         self.global_counter += 1
+        operation = timing.ids[ic.key]
+        timing.handler_ns[operation] += t3 - t2
+        timing.handler_calls[operation] += 1
+        timing.ns['fetch'] += t1 - t0
+        timing.ns['decode'] += t2 - t1
+        timing.ns['execute'] += t3 - t2
+        timing.steps += 1
+        if self.stats is not None:
+            self.retired[operation] += 1 # Os identificadores de `stats` e de `timing` são os mesmos (`operation_ids`)
+        return ic
+
+    def _timed_predecode(self):
+        start = perf_counter_ns()
+        Executor.predecode(self)
+        self.timing.predecode_ns += perf_counter_ns() - start
+
+    def _profiling_step(self):
+        '''`step` (ou `_counting_step`) com a contagem do PC executado e as chamadas e retornos em `profiler`.'''
+        pc = int(self.pc)
+        ic = self._profiled_step()
+        profiler = self.profiler
+        index = (pc - self.text_base) >> 2
+        if 0 <= index < len(profiler.hits):
+            profiler.hits[index] += 1
+        kind = transfer(ic)
+        if kind == 'call':
+            profiler.call(self.pc)
+        elif kind == 'return':
+            profiler.ret()
+        return ic
+
+    def _bind(self, name, handler, extractor) -> Operation:
+        '''Cria a `Operation` que chama `handler` com os operandos na forma `extractor`.'''
+        executor = self
+        match extractor:
+            case 'rd_rs1_rs2':
+                def run(ic): handler(ic.rd, ic.rs1, ic.rs2)
+            case 'rd_rs1_imm':
+                def run(ic): handler(ic.rd, ic.rs1, ic.imm)
+            case 'rs1_imm_rs2':
+                def run(ic): handler(ic.rs1, ic.imm, ic.rs2)
+            case 'rs1_rs2_imm_pc->pc':
+                def run(ic): executor.pc = handler(ic.rs1, ic.rs2, ic.imm, executor.pc)
+            case 'rd_imm_pc':
+                def run(ic): handler(ic.rd, ic.imm, executor.pc)
+            case 'rd_imm':
+                def run(ic): handler(ic.rd, ic.imm)
+            case 'rd_imm_pc->pc':
+                def run(ic): executor.pc = handler(ic.rd, ic.imm, executor.pc)
+            case 'rd_rs1_imm_pc->pc':
+                def run(ic): executor.pc = handler(ic.rd, ic.rs1, ic.imm, executor.pc)
+            case 'imm':
+                def run(ic): handler(ic.imm)
+            case 'rs1_rs2_target_pc->pc':
+                def run(ic): executor.pc = handler(ic.rs1, ic.rs2, ic.target, executor.pc)
+            case 'rd_target_pc->pc':
+                def run(ic): executor.pc = handler(ic.rd, ic.target, executor.pc)
+            case 'rd_target':
+                def run(ic): handler(ic.rd, ic.target)
+            case _:
+                raise ValueError(f"Extrator de operandos não reconhecido: {extractor}")
+        return Operation(name, handler, extractor, run)
+
+    def _resolved(self, operation, handler, extractor) -> Operation:
+        '''Associa a `operation` a versão resolvida que chama `handler` com os operandos na forma `extractor`.'''
+        operation.resolved = self._bind(operation.name, handler, extractor).run
+        return operation
+
+    def _not_implemented(self, name) -> Operation:
+        '''Cria a `Operation` de uma instrução RV32I que não faz parte deste projeto.'''
+        def handler(*_):
+            raise NotImplementedError(f"Instrução {name} não implementada neste projeto!")
+        return Operation(name, handler, None, handler)
+
+    def _invalid(self, message) -> Operation:
+        '''Cria a `Operation` de uma combinação de campos inválida, que lança `ValueError` com `message`.'''
+        def handler(*_):
+            raise ValueError(message)
+        return Operation('invalid', handler, None, handler)
+
+    def _system(self, imm):
+        '''
+        Instruções SYSTEM. Apenas ECALL (imediato 0) é implementada.
+        ```
+        funct12 rs1 funct3 rd opcode
+        12      5   3      5  7
+        ECALL   0   PRIV   0  SYSTEM
+        ```
+        '''
+        if imm == 0x00:
+            self.instruction_set.ecall()
+        else:
+            raise ValueError(f"Imediato não reconhecido: {imm}")
 
-    def execute_r(self, ic):
+    def _build_dispatch(self):
         """
-        Executa instruções do formato R - Registrador para Registrador\n
-        Lê os registradores `rs1` e `rs2`como fonte dos operadores e escreve o resultado no registrador `rd`.\n
-        Os campos `funct7` e `funct3` selecionam o tipo da operação.\n
+        Monta a tabela de despacho.\n
+        Formato R - `funct7` e `funct3` selecionam a operação:
         ```
         funct7  rs2  rs1  funct3        rd  opcode
-        7       5    5    3             5   7
         0000000 src2 src1 ADD/SLT/SLTU dest OP
         0000000 src2 src1 AND/OR/XOR   dest OP
         0000000 src2 src1 SLL/SRL      dest OP     SLL e SRL não implementadas!
         0100000 src2 src1 SUB/SRA      dest OP     SRA não implementada!
         ```
-        """
-        rs1 = ic['rs1']
-        rs2 = ic['rs2']
-        rd = ic['rd']
-        funct3 = ic['funct3']
-        funct7 = ic['funct7']
-        match funct7:
-            case 0x00: # 0000000
-                match funct3:
-                    case 0x00: # 000 ADD
-                        # print("Executando ADD...")
-                        self.instruction_set.add(rd, rs1, rs2)
-                    case 0x01: # 001 SLL
-                        raise NotImplementedError("Instrução SLL não implementada neste projeto!")
-                    case 0x02: # 010 SLT
-                        # print("Executando SLT...")
-                        self.instruction_set.slt(rd, rs1, rs2)
-                    case 0x03: # 011 SLTU
-                        # print("Executando SLTU...")
-                        self.instruction_set.sltu(rd, rs1, rs2)
-                    case 0x04: # 100 XOR
-                        # print("Executando XOR...")
-                        self.instruction_set.xor(rd, rs1, rs2)
-                    case 0x05: # 101 SRL
-                        raise NotImplementedError("Instrução SRL não implementada neste projeto!")
-                    case 0x06: # 110 OR
-                        # print("Executando OR...")
-                        self.instruction_set.or_(rd, rs1, rs2)
-                    case 0x07: # 111 AND
-                        # print("Executando AND...")
-                        self.instruction_set.and_(rd, rs1, rs2)
-                    case _:
-                        raise ValueError(f"funct3 não reconhecido: {funct3}")
-            case 0x20: # 0100000
-                match funct3:
-                    case 0x00: # 000 SUB
-                        # print("Executando SUB...")
-                        self.instruction_set.sub(rd, rs1, rs2)
-                    case 0x05: # 101 SRA
-                        raise NotImplementedError("Instrução SRA não implementada neste projeto!")
-                    case _:
-                        raise ValueError(f"funct3 não reconhecido: {funct3}")
-
-    def execute_i(self, ic):
-        # The immediate opcode OP-IMM==7'b001_0011. When opcode==OP-IMM==7'b001_0011,
-        # it proves that the instruction is an I-type instruction, and the specific behavior of this instruction is determined by the value of funct3.
-        """
-        Executa instruções do formato I - Registrador para Registrador com Imediato\n
-        O campo `funct3` seleciona o tipo da operação.\n
+        Formato I - `funct3` seleciona a operação; `funct7` só importa nos shifts (SRLI/SRAI):
         ```
         imm[11:0]         rs1 funct3        rd   opcode
-        12                5   3             5    7
         I-immediate[11:0] src ADDI/SLTI[U]  dest OP-IMM    SLTI[U] não implementada!
         I-immediate[11:0] src ANDI/ORI/XORI dest OP-IMM    XORI não implementada!
+        0000000 shamt     src SLLI/SRLI     dest OP-IMM
+        0100000 shamt     src SRAI          dest OP-IMM
+        offset[11:0]      base width        dest LOAD      LH e LHU não implementadas!
+        offset[11:0]      base 0            dest JALR
         ```
-        Instruções de shift:
-        ```
-        imm[11:5] imm[4:0]   rs1 funct3 rd   opcode
-        7         5          5   3      5    7
-        0000000   shamt[4:0] src SLLI   dest OP-IMM
-        0000000   shamt[4:0] src SRLI   dest OP-IMM
-        0100000   shamt[4:0] src SRAI   dest OP-IMM
-        ```
-        ECALL:
-        ```
-        funct12 rs1 funct3 rd opcode
-        12      5   3      5  7
-        ECALL   0   PRIV   0  SYSTEM
-        ```
-        """
-        rs1 = ic['rs1']
-        rd = ic['rd']
-        imm = ic['imm12_i']
-        funct3 = ic['funct3']
-        funct7 = ic['funct7']
-        opcode = ic['opcode']
-
-        if opcode == 0x73: # System opcode for ECALL
-            if imm == 0x00:
-                self.instruction_set.ecall()
-            else:
-                raise ValueError(f"Imediato não reconhecido: {imm}")
-            return
-
-        match opcode:
-            case 0x03: # 0010011 -> lb, lw, lbu
-                match funct3:
-                    case 0x00: # 000 LB
-                        # print("Executando LB...")
-                        self.instruction_set.lb(rd, rs1, imm)
-                    case 0x02: # 010 LW
-                        # print("Executando LW...")
-                        self.instruction_set.lw(rd, rs1, imm)
-                    case 0x04: # 100 LBU
-                        # print("Executando LBU...")
-                        self.instruction_set.lbu(rd, rs1, imm)
-                    case _: # LH, LHU
-                        raise NotImplementedError("Instruções não implementadas neste projeto: LH, LHU")
-            case 0x13: # 0010011 -> ADDI, SLTI, SLTIU, XORI, ORI, ANDI, SLLI, SRLI/SRAI
-                match funct3:
-                    case 0x00: # 000 ADDI
-                        # print("Executando ADDI...")
-                        self.instruction_set.addi(rd, rs1, imm)
-                    case 0x02: # 010 SLTI
-                        raise NotImplementedError("Instrução SLTI não implementada neste projeto!")
-                    case 0x03: # 011 SLTIU
-                        raise NotImplementedError("Instrução SLTIU não implementada neste projeto!")
-                    case 0x07: # 111 ANDI
-                        # print("Executando ANDI...")
-                        self.instruction_set.andi(rd, rs1, imm)
-                    case 0x06: # 110 ORI
-                        # print("Executando ORI...")
-                        self.instruction_set.ori(rd, rs1, imm)
-                    case 0x04: # 100 XORI
-                        raise NotImplementedError("Instrução XORI não implementada neste projeto!")
-                    case 0x01: # 001 SLLI
-                        # print("Executando SLLI...")
-                        self.instruction_set.slli(rd, rs1, imm)
-                    case 0x05: # 101 SRLI/SRAI
-                        if funct7 == 0x00:
-                            # print("Executando SRLI...")
-                            self.instruction_set.srli(rd, rs1, imm)
-                        elif funct7 == 0x20:
-                            # print("Executando SRAI...")
-                            self.instruction_set.srai(rd, rs1, imm)
-                        else:
-                            raise ValueError(f"funct7 não reconhecido: {funct7}")
-                    case _:
-                        raise ValueError(f"funct3 não reconhecido: {funct3}")
-            case 0x23: # 0100011 -> sb, sw
-                match funct3:
-                    case 0x00: # 000 SB
-                        # print("Executando SB...")
-                        self.instruction_set.sb(rs1, imm, rd)
-                    case 0x10: # 010 SW
-                        # print("Executando SW...")
-                        self.instruction_set.sw(rs1, imm, rd)
-                    case _: # SH
-                        raise NotImplementedError("Instrução SH não implementada neste projeto!")
-            case 0x67: # 110111 JALR
-                match funct3:
-                    case 0x00: # 1100111 JALR
-                        # print("Executando JALR...")
-                        self.pc = self.instruction_set.jalr(rd, rs1, imm, self.pc)
-                    case _:
-                        raise ValueError(f"funct3 não reconhecido: {funct3}")
-
-    def execute_s(self, ic):
+        Formatos S e B - `funct3` seleciona a operação. Formatos U e J - apenas o `opcode`.\n
+        Desvios, `jal`, `jalr`, `lui` e `auipc` têm também a versão resolvida (`Operation.resolved`), usada pelas instruções da cache.
         """
-        Executa instruções do formato S - Store.\n
-        Lê os registradores `rs1` e `rs2` como fonte dos operadores e escreve o resultado no registrador `rd`.\n
-        Os campos `funct3` e `funct7` selecionam o tipo da operação.\n
-        ```
-        imm[11:5]    rs2 rs1  funct3 imm[4:0]    opcode
-        7            5   5    3      5           7
-        offset[11:5] src base width  offset[4:0] STORE
-        ```
-        """
-        rs1 = ic['rs1']
-        rs2 = ic['rs2']
-        imm = ic['imm12_s']
-        funct3 = ic['funct3']
-        match funct3:
-            case 0x00: # 000 SB
-                # print("Executando SB...")
-                self.instruction_set.sb(rs1, imm, rs2)
-            case 0x01: # 001 SH
-                raise NotImplementedError("Instrução SH não implementada neste projeto!")
-            case 0x02: # 010 SW
-                # print(f"Executando SW...")
-                self.instruction_set.sw(rs1, imm, rs2)
-            case _:
-                raise ValueError(f"funct3 não reconhecido: {funct3}")
+        isa = self.instruction_set
+        table = [None] * (1 << 17)
 
-    def execute_b(self, ic):
-        """
-        Executa instruções do formato B - Branch.\n
-        ```
-        imm[12] imm[10:5] rs2  rs1 funct3 imm[4:1] imm[11] opcode
-        1       6         5    5   3      4        1       7
-        ```
-        """
-        rs1 = ic['rs1']
-        rs2 = ic['rs2']
-        imm = ic['imm13']
-        funct3 = ic['funct3']
-        match funct3:
-            case 0x00: # 000 BEQ
-                # print("Executando BEQ...")
-                self.pc = self.instruction_set.beq(rs1, rs2, imm, self.pc)
-            case 0x01: # 001 BNE
-                # print(f"Executando BNE...")
-                self.pc = self.instruction_set.bne(rs1, rs2, imm, self.pc)
-            case 0x04: # 100 BLT
-                # print(f"Executando BLT...")
-                self.pc = self.instruction_set.blt(rs1, rs2, imm, self.pc)
-            case 0x05: # 101 BGE
-                # print(f"Executando BGE...")
-                self.pc = self.instruction_set.bge(rs1, rs2, imm, self.pc)
-            case 0x06: # 110 BLTU
-                # print(f"Executando BLTU...")
-                self.pc = self.instruction_set.bltu(rs1, rs2, imm, self.pc)
-            case 0x07: # 111 BGEU
-                # print(f"Executando BGEU...")
-                self.pc = self.instruction_set.bgeu(rs1, rs2, imm, self.pc)
-            case _:
-                raise ValueError(f"funct3 não reconhecido: {funct3}")
+        def add(operation, opcode, funct3s, funct7s):
+            for funct3 in funct3s:
+                if funct7s is FUNCT7_ANY: # Chaves com o mesmo opcode/funct3 estão espaçadas de 1 << 10
+                    table[pack_key(opcode, funct3, 0)::1 << 10] = [operation] * len(FUNCT7_ANY)
+                    continue
+                for funct7 in funct7s:
+                    table[pack_key(opcode, funct3, funct7)] = operation
 
-    def execute_u(self, ic):
-        """
-        Executa instruções do formato U - Upper.\n
-        ```
-        imm[31:12] rd  opcode
-        20         5   7
-        ```
-        """
-        rd = ic['rd']
-        imm = ic['imm20_u']
-        opcode = ic['opcode']
-        match opcode:
-            case 0x17: # 0010111 AUIPC
-                # print("Executando AUIPC...")
-                self.instruction_set.auipc(rd, imm, self.pc)
-            case 0x37: # 0110111 LUI
-                # print("Executando LUI...")
-                self.instruction_set.lui(rd, imm)
-
-    def execute_j(self, ic):
-        """
-        Executa instruções do formato J - Jump.\n
-        ```
-        imm[20] imm[10:1] imm[11] imm[19:12] rd  opcode
-        1       10        1       8          5   7
-        ```
-        """
-        opcode = ic['opcode']
-        imm = ic['imm21']
-        rd = ic['rd']
-        rs1 = ic['rs1']
-        match opcode:
-            case 0x6F: # 1101111 JAL
-                # print("Executando JAL...")
-                self.pc = self.instruction_set.jal(rd, imm, self.pc)
-            case _:
-                raise ValueError(f"opcode não reconhecido: {opcode}")
+        # Formato R (OP = 0110011)
+        for funct3 in FUNCT3_ANY:
+            add(self._invalid(f"funct3 não reconhecido: {funct3}"), 0x33, [funct3], [0x00, 0x20])
+        add(self._bind('add', isa.add, 'rd_rs1_rs2'), 0x33, [0x0], [0x00])
+        add(self._not_implemented('SLL'), 0x33, [0x1], [0x00])
+        add(self._bind('slt', isa.slt, 'rd_rs1_rs2'), 0x33, [0x2], [0x00])
+        add(self._bind('sltu', isa.sltu, 'rd_rs1_rs2'), 0x33, [0x3], [0x00])
+        add(self._bind('xor', isa.xor, 'rd_rs1_rs2'), 0x33, [0x4], [0x00])
+        add(self._not_implemented('SRL'), 0x33, [0x5], [0x00])
+        add(self._bind('or', isa.or_, 'rd_rs1_rs2'), 0x33, [0x6], [0x00])
+        add(self._bind('and', isa.and_, 'rd_rs1_rs2'), 0x33, [0x7], [0x00])
+        add(self._bind('sub', isa.sub, 'rd_rs1_rs2'), 0x33, [0x0], [0x20])
+        add(self._not_implemented('SRA'), 0x33, [0x5], [0x20])
+
+        # Formato I - LOAD (0000011)
+        add(self._not_implemented('LH/LHU'), 0x03, FUNCT3_ANY, FUNCT7_ANY)
+        add(self._bind('lb', isa.lb, 'rd_rs1_imm'), 0x03, [0x0], FUNCT7_ANY)
+        add(self._bind('lw', isa.lw, 'rd_rs1_imm'), 0x03, [0x2], FUNCT7_ANY)
+        add(self._bind('lbu', isa.lbu, 'rd_rs1_imm'), 0x03, [0x4], FUNCT7_ANY)
+
+        # Formato I - OP-IMM (0010011)
+        add(self._bind('addi', isa.addi, 'rd_rs1_imm'), 0x13, [0x0], FUNCT7_ANY)
+        add(self._bind('slli', isa.slli, 'rd_rs1_imm'), 0x13, [0x1], FUNCT7_ANY)
+        add(self._not_implemented('SLTI'), 0x13, [0x2], FUNCT7_ANY)
+        add(self._not_implemented('SLTIU'), 0x13, [0x3], FUNCT7_ANY)
+        add(self._not_implemented('XORI'), 0x13, [0x4], FUNCT7_ANY)
+        for funct7 in FUNCT7_ANY:
+            add(self._invalid(f"funct7 não reconhecido: {funct7}"), 0x13, [0x5], [funct7])
+        add(self._bind('srli', isa.srli, 'rd_rs1_imm'), 0x13, [0x5], [0x00])
+        add(self._bind('srai', isa.srai, 'rd_rs1_imm'), 0x13, [0x5], [0x20])
+        add(self._bind('ori', isa.ori, 'rd_rs1_imm'), 0x13, [0x6], FUNCT7_ANY)
+        add(self._bind('andi', isa.andi, 'rd_rs1_imm'), 0x13, [0x7], FUNCT7_ANY)
+
+        # Formato I - JALR (1100111) e SYSTEM (1110011)
+        for funct3 in FUNCT3_ANY:
+            add(self._invalid(f"funct3 não reconhecido: {funct3}"), 0x67, [funct3], FUNCT7_ANY)
+        add(self._resolved(self._bind('jalr', isa.jalr, 'rd_rs1_imm_pc->pc'), isa.jalr_to, 'rd_rs1_imm_pc->pc'), 0x67, [0x0], FUNCT7_ANY)
+        add(self._bind('ecall', self._system, 'imm'), 0x73, FUNCT3_ANY, FUNCT7_ANY)
+
+        # Formato S - STORE (0100011)
+        for funct3 in FUNCT3_ANY:
+            add(self._invalid(f"funct3 não reconhecido: {funct3}"), 0x23, [funct3], FUNCT7_ANY)
+        add(self._bind('sb', isa.sb, 'rs1_imm_rs2'), 0x23, [0x0], FUNCT7_ANY)
+        add(self._not_implemented('SH'), 0x23, [0x1], FUNCT7_ANY)
+        add(self._bind('sw', isa.sw, 'rs1_imm_rs2'), 0x23, [0x2], FUNCT7_ANY)
+
+        # Formato B - BRANCH (1100011)
+        for funct3 in FUNCT3_ANY:
+            add(self._invalid(f"funct3 não reconhecido: {funct3}"), 0x63, [funct3], FUNCT7_ANY)
+        add(self._resolved(self._bind('beq', isa.beq, 'rs1_rs2_imm_pc->pc'), isa.beq_to, 'rs1_rs2_target_pc->pc'), 0x63, [0x0], FUNCT7_ANY)
+        add(self._resolved(self._bind('bne', isa.bne, 'rs1_rs2_imm_pc->pc'), isa.bne_to, 'rs1_rs2_target_pc->pc'), 0x63, [0x1], FUNCT7_ANY)
+        add(self._resolved(self._bind('blt', isa.blt, 'rs1_rs2_imm_pc->pc'), isa.blt_to, 'rs1_rs2_target_pc->pc'), 0x63, [0x4], FUNCT7_ANY)
+        add(self._resolved(self._bind('bge', isa.bge, 'rs1_rs2_imm_pc->pc'), isa.bge_to, 'rs1_rs2_target_pc->pc'), 0x63, [0x5], FUNCT7_ANY)
+        add(self._resolved(self._bind('bltu', isa.bltu, 'rs1_rs2_imm_pc->pc'), isa.bltu_to, 'rs1_rs2_target_pc->pc'), 0x63, [0x6], FUNCT7_ANY)
+        add(self._resolved(self._bind('bgeu', isa.bgeu, 'rs1_rs2_imm_pc->pc'), isa.bgeu_to, 'rs1_rs2_target_pc->pc'), 0x63, [0x7], FUNCT7_ANY)
+
+        # Formatos U (AUIPC 0010111, LUI 0110111) e J (JAL 1101111)
+        add(self._resolved(self._bind('auipc', isa.auipc, 'rd_imm_pc'), isa.load_upper, 'rd_target'), 0x17, FUNCT3_ANY, FUNCT7_ANY)
+        add(self._resolved(self._bind('lui', isa.lui, 'rd_imm'), isa.load_upper, 'rd_target'), 0x37, FUNCT3_ANY, FUNCT7_ANY)
+        add(self._resolved(self._bind('jal', isa.jal, 'rd_imm_pc->pc'), isa.jal_to, 'rd_target_pc->pc'), 0x6F, FUNCT3_ANY, FUNCT7_ANY)
+        return table
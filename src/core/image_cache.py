@@ -0,0 +1,91 @@
+"""
+Cache em disco das imagens dos arquivos de programa.\n
+Cada arquivo lido por `core.loader` é convertido uma única vez: o vetor de palavras é salvo como `.npy` no diretório da cache
+(o mesmo de `core.aot`), com nome dado pelo hash SHA-256 do conteúdo. O manifesto `imagens.json` associa o caminho de cada arquivo
+ao seu tamanho, `mtime`, formato e hash; se o arquivo não mudou desde a última leitura, a imagem é mapeada em memória
+(`np.load(mmap_mode='r')`) sem ler nem converter o arquivo de texto. Se o `mtime` mudou mas o conteúdo não, o hash encontra a mesma imagem.
+O hash inclui o formato já detectado (`loader.detect_format`): o mesmo conteúdo em arquivos de formatos diferentes
+(ex.: `programa.bin` e `programa_text.txt`) gera imagens diferentes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from core.aot import cache_dir
+from core.loader import FORMATS, detect_format, parse
+
+IMAGE_VERSION = 1
+"""Versão do formato das imagens. Muda quando a conversão de `core.loader` muda."""
+
+class ImageCache:
+    """Cache de imagens de programa em `directory` (padrão: `aot.cache_dir()`)."""
+    MANIFEST = 'imagens.json'
+
+    def __init__(self, directory=None) -> None:
+        self.directory = cache_dir(directory)
+        self.manifest_path = os.path.join(self.directory, self.MANIFEST)
+        self.manifest = self._read_manifest()
+        """Entradas do manifesto: caminho absoluto -> `{'size', 'mtime_ns', 'format', 'sha256'}`, com o formato detectado."""
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self):
+        # Mescla com o manifesto atual (outro processo pode tê-lo atualizado) e substitui o arquivo de uma vez
+        self.manifest = {**self._read_manifest(), **self.manifest}
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.manifest, f)
+            os.replace(temp, self.manifest_path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def image_path(self, digest):
+        """Caminho da imagem `.npy` com o hash `digest`."""
+        return os.path.join(self.directory, f'imagem_{digest}.npy')
+
+    def _load(self, digest):
+        try:
+            return np.load(self.image_path(digest), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+    def words(self, path, format=None) -> np.ndarray:
+        """Mesmo resultado de `loader.read_words(path, format)`, lido da cache quando possível. O vetor retornado é somente leitura."""
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.manifest.get(key)
+        # Sem `format`, o formato detectado é o mesmo da leitura anterior: o caminho e o conteúdo não mudaram.
+        # Entradas sem o formato detectado (`None`) são de versões anteriores, em que o hash não o incluía, e são ignoradas.
+        if (entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+                and entry['format'] in FORMATS and format in (None, entry['format'])):
+            words = self._load(entry['sha256'])
+            if words is not None:
+                return words
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        format = format or detect_format(data, path)
+        digest = hashlib.sha256(f'v{IMAGE_VERSION}:{format}:'.encode() + data).hexdigest()
+        words = self._load(digest)
+        if words is None:
+            words = parse(data, format, path)
+            fd, temp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, words)
+                os.replace(temp, self.image_path(digest))
+            finally:
+                if os.path.exists(temp):
+                    os.remove(temp)
+        self.manifest[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'format': format, 'sha256': digest}
+        self._write_manifest()
+        return words
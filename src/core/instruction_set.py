@@ -12,24 +12,29 @@ Instruções implementadas:\n
 Syscall:
 - imprimir inteiro
 - imprimir string
-- encerrar programa
+- encerrar programa (sem `exit()`: o código de saída fica em `InstructionSet.exit_code` e `CPU.run` termina o laço)
 """
 
 import numpy as np
+from core.output import StdoutSink
+
 class InstructionSet:
-    """Conjunto de instruções RV32I."""
+    """
+    Conjunto de instruções RV32I.\n
+    Os imediatos recebidos são os do `Decoder`: com o sinal já estendido (formatos I, S, B e J) ou o campo de 20 bits (formato U).
+    Os métodos `*_to` executam desvios já resolvidos pelo `Executor` (destino calculado e alinhamento verificado na decodificação).
+    """
+    BACKEND = 'numpy'
+    """Representação dos registradores: `numpy` (array `uint32`) ou `int` (`RegisterFile` de `core.int_instruction_set`)."""
     def __init__(self, regs, memory): #pc, memory) -> None:
         self.xregs = regs
         """Banco de registradores. Definido em `cpu.py` como uma lista de inteiros de 32 bits sem sinal."""
         self.memory = memory
         """Memória do sistema. Definida em `memory.py` como um array de inteiros de 8 bits sem sinal."""
-
-    def _gera_imm(self, ri):
-        """Estende o sinal do imediato de 12 bits para 32 bits."""
-        # imm = ri & 0xFFF               # Extrai os 12 bits menos significativos
-        if ri & 0x800:                   # Se o bit de sinal (bit 11) estiver definido
-            return np.int32(ri) | ~0xfff # Extensão de sinal
-        return np.int32(ri)
+        self.exit_code = None
+        """Código de saída do programa, definido pela chamada de sistema de encerramento. `None` enquanto o programa não terminou."""
+        self.output = StdoutSink(0)
+        """Destino das chamadas de sistema de impressão (ver `core.output`). A `CPU` a substitui pela sua saída configurada."""
 
     def _to_signed32(self, value: int):
         value = int(value) # Às vezes, trabalhar com numpy é bem chato
@@ -44,7 +49,7 @@ class InstructionSet:
 
     def lb(self, rd, rs1, imm):
         """*Load Byte*. Carrega um inteiro de 32 bits da memória."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         address = self.xregs[rs1] + imm
         self._write_reg(
             rd,
@@ -53,7 +58,7 @@ class InstructionSet:
 
     def lbu(self, rd, rs1, imm):
         """*Load Byte Unsigned*. Carrega um inteiro de 32 bits sem sinal da memória."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         address = self.xregs[rs1] + imm
         self._write_reg(
             rd,
@@ -62,10 +67,10 @@ class InstructionSet:
 
     def lw(self, rd, rs1, imm):
         """*Load Word*. Carrega um inteiro de 32 bits da memória."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         address = self.xregs[rs1] + imm
-        if address < 0x2000:
-            address += 0x2000 - 2 # 0x2000 é o endereço base do segmento .data
+        if address < 0x2000 and self.memory.remap_low:
+            address += 0x2000 - 2 # 0x2000 é o endereço base do segmento .data no layout dos arquivos do RARS
         self._write_reg(
             rd,
             self.memory.lw(address)
@@ -73,13 +78,13 @@ class InstructionSet:
 
     def sb(self, rs1, imm, rs2):
         """*Store Byte*. Armazena um byte na memória."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         address = self.xregs[rs1] + imm
         self.memory.sb(address, self.xregs[rs2])
 
     def sw(self, rs1, imm, rs2):
         """*Store Word*. Armazena um inteiro de 32 bits na memória."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         address = self.xregs[rs1] + imm
         self.memory.sw(address, self.xregs[rs2])
 
@@ -93,7 +98,7 @@ class InstructionSet:
 
     def addi(self, rd, rs1, imm):
         """*Add Immediate*. Adição de um inteiro de 32 bits com um imediato de 12 bits."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         self._write_reg(
             rd,
             self.xregs[rs1] + imm
@@ -108,7 +113,7 @@ class InstructionSet:
 
     def andi(self, rd, rs1, imm):
         """*AND Immediate*. Operação lógica AND com um imediato de 12 bits."""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         self._write_reg(
             rd,
             self.xregs[rs1] & imm
@@ -116,12 +121,10 @@ class InstructionSet:
 
     def auipc(self, rd, imm, pc):
         """*Add Upper Immediate*. Adiciona o imediato de 20 bits ao PC e armazena o resultado em rd."""
-        pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
-        imm = self._gera_imm(imm)
-        imm = imm << 12
+        pc = int(pc) - 4 # Retirando o +4 que o fetch() faz prematuramente
         self._write_reg(
             rd,
-            pc + imm
+            (pc + (imm << 12)) & 0xffffffff
         )
 
 
@@ -129,7 +132,7 @@ class InstructionSet:
         """*Branch Equal*. Se rs1 == rs2, PC = PC + imm."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4 if pc > 0 else 0 # Retirando o +4 que o fetch() faz prematuramente
         if self.xregs[rs1] == self.xregs[rs2]:
             pc += imm
@@ -141,7 +144,7 @@ class InstructionSet:
         """*Branch Not Equal*. Se rs1 != rs2, PC = PC + imm."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
         if self.xregs[rs1] != self.xregs[rs2]:
             pc += imm
@@ -153,7 +156,7 @@ class InstructionSet:
         """*Branch Greater or Equal*. Se rs1 >= rs2, PC = PC + imm."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
         rs1_val = self._to_signed32(self.xregs[rs1])
         rs2_val = self._to_signed32(self.xregs[rs2])
@@ -167,7 +170,7 @@ class InstructionSet:
         """*Branch Greater or Equal Unsigned*. Se rs1 >= rs2, PC = PC + imm."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
         if self.xregs[rs1] >= self.xregs[rs2]:
             pc += imm
@@ -179,7 +182,7 @@ class InstructionSet:
         """*Branch Less Than*. Se rs1 < rs2, PC = PC + imm."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
         rs1_val = self._to_signed32(self.xregs[rs1])
         rs2_val = self._to_signed32(self.xregs[rs2])
@@ -193,7 +196,7 @@ class InstructionSet:
         """*Branch Less Than Unsigned*. Se rs1 < rs2, PC = PC + imm."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
         if self.xregs[rs1] < self.xregs[rs2]:
             pc += imm
@@ -205,7 +208,7 @@ class InstructionSet:
         """*Jump and Link*. PC = PC + imm; rd = PC + 4."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4                     # Retirando o +4 que o fetch() faz prematuramente
         self._write_reg(rd, pc + 4) # self.xregs[rd] = pc + 4
         pc += imm
@@ -215,13 +218,52 @@ class InstructionSet:
         """*Jump and Link Register*. PC = (x[rs1] + sext(imm[11:0])) & ~1; rd = PC + 4."""
         if imm % 4 != 0:
             raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         pc -= 4                            # Retirando o +4 que o fetch() faz prematuramente
         temp = pc + 4  # PC + 4
         pc = (self.xregs[rs1] + imm) & ~1  # (x[rs1] + sext(imm[11:0])) & ~1
         self._write_reg(rd, temp)
         return pc
 
+    def beq_to(self, rs1, rs2, target, pc):
+        """`beq` resolvido: retorna `target` se rs1 == rs2, senão `pc` (endereço da instrução seguinte)."""
+        return target if self.xregs[rs1] == self.xregs[rs2] else pc
+
+    def bne_to(self, rs1, rs2, target, pc):
+        """`bne` resolvido: retorna `target` se rs1 != rs2, senão `pc`."""
+        return target if self.xregs[rs1] != self.xregs[rs2] else pc
+
+    def bge_to(self, rs1, rs2, target, pc):
+        """`bge` resolvido: retorna `target` se rs1 >= rs2 (com sinal), senão `pc`."""
+        return target if self._to_signed32(self.xregs[rs1]) >= self._to_signed32(self.xregs[rs2]) else pc
+
+    def bgeu_to(self, rs1, rs2, target, pc):
+        """`bgeu` resolvido: retorna `target` se rs1 >= rs2 (sem sinal), senão `pc`."""
+        return target if self.xregs[rs1] >= self.xregs[rs2] else pc
+
+    def blt_to(self, rs1, rs2, target, pc):
+        """`blt` resolvido: retorna `target` se rs1 < rs2 (com sinal), senão `pc`."""
+        return target if self._to_signed32(self.xregs[rs1]) < self._to_signed32(self.xregs[rs2]) else pc
+
+    def bltu_to(self, rs1, rs2, target, pc):
+        """`bltu` resolvido: retorna `target` se rs1 < rs2 (sem sinal), senão `pc`."""
+        return target if self.xregs[rs1] < self.xregs[rs2] else pc
+
+    def jal_to(self, rd, target, pc):
+        """`jal` resolvido: rd = `pc` (endereço da instrução seguinte); retorna `target`."""
+        self._write_reg(rd, pc)
+        return target
+
+    def jalr_to(self, rd, rs1, imm, pc):
+        """`jalr` com o alinhamento do imediato já verificado: rd = `pc`; retorna (x[rs1] + imm) & ~1."""
+        target = (int(self.xregs[rs1]) + imm) & ~1
+        self._write_reg(rd, pc)
+        return target
+
+    def load_upper(self, rd, value):
+        """`lui`/`auipc` resolvidos: escreve em rd o valor já calculado na decodificação (`DecodedInstruction.target`)."""
+        self._write_reg(rd, value)
+
     def or_(self, rd, rs1, rs2):
         """Operação lógica OR.\n O nome foi escolhido para evitar conflito com a palavra reservada `or`."""
         self._write_reg(
@@ -259,7 +301,7 @@ class InstructionSet:
 
     def ori(self, rd, rs1, imm):
         """*OR Immediate*. rd = rs1 | imm"""
-        imm = self._gera_imm(imm)
+        imm = np.int32(imm) # O decodificador já estende o sinal
         self._write_reg(
             rd,
             self.xregs[rs1] | imm
@@ -313,19 +355,15 @@ class InstructionSet:
 
         match syscall_num:
             case 1: # imprimir inteiro
-                print(int(a0), end="")
+                self.output.write(str(int(a0)))
             case 4: # imprimir string
                 address = a0
-                # Ajusta o endereço relativo com base no segmento de dados
-                if address < self.memory.data_base:
+                # Ajusta o endereço relativo com base no segmento de dados (layout dos arquivos do RARS)
+                if address < self.memory.data_base and self.memory.remap_low:
                     address += self.memory.data_base - 2
-                string = ""
-                while self.memory.MEM[address] != 0:
-                    string += chr(self.memory.MEM[address])
-                    address += 1
-                print(string, end="")
+                self.output.write(self.memory.read_string(address))
             case 10: # encerrar programa
-                print("\nPrograma encerrado com sucesso.")
-                exit(0)
+                self.output.write("\nPrograma encerrado com sucesso.\n")
+                self.exit_code = 0
             case _:
                 raise ValueError(f"Syscall não reconhecida: {syscall_num}")
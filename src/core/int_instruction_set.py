@@ -0,0 +1,282 @@
+"""
+Banco de registradores e conjunto de instruções RV32I com inteiros Python.\n
+`InstructionSet` opera sobre um `np.ndarray` de `uint32`, e cada soma, shift ou comparação passa por escalares do NumPy
+(`np.int32`/`np.uint32`), bem mais caros que a aritmética de inteiros Python.
+Aqui os registradores são inteiros Python sempre mascarados para 32 bits (`RegisterFile`), e `IntInstructionSet` reimplementa
+cada instrução com a mesma semântica de `InstructionSet`, bit a bit - inclusive o ajuste de endereço de `lw`.
+Como nenhum valor intermediário é um escalar do NumPy, avisos de overflow do NumPy não acontecem.
+"""
+
+from core.instruction_set import InstructionSet
+
+M32 = 0xffffffff
+
+def _to_signed32(value):
+    """Interpreta um inteiro de 32 bits sem sinal como inteiro com sinal."""
+    return (value ^ 0x80000000) - 0x80000000
+
+
+class RegisterFile:
+    """
+    Banco de 32 registradores de 32 bits guardados como inteiros Python em `values`.\n
+    Escritas por índice (`regs[i] = v`) aceitam qualquer inteiro (inclusive escalares do NumPy) e guardam `int(v) & 0xffffffff`.
+    O `IntInstructionSet` e o `BlockEngine` acessam `values` diretamente, já com valores mascarados.
+    """
+    __slots__ = ('values',)
+
+    def __init__(self) -> None:
+        self.values = [0] * 32
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __setitem__(self, index, value):
+        self.values[index] = int(value) & M32
+
+    def __len__(self):
+        return 32
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __repr__(self):
+        return f'RegisterFile({self.values})'
+
+
+class IntInstructionSet(InstructionSet):
+    """Conjunto de instruções RV32I sobre um `RegisterFile`, com aritmética de inteiros Python."""
+    BACKEND = 'int'
+
+    def __init__(self, regs, memory):
+        super().__init__(regs, memory)
+        self.registers = regs.values
+        """Lista com os valores dos registradores, compartilhada com `regs`."""
+
+    def _write_reg(self, rd, value):
+        """Escreve o valor `value` no registrador `rd`, garantindo que `x0` seja sempre 0."""
+        if rd != 0:
+            self.registers[rd] = int(value) & M32
+
+
+    def lb(self, rd, rs1, imm):
+        """*Load Byte*. Carrega um inteiro de 32 bits da memória."""
+        value = self.memory.lb(self.registers[rs1] + imm)
+        if rd != 0:
+            self.registers[rd] = value & M32
+
+    def lbu(self, rd, rs1, imm):
+        """*Load Byte Unsigned*. Carrega um inteiro de 32 bits sem sinal da memória."""
+        value = int(self.memory.lbu(self.registers[rs1] + imm))
+        if rd != 0:
+            self.registers[rd] = value
+
+    def lw(self, rd, rs1, imm):
+        """*Load Word*. Carrega um inteiro de 32 bits da memória."""
+        address = self.registers[rs1] + imm
+        if address < 0x2000 and self.memory.remap_low:
+            address += 0x2000 - 2 # 0x2000 é o endereço base do segmento .data no layout dos arquivos do RARS
+        value = int(self.memory.lw(address))
+        if rd != 0:
+            self.registers[rd] = value
+
+    def sb(self, rs1, imm, rs2):
+        """*Store Byte*. Armazena um byte na memória."""
+        x = self.registers
+        self.memory.sb(x[rs1] + imm, x[rs2])
+
+    def sw(self, rs1, imm, rs2):
+        """*Store Word*. Armazena um inteiro de 32 bits na memória."""
+        x = self.registers
+        self.memory.sw(x[rs1] + imm, x[rs2])
+
+
+    def add(self, rd, rs1, rs2):
+        """Adição de inteiros de 32 bits."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = (x[rs1] + x[rs2]) & M32
+
+    def addi(self, rd, rs1, imm):
+        """*Add Immediate*. Adição de um inteiro de 32 bits com um imediato de 12 bits."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = (x[rs1] + imm) & M32
+
+    def and_(self, rd, rs1, rs2):
+        """Operação lógica AND."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = x[rs1] & x[rs2]
+
+    def andi(self, rd, rs1, imm):
+        """*AND Immediate*. Operação lógica AND com um imediato de 12 bits."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = x[rs1] & imm # x[rs1] >= 0: o resultado já está em 32 bits
+
+    def auipc(self, rd, imm, pc):
+        """*Add Upper Immediate*. Adiciona o imediato de 20 bits ao PC e armazena o resultado em rd."""
+        pc -= 4 # Retirando o +4 que o fetch() faz prematuramente
+        self._write_reg(rd, pc + (imm << 12))
+
+
+    def _branch(self, taken, imm, pc):
+        """Destino de um desvio: `pc - 4 + imm` se `taken`, senão `pc` (a instrução seguinte)."""
+        if taken:
+            return pc - 4 + imm
+        return pc
+
+    def _check_alignment(self, imm):
+        if imm % 4 != 0:
+            raise ValueError(f"Endereço de destino {hex(imm)} não está alinhado em 4 bytes.")
+
+    def beq(self, rs1, rs2, imm, pc):
+        """*Branch Equal*. Se rs1 == rs2, PC = PC + imm."""
+        self._check_alignment(imm)
+        if pc <= 0: # Mesmo caso especial de InstructionSet.beq
+            pc += 4
+        return self._branch(self.registers[rs1] == self.registers[rs2], imm, pc)
+
+    def bne(self, rs1, rs2, imm, pc):
+        """*Branch Not Equal*. Se rs1 != rs2, PC = PC + imm."""
+        self._check_alignment(imm)
+        return self._branch(self.registers[rs1] != self.registers[rs2], imm, pc)
+
+    def bge(self, rs1, rs2, imm, pc):
+        """*Branch Greater or Equal*. Se rs1 >= rs2, PC = PC + imm."""
+        self._check_alignment(imm)
+        return self._branch(_to_signed32(self.registers[rs1]) >= _to_signed32(self.registers[rs2]), imm, pc)
+
+    def bgeu(self, rs1, rs2, imm, pc):
+        """*Branch Greater or Equal Unsigned*. Se rs1 >= rs2, PC = PC + imm."""
+        self._check_alignment(imm)
+        return self._branch(self.registers[rs1] >= self.registers[rs2], imm, pc)
+
+    def blt(self, rs1, rs2, imm, pc):
+        """*Branch Less Than*. Se rs1 < rs2, PC = PC + imm."""
+        self._check_alignment(imm)
+        return self._branch(_to_signed32(self.registers[rs1]) < _to_signed32(self.registers[rs2]), imm, pc)
+
+    def bltu(self, rs1, rs2, imm, pc):
+        """*Branch Less Than Unsigned*. Se rs1 < rs2, PC = PC + imm."""
+        self._check_alignment(imm)
+        return self._branch(self.registers[rs1] < self.registers[rs2], imm, pc)
+
+    def jal(self, rd, imm, pc):
+        """*Jump and Link*. PC = PC + imm; rd = PC + 4."""
+        self._check_alignment(imm)
+        pc -= 4                     # Retirando o +4 que o fetch() faz prematuramente
+        self._write_reg(rd, pc + 4)
+        return pc + imm
+
+    def jalr(self, rd, rs1, imm, pc):
+        """*Jump and Link Register*. PC = (x[rs1] + sext(imm[11:0])) & ~1; rd = PC + 4."""
+        self._check_alignment(imm)
+        target = (self.registers[rs1] + imm) & ~1
+        self._write_reg(rd, pc) # pc já é o endereço da instrução seguinte
+        return target
+
+    def beq_to(self, rs1, rs2, target, pc):
+        """`beq` resolvido: retorna `target` se rs1 == rs2, senão `pc` (endereço da instrução seguinte)."""
+        return target if self.registers[rs1] == self.registers[rs2] else pc
+
+    def bne_to(self, rs1, rs2, target, pc):
+        """`bne` resolvido: retorna `target` se rs1 != rs2, senão `pc`."""
+        return target if self.registers[rs1] != self.registers[rs2] else pc
+
+    def bge_to(self, rs1, rs2, target, pc):
+        """`bge` resolvido: retorna `target` se rs1 >= rs2 (com sinal), senão `pc`."""
+        x = self.registers
+        return target if (x[rs1] ^ 0x80000000) >= (x[rs2] ^ 0x80000000) else pc
+
+    def bgeu_to(self, rs1, rs2, target, pc):
+        """`bgeu` resolvido: retorna `target` se rs1 >= rs2 (sem sinal), senão `pc`."""
+        return target if self.registers[rs1] >= self.registers[rs2] else pc
+
+    def blt_to(self, rs1, rs2, target, pc):
+        """`blt` resolvido: retorna `target` se rs1 < rs2 (com sinal), senão `pc`."""
+        x = self.registers
+        return target if (x[rs1] ^ 0x80000000) < (x[rs2] ^ 0x80000000) else pc
+
+    def bltu_to(self, rs1, rs2, target, pc):
+        """`bltu` resolvido: retorna `target` se rs1 < rs2 (sem sinal), senão `pc`."""
+        return target if self.registers[rs1] < self.registers[rs2] else pc
+
+    def jal_to(self, rd, target, pc):
+        """`jal` resolvido: rd = `pc` (endereço da instrução seguinte); retorna `target`."""
+        if rd != 0:
+            self.registers[rd] = int(pc)
+        return target
+
+    def jalr_to(self, rd, rs1, imm, pc):
+        """`jalr` com o alinhamento do imediato já verificado: rd = `pc`; retorna (x[rs1] + imm) & ~1."""
+        target = (self.registers[rs1] + imm) & ~1
+        if rd != 0:
+            self.registers[rd] = int(pc)
+        return target
+
+    def load_upper(self, rd, value):
+        """`lui`/`auipc` resolvidos: escreve em rd o valor já calculado na decodificação (`DecodedInstruction.target`)."""
+        if rd != 0:
+            self.registers[rd] = value
+
+    def or_(self, rd, rs1, rs2):
+        """Operação lógica OR."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = x[rs1] | x[rs2]
+
+
+    def lui(self, rd, imm):
+        """*Load Upper Immediate*. Carrega o imediato de 20 bits nos 20 bits mais significativos de rd."""
+        if not 0x00000 <= imm <= 0xfffff:
+            raise ValueError(f"Imediato {hex(imm)} fora do intervalo 0x00000..0xFFFFF")
+        self._write_reg(rd, imm << 12)
+
+    def slt(self, rd, rs1, rs2):
+        """*Set Less Than*. rd = (rs1 < rs2) ? 1 : 0"""
+        if rd != 0:
+            x = self.registers
+            x[rd] = 1 if _to_signed32(x[rs1]) < _to_signed32(x[rs2]) else 0
+
+    def sltu(self, rd, rs1, rs2):
+        """*Set Less Than Unsigned*. rd = (rs1 < rs2) ? 1 : 0"""
+        if rd != 0:
+            x = self.registers
+            x[rd] = 1 if x[rs1] < x[rs2] else 0
+
+    def ori(self, rd, rs1, imm):
+        """*OR Immediate*. rd = rs1 | imm"""
+        if rd != 0:
+            x = self.registers
+            x[rd] = (x[rs1] | imm) & M32
+
+    def slli(self, rd, rs1, imm):
+        """*Shift Left Logical Immediate*. rd = rs1 << shamt"""
+        if rd != 0:
+            x = self.registers
+            x[rd] = (x[rs1] << (imm & 0x1F)) & M32
+
+    def srai(self, rd, rs1, imm):
+        """*Shift Right Arithmetic Immediate*. rd = rs1 >> shamt"""
+        if rd != 0:
+            x = self.registers
+            x[rd] = (_to_signed32(x[rs1]) >> (imm & 0x1F)) & M32
+
+    def srli(self, rd, rs1, imm):
+        """*Shift Right Logical Immediate*. rd = rs1 >> shamt"""
+        if rd != 0:
+            x = self.registers
+            x[rd] = x[rs1] >> (imm & 0x1F)
+
+    def sub(self, rd, rs1, rs2):
+        """Subtração de inteiros de 32 bits."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = (x[rs1] - x[rs2]) & M32
+
+    def xor(self, rd, rs1, rs2):
+        """Operação lógica XOR."""
+        if rd != 0:
+            x = self.registers
+            x[rd] = x[rs1] ^ x[rs2]
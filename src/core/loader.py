@@ -0,0 +1,91 @@
+"""
+Leitura vetorizada dos arquivos de programa.\n
+Converte um arquivo inteiro em um vetor de palavras `uint32` com poucas operações do NumPy, em vez de chamar `int(linha, 2)` linha a linha.
+Formatos aceitos (`FORMATS`):
+- `binary-text`: uma palavra por linha, em binário ASCII (`'0'`/`'1'`), como os arquivos exportados pelo RARS;
+- `hex`: uma palavra por linha, em hexadecimal (com ou sem o prefixo `0x`);
+- `raw`: binário puro, palavras de 32 bits little-endian.
+
+Se o formato não for informado, ele é detectado pela extensão (`.bin` é `raw`, `.hex` é `hex`) ou pelo conteúdo do arquivo.
+"""
+
+import numpy as np
+
+FORMATS = ('binary-text', 'hex', 'raw')
+
+_BINARY_CHARS = frozenset(b'01 \t\r\n')
+_HEX_CHARS = frozenset(b'0123456789abcdefABCDEFxX \t\r\n')
+
+def detect_format(data: bytes, path=None) -> str:
+    """Detecta o formato do conteúdo `data`, pela extensão de `path` ou pelos caracteres do arquivo."""
+    if path is not None:
+        extension = str(path).lower().rsplit('.', 1)[-1]
+        if extension == 'bin':
+            return 'raw'
+        if extension == 'hex':
+            return 'hex'
+    sample = set(data[:4096])
+    first = data[:64].split()[:1]
+    if sample <= _BINARY_CHARS and first and len(first[0]) > 8: # "00000001" é uma palavra em hexadecimal
+        return 'binary-text'
+    if sample <= _HEX_CHARS:
+        return 'hex'
+    return 'raw'
+
+def parse_binary_text(data: bytes) -> np.ndarray:
+    """Converte linhas de 32 dígitos binários em palavras `uint32`, tratando o texto como uma matriz de bits."""
+    tokens = data.split()
+    if not tokens:
+        return np.zeros(0, dtype=np.uint32)
+    bits = np.frombuffer(b''.join(tokens), dtype=np.uint8)
+    if bits.size != 32 * len(tokens):
+        # Linhas com outra quantidade de dígitos: mesma conversão de int(linha, 2)
+        return np.array([_parse_line(token, 2) for token in tokens], dtype=np.uint32)
+    bits = bits.reshape(-1, 32) - ord('0')
+    if (bits > 1).any():
+        line = int(np.flatnonzero((bits > 1).any(axis=1))[0])
+        raise ValueError(f"Linha {line + 1} não é um número binário: {tokens[line].decode(errors='replace')}")
+    return np.packbits(bits, axis=1).view('>u4').ravel().astype(np.uint32)
+
+def parse_hex(data: bytes) -> np.ndarray:
+    """Converte linhas com palavras em hexadecimal (com ou sem `0x`) em palavras `uint32`."""
+    tokens = data.lower().replace(b'0x', b'').split()
+    if any(len(token) != 8 for token in tokens):
+        return np.array([_parse_line(token, 16) for token in tokens], dtype=np.uint32)
+    try:
+        raw = bytes.fromhex(b''.join(tokens).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Arquivo hexadecimal inválido: {e}") from None
+    return np.frombuffer(raw, dtype='>u4').astype(np.uint32)
+
+def parse_raw(data: bytes) -> np.ndarray:
+    """Interpreta `data` como palavras de 32 bits little-endian. Um resto de 1 a 3 bytes é completado com zeros."""
+    if len(data) % 4:
+        data = data + bytes(4 - len(data) % 4)
+    return np.frombuffer(data, dtype='<u4').astype(np.uint32)
+
+def _parse_line(token: bytes, base: int) -> int:
+    try:
+        return int(token, base) & 0xffffffff
+    except ValueError:
+        raise ValueError(f"Palavra inválida na base {base}: {token.decode(errors='replace')}") from None
+
+def parse(data: bytes, format=None, path=None) -> np.ndarray:
+    """Converte o conteúdo `data` no formato `format` (ou detectado) em um vetor de palavras `uint32`."""
+    if format is None:
+        format = detect_format(data, path)
+    match format:
+        case 'binary-text':
+            return parse_binary_text(data)
+        case 'hex':
+            return parse_hex(data)
+        case 'raw':
+            return parse_raw(data)
+        case _:
+            raise ValueError(f"Formato de arquivo não reconhecido: {format}")
+
+def read_words(path, format=None) -> np.ndarray:
+    """Lê o arquivo `path` e retorna suas palavras como um vetor `uint32`."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return parse(data, format, path)
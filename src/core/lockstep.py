@@ -0,0 +1,303 @@
+"""
+Execução em lockstep de N instâncias do mesmo programa com operações vetorizadas do NumPy.\n
+Para varrer parâmetros, o mesmo .text é executado com muitos segmentos .data diferentes. `LockstepCPU` guarda os N bancos de
+registradores em um array `(N, 32)` de `uint32` e as N memórias em um array `(N, 16384)` de `uint8`, e executa cada instrução em
+todas as instâncias (lanes) de uma vez: `add x5, x6, x7` é uma única soma de colunas, `lw` é uma única indexação do array de palavras.\n
+As lanes com o mesmo PC formam um grupo, executado com um único PC enquanto não houver desvio. Quando as lanes de um grupo
+seguem caminhos diferentes em um desvio, o grupo se divide, e o grupo com o menor PC é executado primeiro; os grupos se juntam
+novamente quando chegam ao mesmo PC. Chamadas de sistema e acessos fora do caminho comum (endereços desalinhados ou fora da memória)
+são executados lane a lane, com a mesma semântica (e os mesmos erros) de `Memory` e `InstructionSet`.\n
+O programa usa o layout de `Memory` (.text em 0x0000, .data em 0x2000). Escritas no .text encerram a lane com erro,
+pois as lanes compartilham o .text decodificado.
+"""
+
+import numpy as np
+from core.memory import Memory
+from core.executor import Executor
+from core.loader import read_words
+
+M32 = 0xffffffff
+
+ALU = {
+    'add':  lambda a, b: a + b,
+    'sub':  lambda a, b: a - b,
+    'xor':  lambda a, b: a ^ b,
+    'or':   lambda a, b: a | b,
+    'and':  lambda a, b: a & b,
+}
+"""Operações do formato R sobre colunas `uint32` (a aritmética de arrays `uint32` já é módulo 2^32)."""
+
+class _LaneMemory(Memory):
+    '''`Memory` sobre a linha de uma lane, usada nos acessos que saem do caminho vetorizado.'''
+    def __init__(self, row) -> None: # Sem Memory.__init__: a memória é a própria linha
+        self.MEM = row
+        self.WORDS = row.view('<u4')
+        self.text_base = 0x0000
+        self.data_base = 0x2000
+        self.text_end = 0x2000
+        self.stack_top = None
+        self.text_watchers = [self._text_write]
+
+    def _text_write(self, address):
+        raise ValueError(f"Escrita no segmento .text ({hex(address)}) não é suportada na execução em lockstep.")
+
+
+class LockstepCPU:
+    '''
+    N instâncias do programa `code_path`, uma para cada item de `data`: o caminho de um arquivo .data (ver `core.loader`),
+    um vetor de palavras ou `None` (.data zerado).\n
+    Depois de `run()`, a saída, o código de saída, o erro e a quantidade de instruções executadas de cada lane estão em
+    `output(lane)`, `exit_codes`, `errors` e `instructions`.
+    '''
+    def __init__(self, code_path, data, format=None) -> None:
+        base = Memory()
+        base.load_mem(code_path, None, format)
+        self.executor = Executor(np.zeros(32, dtype=np.uint32), base, np.uint32(0))
+        """`Executor` usado apenas para decodificar o .text (cache de decodificação e tabela de despacho)."""
+        self.executor.predecode()
+        self.text_end = base.text_end
+        self.remap_low = base.remap_low
+
+        images = list(data)
+        self.lanes = len(images)
+        self.memory = np.tile(base.MEM, (self.lanes, 1))
+        """Memórias das lanes: `memory[lane]` é o array de 16 KiB da lane."""
+        self.words = self.memory.view('<u4')
+        for lane, image in enumerate(images):
+            if image is None:
+                continue
+            words = np.asarray(image, dtype=np.uint32) if isinstance(image, (np.ndarray, list)) else read_words(image, format)
+            if len(words) > 0x1000 >> 2:
+                raise ValueError("Endereço de dados excedeu o limite de 0x2ffc.")
+            self.words[lane, 0x2000 >> 2:(0x2000 >> 2) + len(words)] = words
+
+        self.xregs = np.zeros((self.lanes, 32), dtype=np.uint32)
+        """Bancos de registradores: `xregs[lane, reg]`."""
+        self.signed = self.xregs.view(np.int32)
+        self.pc = np.zeros(self.lanes, dtype=np.int64)
+        """PC de cada lane (atualizado quando a lane sai do grupo em execução)."""
+        self.active = np.ones(self.lanes, dtype=bool)
+        self.instructions = np.zeros(self.lanes, dtype=np.int64)
+        """Instruções executadas por lane, contadas como `Executor.global_counter`."""
+        self.exit_codes = [None] * self.lanes
+        self.errors = [None] * self.lanes
+        self.outputs = [[] for _ in range(self.lanes)]
+        self.operations = {}
+        """Instruções preparadas para a execução vetorizada, indexadas pelo endereço."""
+
+    def output(self, lane) -> str:
+        """Saída da lane `lane`, igual à impressa por `CPU.run`."""
+        return ''.join(self.outputs[lane])
+
+    def _operation(self, pc):
+        '''Retorna `(nome, instrução decodificada)` da instrução em `pc`, ou `('fault', mensagem)` se ela não pode ser executada.'''
+        operation = self.operations.get(pc)
+        if operation is not None:
+            return operation
+        executor = self.executor
+        try:
+            if not executor.text_base <= pc < self.text_end:
+                raise ValueError(f"PC {hex(pc)} fora do segmento .text na execução em lockstep.")
+            ic = executor.instruction_at(pc)
+            name = executor.lookup(ic).name
+            if name in ('beq', 'bne', 'blt', 'bge', 'bltu', 'bgeu', 'jal', 'jalr') and ic.imm % 4 != 0:
+                ic.handler(ic) # Lança o erro de alinhamento
+            if name == 'ecall' and ic.imm != 0:
+                raise ValueError(f"Imediato não reconhecido: {ic.imm}")
+            if executor.lookup(ic).extractor is None: # Instrução não implementada ou inválida
+                ic.handler(ic)
+            operation = (name, ic)
+        except Exception as e:
+            operation = ('fault', f"{e}")
+        self.operations[pc] = operation
+        return operation
+
+    def _fail(self, lane, message):
+        self.errors[lane] = message
+        self.outputs[lane].append(f"Erro inesperado: {message}\n")
+        self.active[lane] = False
+
+    def _lane_memory(self, lane):
+        return _LaneMemory(self.memory[lane])
+
+    def _select(self):
+        '''Escolhe o próximo grupo: as lanes ativas com o menor PC. Retorna `(pc, lanes, menor PC das outras lanes)`.'''
+        lanes = np.flatnonzero(self.active)
+        if len(lanes) == 0:
+            return None
+        pcs = self.pc[lanes]
+        pc = int(pcs.min())
+        same = pcs == pc
+        others = pcs[~same]
+        return pc, lanes[same], int(others.min()) if len(others) else None
+
+    def run(self):
+        """Executa todas as lanes até que cada uma encerre o programa ou pare com um erro."""
+        selected = self._select()
+        while selected is not None:
+            pc, lanes, waiting = selected
+            group = slice(None) if len(lanes) == self.lanes else lanes
+            steps = 0
+            while pc != waiting:
+                next_pc = self._execute(pc, group, lanes, steps)
+                if next_pc is None:
+                    break
+                steps += 1
+                pc = next_pc
+            else:
+                self.pc[lanes] = pc # Outro grupo chegou ao mesmo PC: os grupos se juntam
+                self.instructions[lanes] += steps
+            selected = self._select()
+
+    def _execute(self, pc, group, lanes, steps):
+        '''
+        Executa a instrução em `pc` nas lanes `lanes` (`group` é `lanes` ou `slice(None)` quando são todas).\n
+        Retorna o próximo PC do grupo, ou `None` se o grupo se desfez (desvio divergente, erro ou fim do programa); nesse caso
+        o PC e a contagem de instruções das lanes já foram atualizados.
+        '''
+        name, ic = self._operation(pc)
+        x = self.xregs
+        rd = ic.rd if name != 'fault' else 0
+
+        if name in ALU:
+            if rd != 0:
+                x[group, rd] = ALU[name](x[group, ic.rs1], x[group, ic.rs2])
+        elif name in ('addi', 'andi', 'ori'):
+            if rd != 0:
+                imm = np.uint32(ic.imm & M32)
+                a = x[group, ic.rs1]
+                x[group, rd] = a + imm if name == 'addi' else (a & imm if name == 'andi' else a | imm)
+        elif name in ('slli', 'srli', 'srai'):
+            if rd != 0:
+                shamt = ic.imm & 0x1F
+                if name == 'slli':
+                    x[group, rd] = x[group, ic.rs1] << shamt
+                elif name == 'srli':
+                    x[group, rd] = x[group, ic.rs1] >> shamt
+                else:
+                    x[group, rd] = (self.signed[group, ic.rs1] >> shamt).view(np.uint32)
+        elif name in ('slt', 'sltu'):
+            if rd != 0:
+                regs = self.signed if name == 'slt' else x
+                x[group, rd] = regs[group, ic.rs1] < regs[group, ic.rs2]
+        elif name in ('lui', 'auipc'):
+            if rd != 0:
+                x[group, rd] = ic.target
+        elif name in ('lb', 'lbu', 'lw', 'sb', 'sw'):
+            return self._memory_access(name, ic, pc, group, lanes, steps)
+        elif name in ('beq', 'bne', 'blt', 'bge', 'bltu', 'bgeu'):
+            regs = self.signed if name in ('blt', 'bge') else x
+            a, b = regs[group, ic.rs1], regs[group, ic.rs2]
+            match name:
+                case 'beq':
+                    taken = a == b
+                case 'bne':
+                    taken = a != b
+                case 'blt' | 'bltu':
+                    taken = a < b
+                case _:
+                    taken = a >= b
+            if taken.all():
+                return ic.target
+            if not taken.any():
+                return pc + 4
+            self.pc[lanes] = np.where(taken, ic.target, pc + 4)
+            self.instructions[lanes] += steps + 1
+            return None
+        elif name == 'jal':
+            if rd != 0:
+                x[group, rd] = pc + 4
+            return ic.target
+        elif name == 'jalr':
+            targets = (x[group, ic.rs1].astype(np.int64) + ic.imm) & ~1
+            if rd != 0:
+                x[group, rd] = pc + 4
+            if (targets == targets[0]).all():
+                return int(targets[0])
+            self.pc[lanes] = targets
+            self.instructions[lanes] += steps + 1
+            return None
+        elif name == 'ecall':
+            self._ecall(pc, lanes, steps)
+            return None
+        else: # 'fault'
+            self.instructions[lanes] += steps
+            for lane in lanes:
+                self._fail(lane, ic)
+            return None
+        return pc + 4
+
+    def _memory_access(self, name, ic, pc, group, lanes, steps):
+        '''Loads e stores: o caminho vetorizado atende às lanes com endereço válido; as demais usam `Memory` lane a lane.'''
+        address = self.xregs[group, ic.rs1].astype(np.int64) + ic.imm
+        size = self.memory.shape[1]
+        if name == 'lw' and self.remap_low:
+            address = np.where(address < 0x2000, address + 0x1ffe, address) # Mesmo ajuste de InstructionSet.lw
+        if name in ('lw', 'sw'):
+            fast = (address & 3) == 0
+            fast &= (address >= (self.text_end if name == 'sw' else 0)) & (address < size)
+        else:
+            fast = (address >= (self.text_end if name == 'sb' else 0)) & (address < size)
+
+        if fast.all():
+            match name:
+                case 'lw':
+                    if ic.rd != 0:
+                        self.xregs[group, ic.rd] = self.words[lanes, address >> 2]
+                case 'lb':
+                    if ic.rd != 0:
+                        self.xregs[group, ic.rd] = self.memory[lanes, address].view(np.int8).astype(np.int32).view(np.uint32)
+                case 'lbu':
+                    if ic.rd != 0:
+                        self.xregs[group, ic.rd] = self.memory[lanes, address]
+                case 'sb':
+                    self.memory[lanes, address] = self.xregs[group, ic.rs2] & 0xff
+                case 'sw':
+                    self.words[lanes, address >> 2] = self.xregs[group, ic.rs2]
+            return pc + 4
+
+        # Lane a lane, com a mesma semântica de Memory (inclusive os erros)
+        self.instructions[lanes] += steps
+        for lane, lane_address in zip(lanes, address):
+            memory = self._lane_memory(lane)
+            lane_address = int(lane_address)
+            try:
+                if name in ('sb', 'sw'):
+                    getattr(memory, name)(lane_address, int(self.xregs[lane, ic.rs2]))
+                else:
+                    value = getattr(memory, name)(lane_address)
+                    if ic.rd != 0:
+                        self.xregs[lane, ic.rd] = value
+            except Exception as e:
+                self._fail(lane, f"{e}")
+                continue
+            self.instructions[lane] += 1
+            self.pc[lane] = pc + 4
+        return None
+
+    def _ecall(self, pc, lanes, steps):
+        '''Chamada de sistema, lane a lane (a saída de cada lane é separada).'''
+        self.instructions[lanes] += steps
+        for lane in lanes:
+            a0 = int(self.xregs[lane, 10])
+            match int(self.xregs[lane, 17]):
+                case 1: # imprimir inteiro
+                    self.outputs[lane].append(str(a0))
+                case 4: # imprimir string
+                    if a0 < 0x2000 and self.remap_low:
+                        a0 += 0x2000 - 2 # Mesmo ajuste de InstructionSet.ecall
+                    try:
+                        self.outputs[lane].append(self._lane_memory(lane).read_string(a0))
+                    except Exception as e:
+                        self._fail(lane, f"{e}")
+                        continue
+                case 10: # encerrar programa
+                    self.outputs[lane].append("\nPrograma encerrado com sucesso.\nSystem Exit: 0\n")
+                    self.exit_codes[lane] = 0
+                    self.active[lane] = False
+                    continue
+                case syscall:
+                    self._fail(lane, f"Syscall não reconhecida: {syscall}")
+                    continue
+            self.instructions[lane] += 1
+            self.pc[lane] = pc + 4
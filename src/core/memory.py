@@ -1,9 +1,31 @@
 """
 Módulo que implementa a memória do simulador.\n
-Além de inicializar a memória, a classe Memory possui métodos para leitura e escrita de bytes e palavras e o método `load_mem` para carregar o conteúdo de um arquivo montado pelo RARS.
+Além de inicializar a memória, a classe Memory possui métodos para leitura e escrita de bytes e palavras e o método `load_mem` para carregar o conteúdo de um arquivo montado pelo RARS.\n
+Acessos a palavras alinhadas (`lw`/`sw`) usam `WORDS`, uma visão `uint32` little-endian de `MEM` (sem cópia): um único acesso indexado
+em vez de quatro acessos a bytes. Acessos fora dos limites seguem o caminho byte a byte, com os mesmos erros de antes.
 """
 
 import numpy as np
+from core.loader import read_words
+
+STRING_CHUNK = 64
+"""Tamanho inicial dos trechos em que `find_nul` procura o fim de uma string (dobra a cada trecho sem zero)."""
+
+def find_nul(data, start, stop=None):
+    '''
+    Retorna o índice do primeiro byte zero de `data[start:stop]` (um array `uint8`), ou `-1` se não houver.\n
+    A busca é vetorizada e feita em trechos crescentes, de forma que strings curtas não percorrem o resto da memória.
+    '''
+    stop = len(data) if stop is None else stop
+    chunk = STRING_CHUNK
+    while start < stop:
+        end = min(start + chunk, stop)
+        zeros = np.flatnonzero(data[start:end] == 0)
+        if len(zeros):
+            return start + int(zeros[0])
+        start = end
+        chunk <<= 1
+    return -1
 
 class Memory:
     '''
@@ -14,8 +36,19 @@ class Memory:
     '''
     def __init__(self) -> None:
         self.MEM = np.zeros(16384, dtype=np.uint8)
+        self.WORDS = self.MEM.view('<u4')
+        """Visão de `MEM` como palavras de 32 bits little-endian: `WORDS[address >> 2]` é a palavra do endereço alinhado `address`."""
         self.text_base = 0x0000  # Endereço base do segmento .text
         self.data_base = 0x2000  # Endereço base do segmento .data
+        self.text_end = 0x2000   # Fim (exclusivo) do segmento .text
+        self.stack_top = None    # Valor inicial do sp: None mantém o registrador zerado
+        self.remap_low = True
+        """
+        Ajuste de endereços baixos para os arquivos do RARS: o `lw` lê endereços abaixo de 0x2000 em `endereço + 0x1ffe` e a
+        impressão de string do `ecall` lê endereços abaixo de `data_base` em `endereço + data_base - 2` (ver `InstructionSet`).
+        """
+        self.text_watchers = []
+        """Funções chamadas com o endereço de cada escrita no segmento .text (ex.: invalidação da cache de decodificação do `Executor`)."""
 
     def lb(self, address):
         '''Lê um byte da memória e o converte para um inteiro de 32 bits estendendo o sinal do byte. Retorna o inteiro de 32 bits.'''
@@ -34,6 +67,8 @@ class Memory:
         '''Lê uma palavra de 32 bits da memória e retorna o seu valor.'''
         if address != 0x2000 and address % 4 != 0:
             raise ValueError(f"Endereço {hex(address)} não retorna um múltiplo de 4.")
+        if 0 <= address < len(self.MEM):
+            return self.WORDS[address >> 2]
 
         byte0 = np.uint32(self.MEM[address+0])
         byte1 = np.uint32(self.MEM[address+1])
@@ -42,14 +77,40 @@ class Memory:
         word = (byte3 << 24) | (byte2 << 16) | (byte1 << 8) | byte0
         return (word)
 
+    def text_words(self, end=None):
+        '''Retorna o segmento .text (até `end`, se informado) como um vetor de palavras `uint32` (little-endian), sem cópia.'''
+        return self.MEM[self.text_base:self.text_end if end is None else end].view('<u4')
+
+    def text_extent(self):
+        '''Fim (exclusivo) da parte do .text que pode conter código. Nesta memória de tamanho fixo, é o próprio `text_end`.'''
+        return self.text_end
+
+    def read_string(self, address) -> str:
+        '''Lê a string terminada em zero que começa em `address` (cada byte é um caractere, como em `chr`).'''
+        address = int(address)
+        end = find_nul(self.MEM, address)
+        if end < 0:
+            raise IndexError(f"String em {hex(address)} não termina antes do fim da memória.")
+        return self.MEM[address:end].tobytes().decode('latin-1')
+
     def sb(self, address, byte):
         '''Escreve o byte passado como parâmetro na memória.'''
         self.MEM[address] = byte & 0xff # Apenas os 8 bits menos significativos
+        if self.text_base <= address < self.text_end:
+            for watcher in self.text_watchers:
+                watcher(address)
 
     def sw(self, address, word):
         '''Escreve os 4 bytes de word na memória, colocando o menos significativo no endereço especificado e os outros nos endereços de byte seguintes.'''
         if address % 4 != 0:
             raise ValueError(f"Endereço {hex(address)} não retorna um múltiplo de 4.")
+        if 0 <= address < len(self.MEM):
+            self.WORDS[address >> 2] = word & 0xFFFFFFFF
+            if self.text_base <= address < self.text_end:
+                for byte_address in range(address, address + 4):
+                    for watcher in self.text_watchers:
+                        watcher(byte_address)
+            return
 
         byte0 = word         & 0xFF # Byte menos significativo (bits 0 a 7)
         byte1 = (word >> 8)  & 0xFF # Próximo byte (bits 8 a 15)
@@ -61,45 +122,54 @@ class Memory:
         self.sb(address+3, byte3)
 
 
-    def _store(self, address, value: int):
-        """
-        Armazena uma palavra de 32 bits (4 bytes) em um endereço específico.\n
-        - address: Endereço da memória\n
-        - value: Valor de 32 bits a ser armazenado
-        """
-        byte0 = value & 0xFF # Byte menos significativo (bits 0 a 7)
-        byte1 = (value >>  8) & 0xFF
-        byte2 = (value >> 16) & 0xFF
-        byte3 = (value >> 24) & 0xFF
-        self.MEM[address]     = byte0
-        self.MEM[address + 1] = byte1
-        self.MEM[address + 2] = byte2
-        self.MEM[address + 3] = byte3
-
-    def load_mem(self, code_path, data_path):
+    def write_bytes(self, address, data):
+        '''Copia os bytes de `data` (`bytes` ou array do NumPy, interpretado byte a byte) para a memória a partir de `address`.'''
+        data = np.frombuffer(data, dtype=np.uint8)
+        if address < 0 or address + len(data) > len(self.MEM):
+            raise ValueError(f"Escrita de {len(data)} bytes em {hex(address)} excede a memória de {len(self.MEM)} bytes.")
+        self.MEM[address:address + len(data)] = data
+        if self.text_watchers:
+            for byte_address in range(max(address, self.text_base), min(address + len(data), self.text_end)):
+                for watcher in self.text_watchers:
+                    watcher(byte_address)
+
+    def snapshot(self):
+        '''Cópia do conteúdo da memória, para `restore`.'''
+        return self.MEM.copy()
+
+    def restore(self, snapshot):
+        '''Restaura o conteúdo salvo por `snapshot`. Os `text_watchers` são chamados para os bytes do .text que mudaram.'''
+        text = self.text_words().copy() if self.text_watchers else None
+        self.MEM[:] = snapshot
+        if text is not None:
+            for index in np.flatnonzero(text != self.text_words()):
+                address = self.text_base + 4 * int(index)
+                for byte_address in range(address, address + 4):
+                    for watcher in self.text_watchers:
+                        watcher(byte_address)
+
+    def load_data(self, words):
+        '''Copia o vetor de palavras `words` para o segmento .data.'''
+        if len(words) > 0x1000 >> 2:
+            raise ValueError("Endereço de dados excedeu o limite de 0x2ffc.")
+        self.write_bytes(0x2000, np.asarray(words).astype('<u4'))
+
+    def load_mem(self, code_path, data_path, format=None, cache=None):
         """
         Carrega o conteúdo de um arquivo montado pelo RARS para a memória.\n
         Dos arquivos montados pelo RARS, o segmento .text está no intervalo [0x00000000; 0x00001fff].\n
         O segmento .data está em [0x00002000; 0x00002ffc].\n
-        Os arquivos lidos estão salvos em binário (strings) como `code.txt` e `data.txt`.
+        Os arquivos lidos estão salvos em binário (strings) como `code.txt` e `data.txt`, mas também podem estar em hexadecimal
+        ou em binário puro (ver `core.loader`); `format` força um dos formatos de `loader.FORMATS`.
+        Com `cache` (uma `ImageCache`), os arquivos já convertidos são lidos da cache em disco.
         """
+        read = read_words if cache is None else cache.words
         if code_path:
             # Carregar o segmento de código:
-            with open(code_path, 'r') as f:
-                address = 0x0
-                for line in f:
-                    if address > 0x1fff:
-                        raise ValueError("Endereço de código excedeu o limite de 0x1fff.")
-                    instruction = int(line.strip(), 2)
-                    self._store(address, instruction)
-                    address += 4
+            words = read(code_path, format)
+            if len(words) > 0x2000 >> 2:
+                raise ValueError("Endereço de código excedeu o limite de 0x1fff.")
+            self.write_bytes(0x0, words.astype('<u4'))
         if data_path:
             # Carregar o segmento de dados:
-            with open(data_path, 'r') as f:
-                address = 0x2000
-                for line in f:
-                    if address > 0x2ffc:
-                        raise ValueError("Endereço de dados excedeu o limite de 0x2ffc.")
-                    data = int(line.strip(), 2)
-                    self._store(address, data)
-                    address += 4
+            self.load_data(read(data_path, format))
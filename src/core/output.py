@@ -0,0 +1,51 @@
+"""
+Destinos da saída dos programas simulados.\n
+As chamadas de sistema de impressão (`ecall` 1 e 4) escrevem em `InstructionSet.output`, configurada pela `CPU` (`output=`).
+Qualquer objeto com os métodos `write(texto)` e `flush()` pode ser usado (ex.: `io.StringIO`, um arquivo aberto):\n
+- `StdoutSink`: acumula os textos e os escreve em `sys.stdout` em blocos de até `buffer_size` caracteres (e em `flush`).
+  O `sys.stdout` é consultado a cada escrita em bloco, de forma que `contextlib.redirect_stdout` continua funcionando;
+- `BufferSink`: guarda toda a saída em memória (execuções em lote, testes), lida com `getvalue()`.
+"""
+
+import sys
+
+class StdoutSink:
+    """Saída padrão com buffer. Com `buffer_size=0`, cada texto é escrito imediatamente."""
+    def __init__(self, buffer_size=1 << 16) -> None:
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Escreve em `sys.stdout` os textos acumulados."""
+        if self.parts:
+            sys.stdout.write(''.join(self.parts))
+            self.parts.clear()
+            self.size = 0
+
+
+class BufferSink:
+    """Saída capturada em memória."""
+    def __init__(self) -> None:
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self) -> str:
+        """Retorna tudo o que foi escrito desde a criação (ou desde `clear`)."""
+        if len(self.parts) > 1:
+            self.parts[:] = [''.join(self.parts)]
+        return self.parts[0] if self.parts else ''
+
+    def clear(self):
+        self.parts.clear()
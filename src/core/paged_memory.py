@@ -0,0 +1,238 @@
+"""
+Memória paginada e esparsa, com layout configurável.\n
+`Memory` é um array fixo de 16 KiB com o .text em 0x0000 e o .data em 0x2000. `PagedMemory` cobre todo o espaço de endereçamento
+de 32 bits: a memória é dividida em páginas (4 KiB por padrão), alocadas apenas na primeira escrita. Leituras de páginas nunca escritas
+retornam zero sem alocar nada, de forma que o uso de memória é proporcional às páginas realmente tocadas pelo programa.\n
+A interface é a mesma de `Memory` (`lb`, `lbu`, `lw`, `sb`, `sw`, `text_words`, `read_string`, `load_mem`, `text_watchers`),
+e os endereços são interpretados módulo 2^32.
+"""
+
+import numpy as np
+from core.loader import read_words
+from core.memory import find_nul
+
+M32 = 0xffffffff
+
+class PagedMemory:
+    '''
+    Memória esparsa de 32 bits, com páginas de `2 ** page_bits` bytes alocadas sob demanda.\n
+    - `text_base`, `data_base`: endereços base dos segmentos .text e .data;
+    - `text_size`: tamanho do .text em bytes (padrão: `data_base - text_base`). A cache de decodificação do `Executor` cobre apenas
+      as páginas do .text alocadas quando ele é criado (ver `text_extent`);
+    - `stack_top`: valor inicial do `sp` (x2), ou `None` para manter o registrador zerado como em `Memory`;
+    - `remap_low`: aplica no `lw` e no `ecall` o ajuste de endereços baixos dos arquivos do RARS (ver `Memory.remap_low`).
+      O padrão (`None`) o liga apenas no layout compacto (.text em 0x0000 e .data em 0x2000), o único em que ele faz sentido.
+    '''
+    LAYOUTS = {
+        'compacto': dict(text_base=0x00000000, data_base=0x00002000),
+        'rars': dict(text_base=0x00400000, data_base=0x10010000, text_size=0x00100000, stack_top=0x7fffeffc),
+    }
+    """Layouts predefinidos: `compacto` (o mesmo de `Memory`) e `rars` (configuração padrão do RARS)."""
+
+    def __init__(self, text_base=0x0000, data_base=0x2000, text_size=None, stack_top=None, page_bits=12, remap_low=None) -> None:
+        self.text_base = text_base
+        self.data_base = data_base
+        self.text_end = text_base + (data_base - text_base if text_size is None else text_size)
+        """Fim (exclusivo) do segmento .text."""
+        self.stack_top = stack_top
+        self.remap_low = text_base == 0x0000 and data_base == 0x2000 if remap_low is None else remap_low
+        self.page_bits = page_bits
+        self.page_size = 1 << page_bits
+        self.offset_mask = self.page_size - 1
+        self.pages = {}
+        """Páginas alocadas (`uint8`), indexadas pelo número da página (`endereço >> page_bits`)."""
+        self.page_words = {}
+        """Visão `uint32` little-endian de cada página alocada."""
+        self.text_watchers = []
+        """Funções chamadas com o endereço de cada escrita no segmento .text (ex.: invalidação da cache de decodificação do `Executor`)."""
+        self._text_snapshot = None
+        """Retrato (`snapshot`) com o mesmo .text da memória, se o .text não foi escrito desde que ele foi tirado ou restaurado."""
+
+    @classmethod
+    def layout(cls, name, **overrides):
+        """Cria a memória com o layout predefinido `name` (ver `LAYOUTS`), com os parâmetros de `overrides` substituídos."""
+        if name not in cls.LAYOUTS:
+            raise ValueError(f"Layout de memória não reconhecido: {name}")
+        return cls(**{**cls.LAYOUTS[name], **overrides})
+
+    def _page(self, number):
+        '''Retorna a página `number`, alocando-a se ainda não existir.'''
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = np.zeros(self.page_size, dtype=np.uint8)
+            self.page_words[number] = page.view('<u4')
+        return page
+
+    def _notify(self, address):
+        if self.text_base <= address < self.text_end:
+            self._text_snapshot = None
+            for watcher in self.text_watchers:
+                watcher(address)
+
+    def lb(self, address):
+        '''Lê um byte da memória e o converte para um inteiro de 32 bits estendendo o sinal do byte. Retorna o inteiro de 32 bits.'''
+        address = int(address) & M32
+        page = self.pages.get(address >> self.page_bits)
+        byte = 0 if page is None else int(page[address & self.offset_mask])
+        if byte & 0x80: # Extensão de sinal
+            byte -= 256
+        return (byte & 0xffffffff)
+
+    def lbu(self, address):
+        '''Lê um byte da memória e o converte para um inteiro de 32 bits sem sinal (valor positivo). Retorna o inteiro de 32 bits.'''
+        address = int(address) & M32
+        page = self.pages.get(address >> self.page_bits)
+        return np.uint32(0 if page is None else page[address & self.offset_mask])
+
+    def lw(self, address):
+        '''Lê uma palavra de 32 bits da memória e retorna o seu valor.'''
+        if address != 0x2000 and address % 4 != 0:
+            raise ValueError(f"Endereço {hex(address)} não retorna um múltiplo de 4.")
+        address = int(address) & M32
+        words = self.page_words.get(address >> self.page_bits)
+        if words is None:
+            return np.uint32(0)
+        return words[(address & self.offset_mask) >> 2]
+
+    def sb(self, address, byte):
+        '''Escreve o byte passado como parâmetro na memória.'''
+        address = int(address) & M32
+        self._page(address >> self.page_bits)[address & self.offset_mask] = byte & 0xff
+        self._notify(address)
+
+    def sw(self, address, word):
+        '''Escreve a palavra de 32 bits na memória (little-endian).'''
+        if address % 4 != 0:
+            raise ValueError(f"Endereço {hex(address)} não retorna um múltiplo de 4.")
+        address = int(address) & M32
+        number = address >> self.page_bits
+        self._page(number)
+        self.page_words[number][(address & self.offset_mask) >> 2] = word & 0xFFFFFFFF
+        if self.text_base <= address < self.text_end:
+            for byte_address in range(address, address + 4):
+                self._notify(byte_address)
+
+    def read_bytes(self, address, size) -> np.ndarray:
+        '''Retorna uma cópia dos `size` bytes a partir de `address`. Páginas não alocadas são lidas como zero, sem alocação.'''
+        data = np.zeros(size, dtype=np.uint8)
+        position = 0
+        while position < size:
+            current = (address + position) & M32
+            offset = current & self.offset_mask
+            count = min(self.page_size - offset, size - position)
+            page = self.pages.get(current >> self.page_bits)
+            if page is not None:
+                data[position:position + count] = page[offset:offset + count]
+            position += count
+        return data
+
+    def text_words(self, end=None):
+        '''Retorna uma cópia do segmento .text (até `end`, se informado) como um vetor de palavras `uint32` (little-endian).'''
+        return self.read_bytes(self.text_base, (self.text_end if end is None else end) - self.text_base).view('<u4')
+
+    def text_extent(self):
+        '''
+        Fim (exclusivo) da parte do .text que está em páginas alocadas: o fim da última página alocada do segmento, limitado a `text_end`.\n
+        Define o tamanho da cache de decodificação do `Executor`, que acompanha o programa carregado e não o tamanho do segmento
+        (1 MiB no layout `rars`). Sem páginas alocadas no .text, é o próprio `text_base`.
+        '''
+        first, last = self.text_base >> self.page_bits, (self.text_end - 1) >> self.page_bits
+        numbers = [number for number in self.pages if first <= number <= last]
+        if not numbers:
+            return self.text_base
+        return min(self.text_end, (max(numbers) + 1) << self.page_bits)
+
+    def read_string(self, address) -> str:
+        '''Lê a string terminada em zero que começa em `address`. Uma página não alocada termina a string (é lida como zero).'''
+        address = int(address) & M32
+        parts = []
+        while True:
+            page = self.pages.get(address >> self.page_bits)
+            if page is None:
+                break
+            offset = address & self.offset_mask
+            end = find_nul(page, offset)
+            if end >= 0:
+                parts.append(page[offset:end].tobytes())
+                break
+            parts.append(page[offset:].tobytes())
+            address = (address + self.page_size - offset) & M32
+        return b''.join(parts).decode('latin-1')
+
+    def write_bytes(self, address, data):
+        '''Copia os bytes de `data` (`bytes` ou array do NumPy, interpretado byte a byte) para a memória a partir de `address`, alocando as páginas necessárias.'''
+        data = np.frombuffer(data, dtype=np.uint8)
+        position = 0
+        while position < len(data):
+            current = (address + position) & M32
+            offset = current & self.offset_mask
+            count = min(self.page_size - offset, len(data) - position)
+            self._page(current >> self.page_bits)[offset:offset + count] = data[position:position + count]
+            position += count
+        if address < self.text_end and address + len(data) > self.text_base:
+            self._text_snapshot = None
+        if self.text_watchers:
+            for byte_address in range(max(address, self.text_base), min(address + len(data), self.text_end)):
+                for watcher in self.text_watchers:
+                    watcher(byte_address)
+
+    def snapshot(self):
+        '''Cópia das páginas alocadas, para `restore`.'''
+        self._text_snapshot = {number: page.copy() for number, page in self.pages.items()}
+        return self._text_snapshot
+
+    def _text_pages(self):
+        '''Páginas alocadas que contêm bytes do .text, indexadas pelo número da página.'''
+        first, last = self.text_base >> self.page_bits, (self.text_end - 1) >> self.page_bits
+        return {number: page for number, page in self.pages.items() if first <= number <= last}
+
+    def _clear(self):
+        '''Descarta todas as páginas.'''
+        self.pages.clear()
+        self.page_words.clear()
+
+    def restore(self, snapshot):
+        '''
+        Restaura o conteúdo salvo por `snapshot`. Os `text_watchers` são chamados para os bytes do .text que mudaram.\n
+        Apenas as páginas alocadas do .text são comparadas, e só quando o .text pode ter mudado: se ele foi escrito desde o
+        último `snapshot` ou `restore`, ou se `snapshot` é outro retrato. Na varredura de `core.sweep`, nada é comparado.
+        '''
+        before = self._text_pages() if self.text_watchers and snapshot is not self._text_snapshot else None
+        self._clear()
+        for number, page in snapshot.items():
+            self._page(number)[:] = page
+        if before is not None:
+            after = self._text_pages()
+            zeros = np.zeros(self.page_size >> 2, dtype='<u4')
+            for number in sorted(before.keys() | after.keys()):
+                old, new = before.get(number), after.get(number)
+                if old is new:
+                    continue
+                old = zeros if old is None else old.view('<u4')
+                new = zeros if new is None else new.view('<u4')
+                for index in np.flatnonzero(old != new):
+                    address = (number << self.page_bits) + 4 * int(index)
+                    for byte_address in range(address, address + 4):
+                        self._notify(byte_address)
+        self._text_snapshot = snapshot
+
+    def load_data(self, words):
+        '''Copia o vetor de palavras `words` para o segmento .data.'''
+        if self.data_base + 4 * len(words) > M32 + 1:
+            raise ValueError("Endereço de dados excedeu o limite de 0xfffffffc.")
+        self.write_bytes(self.data_base, np.asarray(words).astype('<u4'))
+
+    def load_mem(self, code_path, data_path, format=None, cache=None):
+        """
+        Carrega arquivos de programa (ver `core.loader`) nos segmentos .text e .data.\n
+        O .text é limitado por `text_end`; o .data pode ocupar qualquer quantidade de páginas.
+        Com `cache` (uma `ImageCache`), os arquivos já convertidos são lidos da cache em disco.
+        """
+        read = read_words if cache is None else cache.words
+        if code_path:
+            words = read(code_path, format)
+            if self.text_base + 4 * len(words) > self.text_end:
+                raise ValueError(f"Endereço de código excedeu o limite de {hex(self.text_end - 1)}.")
+            self.write_bytes(self.text_base, words.astype('<u4'))
+        if data_path:
+            self.load_data(read(data_path, format))
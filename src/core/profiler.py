@@ -0,0 +1,203 @@
+"""
+Perfil de execução por endereço (PC) e por bloco básico, com exportação para flamegraph.\n
+Com `CPU(..., profile=True)`, `cpu.profiler` conta quantas vezes cada palavra do .text foi executada, em um array do NumPy indexado
+por `(pc - text_base) >> 2`. No motor `step`, cada instrução soma 1 no seu endereço; nos motores por blocos, cada bloco traduzido
+conta suas execuções e os contadores são distribuídos pelos endereços do bloco em `Profiler.pc_counts`.\n
+A pilha de chamadas do programa é reconstruída pelas instruções de chamada e retorno da convenção do RISC-V: `jal`/`jalr` com
+`rd = ra` entram na função de destino e `jalr x0, 0(ra)` retorna. As instruções executadas entre duas mudanças de pilha são
+atribuídas à pilha corrente, sem custo por instrução, e `folded` gera o formato "pilha;de;chamadas contagem" lido por
+`flamegraph.pl`, `inferno` e `speedscope`. Os nomes das funções vêm dos símbolos do executável ELF (`CPU.from_elf`) ou,
+sem símbolos, são os endereços.\n
+Pela linha de comando (a partir de `src/`):
+
+    python -m core.profiler tests/files/ultraT_text.txt tests/files/ultraT_data.txt --folded ultraT.folded
+"""
+
+import argparse
+import sys
+import numpy as np
+
+RA = 1
+
+def disassemble(ic, name) -> str:
+    '''Texto em assembly da instrução decodificada `ic`, de mnemônico `name` (ex.: `addi x5, x5, 1`, `lw x6, 4(x2)`).'''
+    if name == 'ecall':
+        return 'ecall'
+    if name in ('lb', 'lbu', 'lw'):
+        return f'{name} x{ic.rd}, {ic.imm}(x{ic.rs1})'
+    if name in ('sb', 'sw'):
+        return f'{name} x{ic.rs2}, {ic.imm}(x{ic.rs1})'
+    if name == 'jalr':
+        return f'jalr x{ic.rd}, {ic.imm}(x{ic.rs1})'
+    if name == 'jal':
+        return f'jal x{ic.rd}, {ic.target:#x}'
+    if name in ('lui', 'auipc'):
+        return f'{name} x{ic.rd}, {ic.imm:#x}'
+    if ic.ins_format == 'B_FORMAT':
+        return f'{name} x{ic.rs1}, x{ic.rs2}, {ic.target:#x}'
+    if ic.ins_format == 'R_FORMAT':
+        return f'{name} x{ic.rd}, x{ic.rs1}, x{ic.rs2}'
+    if ic.ins_format == 'I_FORMAT':
+        return f'{name} x{ic.rd}, x{ic.rs1}, {ic.imm}'
+    return name
+
+def transfer(ic):
+    '''Classifica `ic` para a pilha de chamadas: `'call'` (`jal`/`jalr` com `rd = ra`), `'return'` (`jalr x0, 0(ra)`) ou `None`.'''
+    if ic.opcode == 0x6F and ic.rd == RA:
+        return 'call'
+    if ic.opcode == 0x67:
+        if ic.rd == RA:
+            return 'call'
+        if ic.rd == 0 and ic.rs1 == RA and ic.imm == 0:
+            return 'return'
+    return None
+
+
+class Profiler:
+    """Contadores por PC e pilha de chamadas de um `Executor` (ver o módulo)."""
+    def __init__(self, executor, symbols=None) -> None:
+        self.executor = executor
+        self.text_base = executor.text_base
+        self.hits = np.zeros(len(executor.decode_cache), dtype=np.int64)
+        """Execuções de cada palavra do .text pelo motor `step`."""
+        self.blocks = []
+        """`(índice da primeira palavra, quantidade de instruções)` de cada bloco traduzido, na ordem de `block_hits`."""
+        self.block_hits = []
+        """Execuções de cada bloco traduzido."""
+        self.names = {}
+        """Nome de cada endereço com símbolo, para as funções da pilha."""
+        self.add_symbols(symbols or {})
+        self.clear()
+
+    def add_symbols(self, symbols):
+        '''Usa os símbolos `{nome: endereço}` (ex.: `ElfImage.symbols`) como nomes das funções; símbolos internos são ignorados.'''
+        for name, address in sorted(symbols.items()):
+            if not name.startswith(('$', '.', '__')):
+                self.names.setdefault(address, name)
+
+    def clear(self):
+        '''Zera os contadores e volta a pilha para a função de entrada (o PC atual).'''
+        self.hits[:] = 0
+        self.block_hits[:] = [0] * len(self.block_hits)
+        self.stack = (int(self.executor.pc),)
+        """Pilha de chamadas corrente: endereços de entrada das funções, da mais externa à atual."""
+        self.stacks = {}
+        """Instruções executadas em cada pilha."""
+        self.mark = self.executor.global_counter
+
+    def add_block(self, first, size) -> int:
+        '''Registra um bloco traduzido e retorna seu índice em `block_hits`.'''
+        self.blocks.append((first, size))
+        self.block_hits.append(0)
+        return len(self.blocks) - 1
+
+    def flush(self):
+        '''Atribui à pilha corrente as instruções executadas desde a última mudança de pilha.'''
+        counter = self.executor.global_counter
+        if counter != self.mark:
+            self.stacks[self.stack] = self.stacks.get(self.stack, 0) + counter - self.mark
+            self.mark = counter
+
+    def call(self, target):
+        self.flush()
+        self.stack += (int(target),)
+
+    def ret(self):
+        self.flush()
+        if len(self.stack) > 1: # Retorno sem chamada correspondente (ex.: da função de entrada): a pilha não muda
+            self.stack = self.stack[:-1]
+
+    def name(self, address) -> str:
+        return self.names.get(address, f'{address:#06x}')
+
+    def pc_counts(self) -> np.ndarray:
+        '''Execuções de cada palavra do .text, somando as instruções executadas uma a uma e as dos blocos traduzidos.'''
+        counts = self.hits.copy()
+        for (first, size), hits in zip(self.blocks, self.block_hits):
+            if hits:
+                counts[first:first + size] += hits
+        return counts
+
+    def basic_blocks(self):
+        '''
+        Blocos básicos do .text executado, em ordem decrescente de execuções: lista de `(início, fim, execuções)` (endereços, fim exclusivo).\n
+        Os blocos são delimitados estaticamente: começam em destinos de desvios e de `jal` e após desvios, `jal`, `jalr` e `ecall`,
+        e são contados pela execução da primeira instrução.
+        '''
+        executor = self.executor
+        counts = self.pc_counts()
+        executed = np.flatnonzero(counts)
+        leaders = set()
+        for index in executed:
+            index = int(index)
+            ic = executor.instruction_at(self.text_base + (index << 2))
+            if ic.opcode in (0x63, 0x6F, 0x67, 0x73):
+                leaders.add(index + 1)
+                if ic.opcode in (0x63, 0x6F):
+                    leaders.add((ic.target - self.text_base) >> 2)
+        blocks = []
+        start = None
+        for index in executed:
+            index = int(index)
+            if start is None or index in leaders or index != previous + 1:
+                if start is not None:
+                    blocks.append((start, previous + 1))
+                start = index
+            previous = index
+        if start is not None:
+            blocks.append((start, previous + 1))
+        result = [(self.text_base + (first << 2), self.text_base + (end << 2), int(counts[first])) for first, end in blocks]
+        return sorted(result, key=lambda block: (-block[2], block[0]))
+
+    def annotate(self, top=None) -> str:
+        '''Listagem dos blocos básicos em ordem de execuções, com as execuções e a fração do total de cada instrução.'''
+        executor = self.executor
+        counts = self.pc_counts()
+        total = int(counts.sum()) or 1
+        lines = []
+        for start, end, hits in self.basic_blocks()[:top]:
+            lines.append(f'bloco {start:#06x}-{end - 4:#06x}: {hits} execuções')
+            for address in range(start, end, 4):
+                ic = executor.instruction_at(address)
+                count = int(counts[(address - self.text_base) >> 2])
+                text = disassemble(ic, executor.dispatch[ic.key].name)
+                lines.append(f'{count:>12} {100 * count / total:6.2f}%  {address:#06x}: {text}')
+            lines.append('')
+        return '\n'.join(lines)
+
+    def folded(self) -> str:
+        '''Pilhas no formato "folded" (`função;função chamada;... instruções`), uma por linha, para ferramentas de flamegraph.'''
+        self.flush()
+        return ''.join(f"{';'.join(self.name(address) for address in stack)} {count}\n"
+                       for stack, count in sorted(self.stacks.items()))
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            f.write(self.folded())
+
+
+def main(argv=None):
+    from core.cpu import CPU
+    parser = argparse.ArgumentParser(description="Executa um programa RV32I e mostra os endereços e blocos mais executados.")
+    parser.add_argument('code', help="arquivo .text (ou executável ELF, com --elf)")
+    parser.add_argument('data', nargs='?', default=None, help="arquivo .data")
+    parser.add_argument('--elf', action='store_true', help="`code` é um executável ELF32 (os símbolos nomeiam as funções)")
+    parser.add_argument('--engine', choices=CPU.ENGINES, default='step')
+    parser.add_argument('--backend', choices=CPU.BACKENDS, default='numpy')
+    parser.add_argument('--top', type=int, default=10, help="quantidade de blocos na listagem")
+    parser.add_argument('--folded', default=None, help="arquivo de saída com as pilhas para flamegraph")
+    args = parser.parse_args(argv)
+
+    if args.elf:
+        cpu = CPU.from_elf(args.code, args.engine, backend=args.backend, profile=True)
+    else:
+        cpu = CPU(args.code, args.data, args.engine, backend=args.backend, profile=True)
+    cpu.run()
+    print()
+    print(cpu.profiler.annotate(args.top))
+    if args.folded:
+        cpu.profiler.write_folded(args.folded)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
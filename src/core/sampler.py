@@ -0,0 +1,140 @@
+"""
+Amostragem estatística do PC em intervalos de tempo do sistema (`signal.setitimer`).\n
+O perfil exato de `core.profiler` custa trabalho em cada instrução ou bloco. `Sampler` não altera a execução: um temporizador do
+sistema interrompe o processo a cada `interval` segundos e o tratador do sinal anota o `Executor.pc` e o nome da função Python em
+execução (o método do `InstructionSet`, o `step` ou a função do bloco traduzido). Com o intervalo padrão de 1 ms, o custo é da ordem
+de 1% do tempo de execução.\n
+As amostras são agregadas por PC (`pcs`), por função do programa simulado (`functions`) e por função do simulador (`handlers`).
+As funções do programa são delimitadas pelos símbolos do ELF, se houver, ou pelos destinos das chamadas (`jal`/`jalr` com `rd = ra`)
+encontrados no .text. No motor `step`, o PC é incrementado antes da execução de cada instrução: uma amostra tirada durante a
+execução é atribuída à instrução seguinte. Nos motores por blocos, o PC só é atualizado no fim de cada bloco: a amostra é atribuída
+ao início do bloco.\n
+O temporizador usa sinais do Unix e só pode ser instalado na thread principal:
+
+    with Sampler(cpu, interval=0.001) as sampler:
+        cpu.run()
+    print(sampler.report())
+"""
+
+import argparse
+import signal
+import sys
+from collections import Counter
+import numpy as np
+from core.profiler import transfer
+
+class Sampler:
+    """Amostrador do PC de um `Executor` (ver o módulo). `timer` é `'prof'` (tempo de CPU do processo) ou `'real'` (tempo de relógio)."""
+    TIMERS = {
+        'prof': ('ITIMER_PROF', 'SIGPROF'),
+        'real': ('ITIMER_REAL', 'SIGALRM'),
+    }
+
+    def __init__(self, executor, interval=0.001, timer='prof', symbols=None) -> None:
+        if timer not in self.TIMERS:
+            raise ValueError(f"Temporizador não reconhecido: {timer}")
+        if not hasattr(signal, 'setitimer'):
+            raise RuntimeError("A amostragem usa signal.setitimer, que não existe neste sistema.")
+        self.executor = executor
+        self.interval = interval
+        self.timer, self.signal = (getattr(signal, name) for name in self.TIMERS[timer])
+        self.symbols = symbols
+        """Símbolos `{nome: endereço}` que delimitam as funções do programa, ou `None` para usar os destinos das chamadas."""
+        self.samples = []
+        """Amostras `(pc, função do simulador)`, na ordem em que foram tiradas."""
+        self._previous = None
+
+    def _sample(self, signum, frame):
+        self.samples.append((int(self.executor.pc), frame.f_code.co_name if frame is not None else '?'))
+
+    def start(self):
+        self._previous = signal.signal(self.signal, self._sample)
+        signal.setitimer(self.timer, self.interval, self.interval)
+        return self
+
+    def stop(self):
+        signal.setitimer(self.timer, 0)
+        signal.signal(self.signal, self._previous if self._previous is not None else signal.SIG_DFL)
+        self._previous = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def pcs(self) -> Counter:
+        """Amostras por PC."""
+        return Counter(pc for pc, _ in self.samples)
+
+    def handlers(self) -> Counter:
+        """Amostras por função do simulador em execução."""
+        return Counter(name for _, name in self.samples)
+
+    def entries(self) -> dict:
+        '''Endereço de entrada -> nome de cada função do programa: os símbolos, ou o PC inicial e os destinos de chamadas do .text.'''
+        if self.symbols:
+            return {address: name for name, address in sorted(self.symbols.items(), reverse=True) if not name.startswith(('$', '.', '__'))}
+        executor = self.executor
+        entries = {executor.entry if hasattr(executor, 'entry') else executor.text_base}
+        for index, ic in enumerate(executor.decode_cache):
+            if ic is None: # Fora da cache (ex.: programa carregado da cache AOT, sem `predecode`)
+                try:
+                    ic = executor.instruction_at(executor.text_base + (index << 2))
+                except ValueError:
+                    continue
+            if ic.opcode == 0x6F and transfer(ic) == 'call': # O destino de `jalr` não é conhecido
+                entries.add(ic.target)
+        return {address: f'{address:#06x}' for address in entries}
+
+    def functions(self) -> Counter:
+        """Amostras por função do programa: cada PC é atribuído à entrada de função mais próxima que não o ultrapassa."""
+        entries = self.entries()
+        starts = np.array(sorted(entries), dtype=np.int64)
+        result = Counter()
+        for pc, count in self.pcs().items():
+            position = np.searchsorted(starts, pc, side='right') - 1
+            result[entries[int(starts[position])] if position >= 0 else '?'] += count
+        return result
+
+    def report(self, top=10) -> str:
+        '''Histogramas por função do programa, por PC e por função do simulador, com as `top` entradas mais amostradas de cada um.'''
+        total = len(self.samples) or 1
+        lines = [f'{len(self.samples)} amostras a cada {self.interval * 1000:g} ms']
+        for title, histogram, label in [('funções do programa', self.functions(), str),
+                                        ('PCs', self.pcs(), lambda pc: f'{pc:#06x}'),
+                                        ('funções do simulador', self.handlers(), str)]:
+            lines.append(f'\n{title}:')
+            for key, count in histogram.most_common(top):
+                lines.append(f'{count:>10} {100 * count / total:6.2f}%  {label(key)}')
+        return '\n'.join(lines)
+
+
+def main(argv=None):
+    from core.cpu import CPU
+    parser = argparse.ArgumentParser(description="Executa um programa RV32I amostrando o PC em intervalos de tempo.")
+    parser.add_argument('code', help="arquivo .text (ou executável ELF, com --elf)")
+    parser.add_argument('data', nargs='?', default=None, help="arquivo .data")
+    parser.add_argument('--elf', action='store_true', help="`code` é um executável ELF32 (os símbolos nomeiam as funções)")
+    parser.add_argument('--engine', choices=CPU.ENGINES, default='step')
+    parser.add_argument('--backend', choices=CPU.BACKENDS, default='numpy')
+    parser.add_argument('--interval', type=float, default=0.001, help="intervalo entre amostras, em segundos")
+    parser.add_argument('--timer', choices=Sampler.TIMERS, default='prof')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    symbols = None
+    if args.elf:
+        from core.elf import read_elf
+        symbols = read_elf(args.code).symbols
+        cpu = CPU.from_elf(args.code, args.engine, backend=args.backend)
+    else:
+        cpu = CPU(args.code, args.data, args.engine, backend=args.backend)
+    with Sampler(cpu, args.interval, args.timer, symbols) as sampler:
+        cpu.run()
+    print()
+    print(sampler.report(args.top))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
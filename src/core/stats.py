@@ -0,0 +1,99 @@
+"""
+Contadores do mix de instruções executadas.\n
+Com `CPU(..., counters=True)`, o `Executor` conta cada instrução retirada em uma lista de inteiros pré-alocada, indexada pelo
+identificador da `Operation` da tabela de despacho, e conta também os desvios tomados (a condição do desvio é verdadeira, mesmo que
+o destino seja a instrução seguinte).
+Sem `counters`, nada muda na execução: o `Executor.step` e os blocos traduzidos são os mesmos de sempre.\n
+No motor por blocos, cada bloco traduzido conta apenas suas execuções e quantas vezes terminou em um desvio tomado;
+o mix de instruções é reconstruído em `InstructionStats.counts` a partir das instruções de cada bloco.\n
+A chamada de encerramento é contada (ao contrário de `RunResult.instructions`), de forma que o total é o número de instruções retiradas.
+"""
+
+import json
+
+def operation_ids(dispatch):
+    '''
+    Numera as operações distintas da tabela de despacho `dispatch`.\n
+    Retorna `(operações, ids)`: a lista das `Operation` na ordem dos identificadores e o identificador de cada chave de despacho
+    (`DecodedInstruction.key`), ou `None` para chaves sem operação.
+    '''
+    operations = list(dict.fromkeys(operation for operation in dispatch if operation is not None))
+    numbers = {id(operation): index for index, operation in enumerate(operations)}
+    return operations, [None if operation is None else numbers[id(operation)] for operation in dispatch]
+
+
+class InstructionStats:
+    """Contadores por instrução de um `Executor`: `retired[id]` e `taken[id]` para a `Operation` de identificador `id`."""
+    BRANCHES = ('beq', 'bne', 'blt', 'bge', 'bltu', 'bgeu')
+    CONDITIONS = {
+        'beq':  lambda a, b: a == b,
+        'bne':  lambda a, b: a != b,
+        'blt':  lambda a, b: (a ^ 0x80000000) < (b ^ 0x80000000),
+        'bge':  lambda a, b: (a ^ 0x80000000) >= (b ^ 0x80000000),
+        'bltu': lambda a, b: a < b,
+        'bgeu': lambda a, b: a >= b,
+    }
+    """Condição de cada desvio sobre os valores sem sinal (`int`) dos registradores, para contar os desvios tomados no `Executor.step`."""
+
+    def __init__(self, dispatch) -> None:
+        self.operations, self.ids = operation_ids(dispatch)
+        """Operações distintas da tabela de despacho e identificador de cada chave de despacho (ver `operation_ids`)."""
+        self.retired = [0] * len(self.operations)
+        self.taken = [0] * len(self.operations)
+        self.block_ids = []
+        """Identificadores das instruções de cada bloco traduzido, na ordem do bloco (ver `count_block`)."""
+        self.block_counts = []
+        """Execuções (`2 * k`) e desvios tomados (`2 * k + 1`) do bloco `k`, atualizados pelo próprio código do bloco."""
+
+    def count_block(self, ids):
+        '''Registra um bloco com as instruções `ids` e retorna seu índice `k` em `block_counts`.'''
+        self.block_ids.append(ids)
+        self.block_counts += [0, 0]
+        return len(self.block_ids) - 1
+
+    def clear(self):
+        # As listas são zeradas no lugar: o código dos blocos e o `Executor` guardam referências a elas
+        self.retired[:] = [0] * len(self.retired)
+        self.taken[:] = [0] * len(self.taken)
+        self.block_counts[:] = [0] * len(self.block_counts)
+
+    def _totals(self):
+        retired = list(self.retired)
+        taken = list(self.taken)
+        for k, ids in enumerate(self.block_ids):
+            for index in ids:
+                retired[index] += self.block_counts[2 * k]
+            taken[ids[-1]] += self.block_counts[2 * k + 1]
+        return retired, taken
+
+    def counts(self) -> dict:
+        """Instruções retiradas por mnemônico (apenas as executadas), em ordem decrescente."""
+        totals = {}
+        for operation, count in zip(self.operations, self._totals()[0]):
+            if count:
+                totals[operation.name] = totals.get(operation.name, 0) + count
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def branches(self) -> dict:
+        """Desvios condicionais executados: `{mnemônico: {'taken': ..., 'not_taken': ...}}`."""
+        retired, taken = self._totals()
+        result = {}
+        for operation, count, branches in zip(self.operations, retired, taken):
+            if count and operation.name in self.BRANCHES:
+                result[operation.name] = {'taken': branches, 'not_taken': count - branches}
+        return result
+
+    @property
+    def total(self):
+        return sum(self._totals()[0])
+
+    def as_dict(self) -> dict:
+        return {'total': self.total, 'instructions': self.counts(), 'branches': self.branches()}
+
+    def to_json(self, path=None, indent=2):
+        """Relatório em JSON (ver `as_dict`). Com `path`, também o salva no arquivo."""
+        report = json.dumps(self.as_dict(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(report + '\n')
+        return report
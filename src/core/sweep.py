@@ -0,0 +1,53 @@
+"""
+Varredura de segmentos .data com o mesmo código.\n
+`sweep` cria uma única `CPU` com o .text e a executa uma vez para cada imagem de dados: antes de cada execução, a memória volta ao
+retrato tirado logo após a carga do código (`Memory.restore`), os novos dados são copiados para o .data e os registradores são
+zerados (`CPU.reset`). A cache de decodificação, os blocos traduzidos (`engine='block'`) e o módulo AOT (`engine='aot'`) são
+reaproveitados em todas as execuções, sem ler nem decodificar o código de novo.\n
+As imagens de dados podem ser caminhos de arquivos (ver `core.loader`), vetores de palavras do NumPy ou um diretório com arquivos
+`*_data.txt`. Os resultados são produzidos um a um (`ProgramResult`, de `core.batch`), de forma que varreduras com milhares de
+entradas não precisam guardar todos os resultados em memória.
+"""
+
+import glob
+import os
+import time
+import numpy as np
+from core.batch import Job, ProgramResult
+from core.cpu import CPU
+from core.loader import read_words
+from core.output import BufferSink
+
+def data_images(data):
+    """Itera sobre as imagens de dados de `data`: um diretório (arquivos `*_data.txt` em ordem) ou um iterável de caminhos/vetores."""
+    if isinstance(data, (str, os.PathLike)) and os.path.isdir(data):
+        return iter(sorted(glob.glob(os.path.join(data, '*_data.txt'))))
+    return iter(data)
+
+def sweep(code_path, data, engine='block', backend='int', cache_dir=None, memory=None, format=None):
+    """
+    Executa o programa `code_path` uma vez para cada imagem de `data` e produz um `ProgramResult` por execução.\n
+    O nome de cada resultado é o nome do arquivo de dados (sem `_data.txt`) ou a posição do vetor em `data`.
+    """
+    output = BufferSink()
+    cpu = CPU(code_path, None, engine, cache_dir, backend, memory, output=output)
+    initial = cpu.memory.snapshot()
+    for index, image in enumerate(data_images(data)):
+        if isinstance(image, (np.ndarray, list)):
+            job = Job(code_path, None, str(index))
+            words = image
+        else:
+            job = Job(code_path, image, os.path.basename(image).removesuffix('.txt').removesuffix('_data'))
+            words = read_words(image, format)
+
+        output.clear()
+        start = time.perf_counter()
+        cpu.memory.restore(initial)
+        cpu.reset()
+        try:
+            cpu.memory.load_data(words)
+        except ValueError as e:
+            yield ProgramResult(job, '', None, f"{e}", 0, time.perf_counter() - start)
+            continue
+        result = cpu.run()
+        yield ProgramResult(job, output.getvalue(), result.exit_code, result.error, result.instructions, time.perf_counter() - start)
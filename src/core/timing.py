@@ -0,0 +1,80 @@
+"""
+Tempos do simulador por etapa do ciclo de instrução.\n
+Com `CPU(..., timing=True)`, o `Executor` mede com `time.perf_counter_ns` o tempo gasto em cada etapa de `step`:\n
+- `fetch`: leitura da instrução (consulta à cache de decodificação ou `Executor.fetch`);
+- `decode`: `Decoder.decode` e a escolha da função de execução, quando a instrução não está na cache;
+- `execute`: a função de execução, acumulada também por instrução (o método do `InstructionSet` correspondente).
+
+A decodificação antecipada do .text (`Executor.predecode`) é medida à parte. Nos motores por blocos, a tradução de cada bloco
+conta como `decode` e a execução dos blocos como `execute`; as instruções executadas uma a uma (fora dos blocos) passam pelas três etapas.
+Sem `timing`, `step` e os blocos são os de sempre. As medidas incluem o custo do próprio relógio (dezenas de ns por chamada):
+servem para comparar as etapas entre si, não para medir a velocidade normal do simulador.
+"""
+
+import json
+from core.stats import operation_ids
+
+class Timing:
+    """Tempos acumulados, em nanossegundos, das etapas do ciclo de instrução de um `Executor` (ver o módulo)."""
+    STAGES = ('fetch', 'decode', 'execute')
+
+    def __init__(self, dispatch) -> None:
+        self.operations, self.ids = operation_ids(dispatch)
+        self.predecode_ns = 0
+        """Tempo da decodificação antecipada do .text, na construção da CPU."""
+        self.clear()
+
+    def clear(self):
+        '''Zera os tempos da execução (o tempo de `predecode` é mantido).'''
+        self.ns = dict.fromkeys(self.STAGES, 0)
+        """Tempo total de cada etapa."""
+        self.steps = 0
+        """Instruções executadas uma a uma (`step`)."""
+        self.decodes = 0
+        """Decodificações (ou traduções de blocos) feitas durante a execução."""
+        self.blocks = 0
+        """Execuções de blocos traduzidos."""
+        self.handler_ns = [0] * len(self.operations)
+        self.handler_calls = [0] * len(self.operations)
+
+    def stages(self) -> dict:
+        """Tempo total (ns) e fração do tempo medido de cada etapa."""
+        total = sum(self.ns.values()) or 1
+        return {stage: {'ns': ns, 'fraction': ns / total} for stage, ns in self.ns.items()}
+
+    def handlers(self) -> dict:
+        """Execuções, tempo total e tempo médio (ns) de cada instrução executada por `step`, em ordem decrescente de tempo."""
+        totals = {}
+        for operation, ns, calls in zip(self.operations, self.handler_ns, self.handler_calls):
+            if calls:
+                entry = totals.setdefault(operation.name, {'calls': 0, 'ns': 0})
+                entry['calls'] += calls
+                entry['ns'] += ns
+        for entry in totals.values():
+            entry['ns_per_call'] = entry['ns'] / entry['calls']
+        return dict(sorted(totals.items(), key=lambda item: -item[1]['ns']))
+
+    def as_dict(self) -> dict:
+        return {'stages': self.stages(), 'predecode_ns': self.predecode_ns, 'steps': self.steps, 'decodes': self.decodes,
+                'blocks': self.blocks, 'handlers': self.handlers()}
+
+    def to_json(self, path=None, indent=2):
+        """Relatório em JSON (ver `as_dict`). Com `path`, também o salva no arquivo."""
+        report = json.dumps(self.as_dict(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(report + '\n')
+        return report
+
+    def report(self, top=10) -> str:
+        '''Tempos das etapas e das `top` instruções mais custosas, em texto.'''
+        lines = [f'{self.steps} instruções uma a uma, {self.blocks} blocos, {self.decodes} decodificações; '
+                 f'decodificação antecipada: {self.predecode_ns / 1e6:.2f} ms']
+        for stage, entry in self.stages().items():
+            lines.append(f'{stage:<10} {entry["ns"] / 1e6:>10.2f} ms {100 * entry["fraction"]:6.2f}%')
+        handlers = list(self.handlers().items())[:top]
+        if handlers:
+            lines.append('')
+        for name, entry in handlers:
+            lines.append(f'{name:<10} {entry["calls"]:>10} execuções {entry["ns"] / 1e6:>10.2f} ms {entry["ns_per_call"]:>8.0f} ns/instrução')
+        return '\n'.join(lines)
@@ -0,0 +1,20 @@
+"""
+Fixtures compartilhadas pelos testes.\n
+Os caminhos dos arquivos de teste são relativos à raiz do repositório, de onde o `pytest` é executado.
+"""
+
+import pytest
+from core.cpu import CPU
+from core.output import BufferSink
+
+@pytest.fixture
+def run():
+    '''
+    Função `run(*args, **opções)` que cria a `CPU(*args, **opções)` com a saída capturada em um `BufferSink`,
+    executa o programa e retorna `(cpu, saída)`.
+    '''
+    def run(*args, **options):
+        cpu = CPU(*args, output=BufferSink(), **options)
+        cpu.run()
+        return cpu, cpu.output.getvalue()
+    return run
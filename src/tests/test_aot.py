@@ -0,0 +1,59 @@
+from core.aot import load_program, program_hash
+from core.block_engine import BlockEngine
+from core.cpu import CPU
+from core.paged_memory import PagedMemory
+import os
+import pytest
+
+code_path = 'src/tests/files/ultraT_text.txt'
+data_path = 'src/tests/files/ultraT_data.txt'
+
+
+class TestAOT:
+    """Testes para a tradução antecipada do programa inteiro."""
+
+    def test_modulo_em_cache(self, tmp_path):
+        cpu = CPU(code_path, data_path, engine='aot', cache_dir=str(tmp_path))
+        file = tmp_path / f'programa_{program_hash(cpu.memory)}.py'
+        assert file.exists()
+        assert 0 in cpu.block_engine.blocks
+        # Uma segunda CPU com o mesmo programa importa o módulo sem traduzir novamente:
+        mtime = os.path.getmtime(file)
+        cpu2 = CPU(code_path, 'src/tests/files/test4-1_data.txt', cache_dir=str(tmp_path))
+        engine = BlockEngine(cpu2)
+        engine.block_source = None # Qualquer tradução falharia
+        load_program(engine, str(tmp_path))
+        assert os.path.getmtime(file) == mtime
+        assert engine.blocks.keys() == cpu.block_engine.blocks.keys()
+
+    def test_cache_sem_decodificar(self, run, tmp_path):
+        """Com o módulo na cache, a CPU não decodifica o .text antes da execução."""
+        _, expected = run(code_path, data_path, engine='aot', cache_dir=str(tmp_path))
+        cpu = CPU(code_path, data_path, engine='aot', cache_dir=str(tmp_path))
+        assert cpu.decoded_text is None
+        assert all(ic is None for ic in cpu.decode_cache)
+        _, output = run(code_path, data_path, engine='aot', cache_dir=str(tmp_path))
+        assert output == expected
+
+    def test_equivalente_ao_step(self, run, tmp_path):
+        cpu_step, expected = run(code_path, data_path)
+        cpu_aot, output = run(code_path, data_path, engine='aot', cache_dir=str(tmp_path))
+        assert output == expected
+        assert list(cpu_aot.xregs) == list(cpu_step.xregs)
+        assert cpu_aot.global_counter == cpu_step.global_counter
+
+    def test_hash_depende_do_text(self):
+        cpu41 = CPU('src/tests/files/test4-1_text.txt', 'src/tests/files/test4-1_data.txt')
+        cpu42 = CPU('src/tests/files/test4-1_text.txt', 'src/tests/files/test4-2_data.txt')
+        cpu43 = CPU('src/tests/files/test4-3_text.txt', 'src/tests/files/test4-1_data.txt')
+        assert program_hash(cpu41.memory) == program_hash(cpu42.memory)
+        assert program_hash(cpu41.memory) != program_hash(cpu43.memory)
+
+    def test_hash_depende_do_endereco(self):
+        """Os blocos usam PCs absolutos: o mesmo .text em outro endereço não pode reutilizar o módulo."""
+        code_path = 'src/tests/files/test4-1_text.txt'
+        compact = CPU(code_path, None, memory=PagedMemory())
+        moved = CPU(code_path, None, memory=PagedMemory(text_base=0x1000, data_base=0x3000, remap_low=True))
+        assert (compact.memory.text_words(compact.memory.text_extent()).tobytes()
+                == moved.memory.text_words(moved.memory.text_extent()).tobytes())
+        assert program_hash(compact.memory) != program_hash(moved.memory)
@@ -0,0 +1,60 @@
+from core.batch import Job, load_manifest, run_batch, run_job, main
+import json
+import pytest
+
+FILES = 'src/tests/files'
+
+
+class TestBatch:
+    """Testes para a execução de programas em lote."""
+
+    def test_manifesto_diretorio(self):
+        jobs = load_manifest(FILES)
+        assert len(jobs) == 23
+        assert jobs[0].name == 'test4-1'
+        assert jobs[0].data_path == 'src/tests/files/test4-1_data.txt'
+
+    def test_manifesto_arquivos(self, tmp_path):
+        (tmp_path / 'lista.txt').write_text("# comentário\n\na_text.txt a_data.txt\nb_text.txt\n")
+        jobs = load_manifest(str(tmp_path / 'lista.txt'))
+        assert [(j.name, j.code_path, j.data_path) for j in jobs] == [
+            ('a', str(tmp_path / 'a_text.txt'), str(tmp_path / 'a_data.txt')),
+            ('b', str(tmp_path / 'b_text.txt'), None),
+        ]
+        (tmp_path / 'lista.json').write_text(json.dumps([['a_text.txt', 'a_data.txt'], {'text': 'b.txt', 'name': 'programa'}]))
+        jobs = load_manifest(str(tmp_path / 'lista.json'))
+        assert [(j.name, j.data_path) for j in jobs] == [('a', str(tmp_path / 'a_data.txt')), ('programa', None)]
+
+    def test_run_job(self):
+        result = run_job(Job(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt'), engine='block', backend='int')
+        assert result.ok
+        assert result.output.startswith('Teste1 OK\n')
+        assert result.instructions == 511
+        assert result.seconds > 0
+
+    def test_limite_de_instrucoes(self):
+        result = run_job(Job(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt'), engine='block', max_instructions=100)
+        assert not result.ok
+        assert result.exit_code is None
+        assert result.instructions == 100
+        assert result.error == "Execução interrompida: limite max_instructions atingido."
+
+    def test_arquivo_inexistente(self):
+        result = run_job(Job(f'{FILES}/inexistente_text.txt'))
+        assert not result.ok
+        assert result.exit_code is None
+        assert 'FileNotFoundError' in result.error
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_run_batch(self, workers):
+        jobs = load_manifest(FILES)[-4:]
+        results = run_batch(jobs, workers=workers)
+        assert [r.name for r in results] == [j.name for j in jobs]
+        assert [r.output for r in results] == [run_job(j).output for j in jobs]
+        assert all(r.ok for r in results)
+
+    def test_main(self, capsys):
+        assert main([FILES, '--workers', '2', '--json']) == 0
+        results = json.loads(capsys.readouterr().out)
+        assert len(results) == 23
+        assert all(r['exit_code'] == 0 for r in results)
@@ -0,0 +1,70 @@
+from core.benchmark import KERNELS, Measurement, compare, load, main, measure, run_suite, save, suite_jobs, write_kernels
+from core.batch import Job
+import json
+import pytest
+
+FILES = 'src/tests/files'
+
+class TestBenchmark:
+    """Testes para a suíte de desempenho."""
+
+    @pytest.mark.parametrize('engine', ['step', 'block', 'aot'])
+    def test_kernels(self, tmp_path, engine):
+        """Os laços sintéticos terminam normalmente e executam um número fixo de instruções por iteração"""
+        per_iteration = {'alu': 9, 'memory': 11, 'calls': 7}
+        for job in write_kernels(tmp_path, iterations=50):
+            result = measure(job, engine, 'int', repeat=1, cache_dir=tmp_path / 'cache')
+            assert result.error is None
+            assert result.instructions == 50 * per_iteration[job.name.removeprefix('kernel-')] + 8
+            assert result.mips > 0 and result.load_seconds > 0
+
+    def test_programas(self, tmp_path):
+        jobs = suite_jobs(tmp_path, files=FILES)
+        names = [job.name for job in jobs]
+        assert len(names) == 23 + len(KERNELS)
+        assert 'ultraT' in names and 'test6-4' in names and 'kernel-calls' in names
+        assert [job.name for job in suite_jobs(tmp_path, patterns=['test4-1', 'kernel-a*'], files=FILES)] == ['test4-1', 'kernel-alu']
+
+    def test_run_suite(self):
+        jobs = [Job(f'{FILES}/test4-1_text.txt', f'{FILES}/test4-1_data.txt')]
+        seen = []
+        results = run_suite(jobs, ['step', 'block'], ['int'], repeat=2, isolate=False, progress=seen.append)
+        assert [result.key for result in results] == ['test4-1/step/int', 'test4-1/block/int']
+        assert seen == results
+        assert all(result.instructions == 14 and result.error is None for result in results)
+
+    def test_processo_isolado(self):
+        jobs = [Job(f'{FILES}/test4-1_text.txt', f'{FILES}/test4-1_data.txt')]
+        result, = run_suite(jobs, ['step'], ['numpy'], repeat=1)
+        assert result.instructions == 14 and result.error is None
+        assert result.peak_rss_kib is None or result.peak_rss_kib > 0
+
+    def test_erro(self, tmp_path):
+        result = measure(Job(str(tmp_path / 'inexistente.txt')), repeat=1)
+        assert result.error.startswith('FileNotFoundError') and result.instructions == 0
+
+    def test_salvar_e_comparar(self, tmp_path):
+        before = {'a/step/int': Measurement('a', 'step', 'int', 1_000_000, 0.01, 1.0, 40_000),
+                  'b/step/int': Measurement('b', 'step', 'int', 100, 0.0001, 0.0001, 40_000),
+                  'c/step/int': Measurement('c', 'step', 'int', 100, 0.01, 0.01, 40_000)}
+        save(before.values(), tmp_path / 'antes.json')
+        loaded = load(tmp_path / 'antes.json')
+        assert {key: m.as_dict() for key, m in loaded.items()} == {key: m.as_dict() for key, m in before.items()}
+        assert json.loads((tmp_path / 'antes.json').read_text())['results'][0]['mips'] == 1.0
+
+        after = {'a/step/int': Measurement('a', 'step', 'int', 1_000_000, 0.0105, 1.25, 50_000),  # 20% mais lento, 25% mais memória
+                 'b/step/int': Measurement('b', 'step', 'int', 100, 0.001, 0.001, 40_000),      # Tempos pequenos demais para comparar
+                 'c/step/int': Measurement('c', 'step', 'int', 0, 0.01, 0.01, 40_000, 'erro'),
+                 'd/step/int': Measurement('d', 'step', 'int', 100, 0.01, 0.01, 40_000)}        # Sem referência
+        regressions = compare(loaded, after, threshold=0.10)
+        assert [(r.key, r.metric) for r in regressions] == [('a/step/int', 'mips'), ('a/step/int', 'peak_rss_kib'), ('c/step/int', 'error')]
+        assert regressions[0].change == pytest.approx(-0.2)
+        assert [r.metric for r in compare(loaded, after, threshold=0.30)] == ['error']
+
+    def test_linha_de_comando(self, tmp_path, capsys):
+        base = str(tmp_path / 'base.json')
+        assert main(['run', '--programs', 'test4-1', '--engines', 'step', '--backends', 'int', '--repeat', '1', '--in-process',
+                     '--save', base]) == 0
+        assert 'test4-1' in capsys.readouterr().out
+        assert main(['compare', base, base]) == 0
+        assert '1 casos comparados, 0 regressões' in capsys.readouterr().out
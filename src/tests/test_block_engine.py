@@ -0,0 +1,104 @@
+from core.block_engine import BlockEngine, FALLBACK
+from core.cpu import CPU
+from core.executor import Executor
+from core.memory import Memory
+from core.output import BufferSink
+import numpy as np
+import pytest
+
+PROGRAMS = ['test4-1', 'test4-6', 'test4-7', 'test5-3', 'test5-4', 'test5-9', 'test6-4', 'ultraT']
+
+
+class TestBlockEngine:
+    """Testes para o motor de execução por blocos básicos."""
+
+    @pytest.mark.parametrize('program', PROGRAMS)
+    def test_equivalente_ao_step(self, run, program):
+        """O motor de blocos deve deixar o mesmo estado que a execução instrução a instrução."""
+        code_path = f'src/tests/files/{program}_text.txt'
+        data_path = f'src/tests/files/{program}_data.txt'
+        cpu_step, expected = run(code_path, data_path)
+        cpu_block, output = run(code_path, data_path, engine='block')
+        assert output == expected
+        assert list(cpu_block.xregs) == list(cpu_step.xregs)
+        assert cpu_block.global_counter == cpu_step.global_counter
+        assert (cpu_block.memory.MEM == cpu_step.memory.MEM).all()
+
+    def test_bloco(self):
+        memory = Memory()
+        memory.sw(0x0, 0x00100093) # addi x1, x0, 1
+        memory.sw(0x4, 0x00108133) # add x2, x1, x1
+        memory.sw(0x8, 0x00208463) # beq x1, x2, 8
+        memory.sw(0xc, 0x00000013) # addi x0, x0, 0
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        engine = BlockEngine(executor)
+        engine.run_block()
+        assert engine.blocks[0].size == 3
+        assert executor.pc == 0xc
+        assert list(executor.xregs[1:3]) == [1, 2]
+        assert executor.global_counter == 3
+
+    def test_invalidacao(self):
+        memory = Memory()
+        memory.sw(0x0, 0x00100093) # addi x1, x0, 1
+        memory.sw(0x4, 0x0000006f) # jal x0, 0
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        engine = BlockEngine(executor)
+        engine.run_block()
+        assert 0 in engine.blocks
+        memory.sw(0x0, 0x00200093) # addi x1, x0, 2
+        assert 0 not in engine.blocks
+        executor.pc = 0
+        engine.run_block()
+        assert executor.xregs[1] == 2
+
+    def test_fallback(self):
+        """Instruções não traduzíveis são executadas pelo Executor.step, com o mesmo erro."""
+        memory = Memory()
+        memory.sw(0x0, 0x00731533) # sll x10, x6, x7
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        engine = BlockEngine(executor)
+        with pytest.raises(NotImplementedError):
+            engine.run_block()
+        assert engine.blocks[0] is FALLBACK
+
+    FAULT = [0x00500293,  # addi x5, x0, 5
+             0x00700313,  # addi x6, x0, 7
+             0x00202383,  # lw x7, 2(x0)
+             0x00302383]  # lw x7, 3(x0)   (endereço desalinhado)
+
+    @pytest.mark.parametrize('engine, backend', [('block', 'numpy'), ('block', 'int'), ('aot', 'int')])
+    def test_erro_no_meio_do_bloco(self, tmp_path, engine, backend):
+        """Um erro no meio do bloco deixa o mesmo estado que o Executor.step: as instruções anteriores têm efeito."""
+        code = tmp_path / 'erro.txt'
+        code.write_text(''.join(f'{word:032b}\n' for word in self.FAULT))
+        cpus = [CPU(str(code), None, output=BufferSink(), counters=True),
+                CPU(str(code), None, engine, tmp_path, backend, output=BufferSink(), counters=engine == 'block')]
+        step, block = (cpu.run() for cpu in cpus)
+        assert (step.instructions, step.pc) == (3, 0x10) and step.error is not None
+        assert (block.instructions, block.pc, block.error) == (step.instructions, step.pc, step.error)
+        assert [int(v) for v in cpus[1].xregs] == [int(v) for v in cpus[0].xregs]
+        assert int(cpus[1].xregs[5]) == 5 and int(cpus[1].xregs[6]) == 7
+        if engine == 'block':
+            assert cpus[1].stats.counts() == cpus[0].stats.counts() == {'addi': 2, 'lw': 1}
+
+    SELF_MODIFYING = [0x00200337,  # lui x6, 0x200
+                      0x39330313,  # addi x6, x6, 0x393    (x6 = addi x7, x0, 2)
+                      0x00602623,  # sw x6, 12(x0)         (sobrescreve a instrução seguinte)
+                      0x00100393,  # addi x7, x0, 1
+                      0x00A00893,  # addi x17, x0, 10
+                      0x00000073]  # ecall
+
+    @pytest.mark.parametrize('engine, backend', [('block', 'numpy'), ('block', 'int'), ('aot', 'int')])
+    def test_codigo_automodificavel(self, run, tmp_path, engine, backend):
+        """Uma escrita no .text dentro do bloco vale para as instruções seguintes do mesmo bloco, como no Executor.step."""
+        code = tmp_path / 'automodificavel.txt'
+        code.write_text(''.join(f'{word:032b}\n' for word in self.SELF_MODIFYING))
+        cpu_step, expected = run(str(code), None, counters=True)
+        cpu_block, output = run(str(code), None, engine, str(tmp_path), backend, counters=engine == 'block')
+        assert cpu_step.xregs[7] == 2
+        assert output == expected
+        assert [int(v) for v in cpu_block.xregs] == [int(v) for v in cpu_step.xregs]
+        assert cpu_block.global_counter == cpu_step.global_counter
+        if engine == 'block':
+            assert cpu_block.stats.counts() == cpu_step.stats.counts()
@@ -0,0 +1,71 @@
+from core.cow_memory import MemoryImage, CopyOnWriteMemory
+from core.paged_memory import PagedMemory
+from core.memory import Memory
+import numpy as np
+import pickle
+import pytest
+
+code_path = 'src/tests/files/ultraT_text.txt'
+data_path = 'src/tests/files/ultraT_data.txt'
+
+
+class TestCopyOnWriteMemory:
+    """Testes para a memória copy-on-write sobre uma imagem compartilhada."""
+
+    def test_paginas_compartilhadas(self):
+        image = MemoryImage.load(code_path, data_path)
+        memory = image.memory()
+        assert isinstance(memory, CopyOnWriteMemory)
+        assert memory.dirty_pages() == []
+        assert all(memory.pages[number] is image.pages[number] for number in image.pages)
+        assert memory.lw(0x2000) == image.page_words[2][0]
+
+    def test_copia_na_escrita(self):
+        image = MemoryImage.load(code_path, data_path)
+        original = image.pages[2].copy()
+        first, second = image.memory(), image.memory()
+        first.sw(0x2004, 0xdeadbeef)
+        first.sb(0x9000, 0x7f) # Página que não existe na imagem
+        assert first.dirty_pages() == [2, 9]
+        assert first.lw(0x2004) == 0xdeadbeef
+        assert first.lw(0x2000) == second.lw(0x2000) # O restante da página foi copiado
+        assert second.dirty_pages() == []
+        assert second.lbu(0x9000) == 0
+        assert (image.pages[2] == original).all()
+
+    def test_imagem_somente_leitura(self):
+        image = MemoryImage.load(code_path, data_path)
+        with pytest.raises(ValueError):
+            image.pages[0][0] = 1
+
+    def test_imagem_de_memory(self):
+        memory = Memory()
+        memory.load_mem(code_path, data_path)
+        image = MemoryImage.from_memory(memory)
+        cow = image.memory()
+        assert (cow.text_base, cow.data_base, cow.text_end) == (0x0, 0x2000, 0x2000)
+        assert (cow.read_bytes(0, len(memory.MEM)) == memory.MEM).all()
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_cpu(self, run, engine):
+        _, expected = run(code_path, data_path, engine=engine)
+        image = MemoryImage.load(code_path, data_path, memory=PagedMemory())
+        for _ in range(2):
+            memory = image.memory()
+            assert run(None, None, engine=engine, memory=memory)[1] == expected
+            assert set(memory.dirty_pages()) <= set(image.pages)
+
+    def test_memoria_compartilhada(self):
+        image = MemoryImage.load(code_path, data_path)
+        shared = image.share()
+        try:
+            attached = pickle.loads(pickle.dumps(shared)).attach()
+            assert sorted(attached.pages) == sorted(image.pages)
+            for number, page in image.pages.items():
+                assert (attached.pages[number] == page).all()
+            memory = attached.memory()
+            memory.sw(0x2000, 1)
+            assert attached.page_words[2][0] == image.page_words[2][0]
+            del memory, attached
+        finally:
+            shared.unlink()
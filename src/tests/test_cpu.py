@@ -1,4 +1,5 @@
-from core.cpu import CPU
+from core.cpu import CPU, RunResult
+from core.output import BufferSink
 import numpy as np
 import pytest
 
@@ -8,6 +9,8 @@ class MemoryMock:
         self.MEM = np.zeros(16384, dtype=np.uint8)
         self.text_base = 0x0000  # Endereço base do segmento .text
         self.data_base = 0x2000  # Endereço base do segmento .data
+        self.text_end = 0x2000   # Fim (exclusivo) do segmento .text
+        self.text_watchers = []
 
     def lw(self, address):#rd: int, kte: int):
         '''Lê uma palavra de 32 bits da memória e retorna o seu valor.'''
@@ -190,3 +193,58 @@ class TestCPU():
         assert self.CPU.PC == np.uint32(0)
         assert self.CPU.xregs.all() == np.zeros(32, dtype=np.uint32).all()
         assert self.CPU.memory.MEM.all() == np.zeros(16384, dtype=np.uint8).all()
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_run_result(self, engine):
+        cpu = CPU(self.code_path, self.data_path, engine=engine, output=BufferSink())
+        result = cpu.run()
+        assert isinstance(result, RunResult)
+        assert result.halted and result.exit_code == 0 and result.error is None
+        assert result.instructions == cpu.global_counter == 14
+        assert result.pc == int(cpu.pc)
+        assert cpu.output.getvalue().endswith("Programa encerrado com sucesso.\nSystem Exit: 0\n")
+        # Um programa encerrado não executa mais nada:
+        again = cpu.run()
+        assert (again.exit_code, again.instructions, again.pc) == (0, 14, result.pc)
+
+    def test_run_erro(self, tmp_path):
+        code = tmp_path / 'code.txt'
+        code.write_text('00000000000000000001000000110011\n') # sll x0, x0, x0
+        cpu = CPU(str(code), None, output=BufferSink())
+        result = cpu.run()
+        assert not result.halted
+        assert result.error == "Instrução SLL não implementada neste projeto!"
+
+    LOOP = ['00000000000100101000001010010011',  # addi x5, x5, 1
+            '11111111110111111111000001101111']  # jal x0, -4
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_max_instructions(self, tmp_path, engine):
+        code = tmp_path / 'loop.txt'
+        code.write_text('\n'.join(self.LOOP) + '\n')
+        cpu = CPU(str(code), None, engine=engine, output=BufferSink())
+        result = cpu.run(max_instructions=1001)
+        assert not result.halted and result.error is None
+        assert result.limit == 'max_instructions'
+        assert result.instructions == 1001          # O limite é exato mesmo no meio de um bloco
+        assert int(cpu.xregs[5]) == 501
+        # Uma nova chamada continua de onde parou:
+        result = cpu.run(max_instructions=10)
+        assert result.instructions == 1011 and result.limit == 'max_instructions'
+
+    def test_max_seconds(self, tmp_path):
+        code = tmp_path / 'loop.txt'
+        code.write_text('\n'.join(self.LOOP) + '\n')
+        cpu = CPU(str(code), None, engine='block', backend='int', output=BufferSink())
+        result = cpu.run(max_seconds=0.05)
+        assert result.limit == 'max_seconds'
+        assert result.instructions > 0 and result.error is None
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_run_batch(self, engine):
+        cpu = CPU(self.code_path, self.data_path, engine=engine, output=BufferSink())
+        assert cpu.run_batch(5) == 5 and cpu.global_counter == 5
+        assert cpu.run_batch(100) == 10 # Para na chamada de encerramento (contada até `run` terminar)
+        result = cpu.run()
+        assert result.halted and result.instructions == 14
+        assert cpu.run_batch(10) == 0
@@ -1,4 +1,5 @@
-from core.decoder import Decoder
+from core.decoder import Decoder, DecodedInstruction, FORMATS
+from core.memory import Memory
 import numpy as np
 import pytest
 
@@ -91,6 +92,54 @@ class TestDecoder:
             'ins_format': 'J_FORMAT',
         }
 
+    def test_decode_ins(self):
+        """Testando o registro de layout fixo"""
+        instr = 0b11111111111100110000001100010011 # addi x6, x6, -1
+        decoded = self.dec.decode_ins(instr)
+        assert isinstance(decoded, DecodedInstruction)
+        assert decoded.ins_format == 'I_FORMAT'
+        assert (decoded.rd, decoded.rs1, decoded.imm) == (6, 6, -1)
+        assert decoded.handler is None
+        with pytest.raises(AttributeError):
+            decoded.outro_campo = 0
+        # Conversão de/para o dicionário de decode():
+        as_dict = self.dec.decode(instr)
+        assert decoded.as_dict() == as_dict
+        assert DecodedInstruction.from_dict(as_dict).as_dict() == as_dict
+
+    def test_imediatos_negativos(self):
+        """Imediatos dos formatos B e J saem com o sinal estendido; resolve() calcula o destino"""
+        bne = self.dec.decode_ins(0xfe629ee3) # bne x5, x6, -4
+        assert bne.imm == -4
+        jal = self.dec.decode_ins(0xfd9ff06f) # jal x0, -40
+        assert jal.imm == -40
+        jal.resolve(0x100)
+        assert jal.target == 0x100 - 40
+        auipc = self.dec.decode_ins(0x00002517) # auipc x10, 2
+        auipc.resolve(0x30)
+        assert auipc.target == 0x2030
+        decoded = self.dec.decode_array(np.array([0xfe629ee3, 0xfd9ff06f], dtype=np.uint32))
+        assert decoded['imm_b'][0] == -4
+        assert decoded['imm_j'][1] == -40
+
+    def test_decode_array(self):
+        """Decodificação vetorizada do .text deve ser igual à decodificação de cada instrução"""
+        mem = Memory()
+        mem.load_mem('src/tests/files/ultraT_text.txt', None)
+        words = mem.text_words()
+        assert len(words) == 2048
+        decoded = self.dec.decode_array(words)
+        records = self.dec.records(decoded)
+        for i, word in enumerate(words.tolist()):
+            if decoded['format'][i] == 0:
+                assert records[i] is None
+                with pytest.raises(ValueError):
+                    self.dec.decode_ins(word)
+                continue
+            assert FORMATS[decoded['format'][i]] == records[i].ins_format
+            assert records[i].as_dict() == self.dec.decode(word)
+            assert records[i].key == self.dec.decode_ins(word).key
+
     def test_decode_invalid(self):
         """Testando instrução inválida"""
         instr = 0b00000001100000000000010111101110
@@ -0,0 +1,106 @@
+from core.elf import read_elf, memory_for, PF_X
+from core.cpu import CPU
+from core.memory import Memory
+from core.paged_memory import PagedMemory
+from core.output import BufferSink
+import struct
+import pytest
+
+TEXT = [
+    0x00000517, # auipc x10, (.data - .text) >> 12
+    0x00400893, # addi x17, x0, 4     (imprimir string)
+    0x00000073, # ecall
+    0x00018313, # addi x6, x3, 0      (x6 = gp)
+    0x01052383, # lw x7, 16(x10)      (.bss)
+    0x00a00893, # addi x17, x0, 10
+    0x00000073, # ecall
+]
+
+def build_elf(path, text_addr=0x10000, data_addr=0x11000, machine=243, symbols=None):
+    """Monta um ELF32 RISC-V mínimo: .text (R-X), .data (RW- com .bss) e uma tabela de símbolos."""
+    words = [TEXT[0] | (data_addr - text_addr)] + TEXT[1:]
+    text = b''.join(struct.pack('<I', word) for word in words)
+    data = b'ELF OK\0\0' + struct.pack('<I', 0xFFFFFFFF)
+    symbols = {'__global_pointer$': 0x11800} if symbols is None else symbols
+    strtab = b'\0' + b''.join(name.encode() + b'\0' for name in symbols)
+    symtab = bytes(16)
+    position = 1
+    for name, value in symbols.items():
+        symtab += struct.pack('<IIIBBH', position, value, 0, 0, 0, 0)
+        position += len(name) + 1
+    text_off, data_off, strtab_off = 0x100, 0x200, 0x300
+    symtab_off = strtab_off + len(strtab)
+    shoff = (symtab_off + len(symtab) + 3) & ~3
+    header = struct.pack('<16sHHIIIIIHHHHHH', b'\x7fELF\x01\x01\x01' + bytes(9), 2, machine, 1, text_addr,
+                         52, shoff, 0, 52, 32, 2, 40, 3, 0)
+    phdrs = struct.pack('<IIIIIIII', 1, text_off, text_addr, text_addr, len(text), len(text), 5, 0x1000)
+    phdrs += struct.pack('<IIIIIIII', 1, data_off, data_addr, data_addr, len(data), len(data) + 0x100, 6, 0x1000)
+    shdrs = bytes(40)
+    shdrs += struct.pack('<IIIIIIIIII', 0, 2, 0, 0, symtab_off, len(symtab), 2, 1, 4, 16)
+    shdrs += struct.pack('<IIIIIIIIII', 0, 3, 0, 0, strtab_off, len(strtab), 0, 0, 1, 0)
+    image = bytearray(shoff + len(shdrs))
+    for offset, chunk in [(0, header + phdrs), (text_off, text), (data_off, data), (strtab_off, strtab), (symtab_off, symtab), (shoff, shdrs)]:
+        image[offset:offset + len(chunk)] = chunk
+    path.write_bytes(bytes(image))
+    return path
+
+
+class TestElf:
+    """Testes para o carregamento de executáveis ELF32."""
+
+    def test_read_elf(self, tmp_path):
+        image = read_elf(build_elf(tmp_path / 'programa.elf'))
+        assert image.entry == 0x10000
+        assert [(s.vaddr, len(s.data), s.memsz) for s in image.segments] == [(0x10000, 28, 28), (0x11000, 12, 0x10c)]
+        assert image.segments[0].flags & PF_X
+        assert image.symbols == {'__global_pointer$': 0x11800}
+        memory = memory_for(image)
+        assert (memory.text_base, memory.text_end, memory.data_base) == (0x10000, 0x1001c, 0x11000)
+
+    def test_invalido(self, tmp_path):
+        with pytest.raises(ValueError):
+            read_elf(build_elf(tmp_path / 'x86.elf', machine=3))
+        texto = tmp_path / 'code.txt'
+        texto.write_text('00000000001100000000001110010011\n')
+        with pytest.raises(ValueError):
+            read_elf(texto)
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_from_elf(self, tmp_path, engine):
+        cpu = CPU.from_elf(build_elf(tmp_path / 'programa.elf'), engine=engine, backend='int', output=BufferSink())
+        assert cpu.pc == 0x10000
+        assert cpu.xregs[2] == 0x7ffffff0
+        cpu.run()
+        assert cpu.output.getvalue().startswith('ELF OK')
+        assert cpu.xregs[6] == 0x11800 # gp
+        assert cpu.xregs[7] == 0       # .bss zerado
+        assert cpu.global_counter == 6
+
+    def test_from_elf_memory(self, tmp_path):
+        """Um ELF ligado no endereço 0 pode ser carregado na memória de 16 KiB."""
+        path = build_elf(tmp_path / 'programa.elf', text_addr=0x0, data_addr=0x2000, symbols={})
+        cpu = CPU.from_elf(path, memory=Memory(), output=BufferSink())
+        cpu.run()
+        assert cpu.output.getvalue().startswith('ELF OK')
+        assert cpu.xregs[3] == 0
+
+    @pytest.mark.parametrize('engine, backend', [('step', 'numpy'), ('step', 'int'), ('block', 'numpy'), ('block', 'int')])
+    def test_lw_em_endereco_baixo(self, tmp_path, engine, backend):
+        """O ajuste do `lw` abaixo de 0x2000 é dos arquivos do RARS: um ELF com o .data em 0x1000 lê o próprio endereço."""
+        path = build_elf(tmp_path / 'programa.elf', text_addr=0x0, data_addr=0x1000, symbols={})
+        cpu = CPU.from_elf(path, engine, backend=backend, output=BufferSink())
+        assert not cpu.memory.remap_low
+        cpu.memory.sw(0x1010, 0x12345678) # .bss lido por `lw x7, 16(x10)`
+        cpu.run()
+        assert cpu.output.getvalue().startswith('ELF OK')
+        assert cpu.error is None
+        assert cpu.xregs[7] == 0x12345678
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_string_abaixo_do_data_base(self, tmp_path, engine):
+        """Sem o ajuste do RARS, o `ecall` imprime a string do próprio endereço, mesmo abaixo do `data_base` da memória."""
+        path = build_elf(tmp_path / 'programa.elf', text_addr=0x0, data_addr=0x1000, symbols={})
+        cpu = CPU.from_elf(path, engine, memory=PagedMemory(text_size=0x1000), output=BufferSink())
+        assert cpu.memory.data_base == 0x2000
+        cpu.run()
+        assert cpu.output.getvalue().startswith('ELF OK')
@@ -1,4 +1,5 @@
 from core.executor import Executor
+from core.memory import Memory
 import numpy as np
 import pytest
 
@@ -8,6 +9,8 @@ class MemoryMock:
         self.MEM = np.zeros(16384, dtype=np.uint8)
         self.text_base = 0x0000  # Endereço base do segmento .text
         self.data_base = 0x2000  # Endereço base do segmento .data
+        self.text_end = 0x2000   # Fim (exclusivo) do segmento .text
+        self.text_watchers = []
 
     def lw(self, address):#rd: int, kte: int):
         '''Lê uma palavra de 32 bits da memória e retorna o seu valor.'''
@@ -25,6 +28,9 @@ class MemoryMock:
     def sw(self, address, word):
         pass
 
+    def text_extent(self):
+        return self.text_end
+
 
 class DecoderMock:
     """Mock para o decodificador."""
@@ -248,3 +254,91 @@ class TestExecutor:
         ic = self.decoder.decode(instruction)
         with pytest.raises(ValueError):
             self.executor.execute(ic)
+
+
+class TestDecodeCache:
+    """Testes para a cache de instruções decodificadas do Executor."""
+
+    def test_cache_preenchida_e_invalidada(self):
+        memory = Memory()
+        memory.sw(0, 0x00100093) # addi x1, x0, 1
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        executor.step()
+        assert executor.xregs[1] == 1
+        assert executor.decode_cache[0] is not None
+        # Segunda execução reaproveita a instrução decodificada:
+        executor.pc = np.uint32(0)
+        executor.step()
+        assert executor.pc == 4
+        assert executor.global_counter == 2
+        # Escrita no .text descarta a entrada:
+        memory.sw(0, 0x00200093) # addi x1, x0, 2
+        assert executor.decode_cache[0] is None
+        executor.pc = np.uint32(0)
+        executor.step()
+        assert executor.xregs[1] == 2
+
+    def test_predecode(self):
+        memory = Memory()
+        memory.sw(0, 0x00100093) # addi x1, x0, 1
+        memory.sw(4, 0x00731533) # sll x10, x6, x7 (não implementada)
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        executor.predecode()
+        assert executor.decode_cache[0].ins_format == 'I_FORMAT'
+        assert executor.decode_cache[1].ins_format == 'R_FORMAT'
+        assert executor.decode_cache[2] is None # 0x00000000 não é uma instrução
+        assert executor.decoded_text['opcode'][0] == 0x13
+        executor.step()
+        assert executor.xregs[1] == 1
+
+    def test_desvio_resolvido(self):
+        memory = Memory()
+        memory.sw(0x0, 0x00300293) # addi x5, x0, 3
+        memory.sw(0x4, 0xfff28293) # addi x5, x5, -1
+        memory.sw(0x8, 0xfe029ee3) # bne x5, x0, -4
+        memory.sw(0xc, 0x00000363) # beq x0, x0, 6 (imediato desalinhado)
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        executor.predecode()
+        branch = executor.decode_cache[2]
+        assert branch.target == 0x4
+        assert branch.handler is executor.dispatch[branch.key].resolved
+        for _ in range(7):
+            executor.step()
+        assert executor.xregs[5] == 0
+        assert executor.pc == 0xc
+        # Imediato desalinhado: a versão completa lança o erro ao executar
+        with pytest.raises(ValueError):
+            executor.step()
+
+    def test_escrita_no_data_nao_invalida(self):
+        memory = Memory()
+        memory.sw(0, 0x00100093) # addi x1, x0, 1
+        executor = Executor(np.zeros(32, dtype=np.uint32), memory, np.uint32(0))
+        executor.step()
+        memory.sw(0x2000, 0xffffffff)
+        assert executor.decode_cache[0] is not None
+
+
+class TestDispatch:
+    """Testes para a tabela de despacho do Executor."""
+    executor = Executor(np.zeros(32, dtype=np.uint32), Memory(), np.uint32(0))
+
+    def test_lookup(self):
+        decode = self.executor.decoder.decode_ins
+        assert self.executor.lookup(decode(0x00730533)).name == 'add'   # add x10, x6, x7
+        assert self.executor.lookup(decode(0x40730533)).name == 'sub'   # sub x10, x6, x7
+        assert self.executor.lookup(decode(0xfff30313)).name == 'addi'  # addi x6, x6, -1
+        assert self.executor.lookup(decode(0x4020d093)).name == 'srai'  # srai x1, x1, 2
+        assert self.executor.lookup(decode(0x0020d093)).name == 'srli'  # srli x1, x1, 2
+        assert self.executor.lookup(decode(0xfd9ff06f)).name == 'jal'   # jal x0, -40
+        assert self.executor.lookup(decode(0x00000073)).name == 'ecall'
+
+    def test_nao_implementada(self):
+        ic = self.executor.decoder.decode_ins(0x00731533) # sll x10, x6, x7
+        with pytest.raises(NotImplementedError):
+            self.executor.execute(ic)
+
+    def test_invalida(self):
+        ic = self.executor.decoder.decode_ins(0x02730533) # funct7 = 1 (mul, extensão M)
+        with pytest.raises(ValueError):
+            self.executor.execute(ic)
@@ -0,0 +1,64 @@
+from core.image_cache import ImageCache
+from core.loader import read_words
+import core.image_cache
+import os
+import shutil
+import pytest
+
+code_path = 'src/tests/files/ultraT_text.txt'
+data_path = 'src/tests/files/ultraT_data.txt'
+
+def fail_parse(*args):
+    raise AssertionError("O arquivo não deveria ser convertido novamente.")
+
+
+class TestImageCache:
+    """Testes para a cache em disco das imagens de programa."""
+
+    def test_imagem_em_cache(self, tmp_path, monkeypatch):
+        cache = ImageCache(str(tmp_path))
+        words = cache.words(code_path)
+        assert (words == read_words(code_path)).all()
+        assert os.path.exists(cache.image_path(cache.manifest[os.path.abspath(code_path)]['sha256']))
+        # Uma nova cache no mesmo diretório lê a imagem mapeada em memória, sem converter o arquivo:
+        monkeypatch.setattr(core.image_cache, 'parse', fail_parse)
+        cached = ImageCache(str(tmp_path)).words(code_path)
+        assert (cached == words).all()
+        assert not cached.flags.writeable
+
+    def test_arquivo_modificado(self, tmp_path):
+        path = tmp_path / 'code.txt'
+        shutil.copy(code_path, path)
+        cache = ImageCache(str(tmp_path / 'cache'))
+        assert len(cache.words(path)) == len(read_words(code_path))
+        with open(path, 'a') as f:
+            f.write('00000000000000000000000000010011\n') # nop
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        words = cache.words(path)
+        assert len(words) == len(read_words(code_path)) + 1
+        assert words[-1] == 0x13
+
+    def test_mesmo_conteudo(self, tmp_path, monkeypatch):
+        """Um arquivo com outro caminho ou `mtime`, mas com o mesmo conteúdo, reutiliza a imagem pelo hash."""
+        cache = ImageCache(str(tmp_path / 'cache'))
+        cache.words(code_path)
+        path = tmp_path / 'copia.txt'
+        shutil.copy(code_path, path)
+        monkeypatch.setattr(core.image_cache, 'parse', fail_parse)
+        assert (cache.words(path) == read_words(code_path)).all()
+
+    def test_formatos_diferentes(self, tmp_path):
+        """O mesmo conteúdo em arquivos de formatos diferentes (detectados pela extensão) não compartilha a imagem."""
+        cache = ImageCache(str(tmp_path / 'cache'))
+        for name in ('x_text.txt', 'x.bin'):
+            (tmp_path / name).write_text('00000000000000000000000000000001\n' * 2)
+            assert (cache.words(tmp_path / name) == read_words(tmp_path / name)).all()
+        assert cache.words(tmp_path / 'x.bin')[0] == 0x30303030 # Binário puro: os caracteres '0'
+        assert ImageCache(str(tmp_path / 'cache')).manifest[str(tmp_path / 'x.bin')]['format'] == 'raw'
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_cpu(self, run, tmp_path, engine):
+        _, expected = run(code_path, data_path, engine=engine)
+        for _ in range(2):
+            _, output = run(code_path, data_path, engine=engine, cache_dir=str(tmp_path), image_cache=True)
+            assert output == expected
@@ -0,0 +1,47 @@
+from core.int_instruction_set import IntInstructionSet, RegisterFile
+from core.cpu import CPU
+import tests.test_instructions as base
+import numpy as np
+import pytest
+
+PROGRAMS = ['test4-1', 'test4-6', 'test5-3', 'test5-9', 'ultraT']
+
+
+class TestIntInstructionSet(base.TestInstructionSet):
+    """Os mesmos testes de `TestInstructionSet`, com o backend de inteiros Python."""
+    memory = base.MemoryMock()
+    instructions = IntInstructionSet(RegisterFile(), memory)
+
+
+class TestRegisterFile:
+    """Testes para o banco de registradores de inteiros Python."""
+
+    def test_mascara(self):
+        regs = RegisterFile()
+        regs[1] = -1
+        regs[2] = np.int32(-2)
+        regs[3] = 0x1_0000_0005
+        assert regs[1:4] == [0xffffffff, 0xfffffffe, 5]
+        assert all(type(value) is int for value in regs)
+        assert len(regs) == 32
+
+
+class TestBackendInt:
+    """Execução de programas completos com o backend `int`."""
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    @pytest.mark.parametrize('program', PROGRAMS)
+    def test_equivalente_ao_numpy(self, run, program, engine):
+        code_path = f'src/tests/files/{program}_text.txt'
+        data_path = f'src/tests/files/{program}_data.txt'
+        cpu_numpy, expected = run(code_path, data_path)
+        cpu_int, output = run(code_path, data_path, engine=engine, backend='int')
+        assert isinstance(cpu_int.instruction_set, IntInstructionSet)
+        assert output == expected
+        assert list(cpu_int.xregs) == list(cpu_numpy.xregs)
+        assert cpu_int.global_counter == cpu_numpy.global_counter
+        assert (cpu_int.memory.MEM == cpu_numpy.memory.MEM).all()
+
+    def test_backend_invalido(self):
+        with pytest.raises(ValueError):
+            CPU(None, None, backend='float')
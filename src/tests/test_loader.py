@@ -0,0 +1,62 @@
+from core import loader
+from core.memory import Memory
+import numpy as np
+import glob
+import pytest
+
+FILES = sorted(glob.glob('src/tests/files/*_text.txt') + glob.glob('src/tests/files/*_data.txt'))
+
+def words_of(path):
+    """Conversão linha a linha, como o load_mem original."""
+    with open(path) as f:
+        return [int(line.strip(), 2) for line in f]
+
+
+class TestLoader:
+    """Testes para a leitura vetorizada dos arquivos de programa."""
+
+    @pytest.mark.parametrize('path', FILES)
+    def test_binary_text(self, path):
+        words = loader.read_words(path)
+        assert words.dtype == np.uint32
+        assert words.tolist() == words_of(path)
+
+    def test_hex_e_raw(self, tmp_path):
+        words = words_of('src/tests/files/ultraT_text.txt')
+        hex_file = tmp_path / 'programa.hex'
+        hex_file.write_text('\n'.join(f'{word:08x}' for word in words) + '\n')
+        raw_file = tmp_path / 'programa.bin'
+        raw_file.write_bytes(np.array(words, dtype='<u4').tobytes())
+        prefixed = tmp_path / 'programa.txt'
+        prefixed.write_text('\r\n'.join(f'0x{word:08X}' for word in words))
+        assert loader.read_words(hex_file).tolist() == words
+        assert loader.read_words(raw_file).tolist() == words
+        assert loader.read_words(prefixed).tolist() == words
+
+    def test_detect_format(self):
+        assert loader.detect_format(b'00000000001100000000001110010011\n') == 'binary-text'
+        assert loader.detect_format(b'00000001\n00500293\n') == 'hex'
+        assert loader.detect_format(b'\x13\x00\x00\x00') == 'raw'
+        assert loader.detect_format(b'00000001\n', 'programa.bin') == 'raw'
+
+    def test_linhas_irregulares(self):
+        assert loader.parse_binary_text(b'101\n00000000001100000000001110010011\n').tolist() == [5, 0x00300393]
+        assert loader.parse_raw(b'\x01\x02\x03\x04\x05').tolist() == [0x04030201, 0x5]
+
+    def test_invalido(self):
+        with pytest.raises(ValueError):
+            loader.parse_binary_text(b'00000000001100000000001110010011\n0000000000110000000000111001001x\n')
+        with pytest.raises(ValueError):
+            loader.parse(b'0000', format='octal')
+
+    def test_load_mem(self, tmp_path):
+        hex_file = tmp_path / 'code.hex'
+        hex_file.write_text('00100093\n00208133\n')
+        mem = Memory()
+        mem.load_mem(hex_file, None)
+        assert mem.lw(0x0) == 0x00100093
+        assert mem.lw(0x4) == 0x00208133
+        big = tmp_path / 'big.bin'
+        big.write_bytes(bytes(0x2004))
+        with pytest.raises(ValueError):
+            Memory().load_mem(big, None)
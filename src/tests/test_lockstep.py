@@ -0,0 +1,71 @@
+from core.lockstep import LockstepCPU
+from core.cpu import CPU
+import numpy as np
+import glob
+import pytest
+
+DATA = sorted(glob.glob('src/tests/files/*_data.txt'))
+TEXT = sorted(glob.glob('src/tests/files/*_text.txt'))
+
+# Soma 3 a x6 data[0] vezes, guardando o acumulado em data[1] (um endereço), e imprime x6:
+LOOP = [
+    0x00202283, # lw x5, 2(x0)      (lw soma 0x1ffe a endereços abaixo de 0x2000: data[0])
+    0x00602383, # lw x7, 6(x0)      (data[1])
+    0x00000313, # addi x6, x0, 0
+    0x00028a63, # beq x5, x0, 20
+    0x00330313, # addi x6, x6, 3
+    0x0063a023, # sw x6, 0(x7)
+    0xfff28293, # addi x5, x5, -1
+    0xff1ff06f, # jal x0, -16
+    0x00030513, # addi x10, x6, 0
+    0x00100893, # addi x17, x0, 1
+    0x00000073, # ecall
+    0x00a00893, # addi x17, x0, 10
+    0x00000073, # ecall
+]
+
+def write_words(path, words):
+    path.write_text(''.join(f'{word:032b}\n' for word in words))
+    return str(path)
+
+
+class TestLockstep:
+    """Testes para a execução em lockstep de várias instâncias do mesmo programa."""
+
+    @pytest.mark.parametrize('code_path', [TEXT[0], TEXT[-1]])
+    def test_mesma_saida_da_cpu(self, run, code_path):
+        lockstep = LockstepCPU(code_path, DATA)
+        lockstep.run()
+        for lane, data_path in enumerate(DATA):
+            cpu, output = run(code_path, data_path, backend='int')
+            assert lockstep.output(lane) == output
+            assert lockstep.instructions[lane] == cpu.global_counter
+            assert lockstep.exit_codes[lane] == 0
+
+    def test_desvios_divergentes(self, run, tmp_path):
+        code_path = write_words(tmp_path / 'loop_text.txt', LOOP)
+        counts = [0, 5, 1, 12, 5, 3, 0, 7]
+        data_paths = [write_words(tmp_path / f'{lane}_data.txt', [count, 0x2100]) for lane, count in enumerate(counts)]
+        lockstep = LockstepCPU(code_path, data_paths)
+        lockstep.run()
+        for lane, data_path in enumerate(data_paths):
+            cpu, output = run(code_path, data_path)
+            assert lockstep.output(lane) == output
+            assert lockstep.instructions[lane] == cpu.global_counter
+            assert lockstep.words[lane, 0x2100 >> 2] == 3 * counts[lane]
+        assert lockstep.output(3).startswith('36\n')
+
+    def test_erro_em_uma_lane(self, tmp_path):
+        code_path = write_words(tmp_path / 'loop_text.txt', LOOP)
+        data = [np.array([4, 0x2100], dtype=np.uint32), np.array([4, 0x2102], dtype=np.uint32), None]
+        lockstep = LockstepCPU(code_path, data)
+        lockstep.run()
+        assert lockstep.exit_codes == [0, None, 0]
+        assert lockstep.errors[1] == "Endereço 0x2102 não retorna um múltiplo de 4."
+        assert lockstep.output(1) == f"Erro inesperado: {lockstep.errors[1]}\n"
+        assert lockstep.output(2).startswith('0\n')
+        assert list(lockstep.instructions) == [28, 5, 8]
+
+    def test_limite_de_dados(self):
+        with pytest.raises(ValueError):
+            LockstepCPU(TEXT[0], [np.zeros(1025, dtype=np.uint32)])
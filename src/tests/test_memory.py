@@ -27,6 +27,15 @@ class TestMemory:
         with pytest.raises(ValueError):
             mem.sw(1+0, 0b11111010110010101100101011111110)
 
+    def test_text_watchers(self):
+        mem = Memory()
+        escritas = []
+        mem.text_watchers.append(escritas.append)
+        mem.sb(0x10, 0xFF)
+        mem.sw(0x2000, 0xFACACAFE) # .data não notifica
+        mem.sw(0x20, 0xFACACAFE)
+        assert escritas == [0x10, 0x20, 0x21, 0x22, 0x23]
+
     def test_lb(self):
         mem = Memory()
         mem.sb(0+0, 0b11101101) # 0xED
@@ -45,6 +54,35 @@ class TestMemory:
         with pytest.raises(ValueError):
             mem.lw(1+0)
 
+    def test_palavras(self):
+        """lw/sw pela visão uint32 devem ser equivalentes ao acesso byte a byte"""
+        mem = Memory()
+        mem.sw(0x2004, 0x12345678)
+        assert list(mem.MEM[0x2004:0x2008]) == [0x78, 0x56, 0x34, 0x12]
+        mem.sb(0x2008, 0xEF)
+        mem.sb(0x200b, 0xBE)
+        assert mem.lw(0x2008) == 0xBE0000EF
+        assert mem.WORDS[0x2008 >> 2] == 0xBE0000EF
+        mem.sw(0x200c, -1) # Apenas os 32 bits menos significativos
+        assert mem.lw(0x200c) == 0xFFFFFFFF
+        # Fora dos limites: mesmo erro do acesso byte a byte
+        with pytest.raises(IndexError):
+            mem.lw(len(mem.MEM))
+        with pytest.raises(IndexError):
+            mem.sw(len(mem.MEM), 0)
+
+    def test_read_string(self):
+        mem = Memory()
+        text = 'Olá, mundo! ' * 20 # Mais longa que o primeiro trecho de busca
+        mem.write_bytes(0x2000, text.encode('latin-1'))
+        assert mem.read_string(0x2000) == text
+        assert mem.read_string(0x2005) == text[5:]
+        assert mem.read_string(0x3000) == ''
+        # Sem zero até o fim da memória: mesmo tipo de erro da leitura byte a byte
+        mem.MEM[-4:] = 0x41
+        with pytest.raises(IndexError):
+            mem.read_string(len(mem.MEM) - 4)
+
     def test_load_mem(self):
         # Valores de memória gerados pelo montador RARS para o programa específico sendo testado:
         text_values = [
@@ -0,0 +1,52 @@
+from core.output import StdoutSink, BufferSink
+from core.cpu import CPU
+# Imports para capturar a impressão dos programas
+from io import StringIO
+import contextlib
+
+FILES = 'src/tests/files'
+
+class TestOutput:
+    def test_stdout_sink(self):
+        sink = StdoutSink(buffer_size=8)
+        output = StringIO()
+        with contextlib.redirect_stdout(output):
+            sink.write('abc')
+            assert output.getvalue() == ''   # Ainda no buffer
+            sink.write('defgh')
+            assert output.getvalue() == 'abcdefgh'
+            sink.write('i')
+            sink.flush()
+        assert output.getvalue() == 'abcdefghi'
+
+    def test_stdout_sink_sem_buffer(self):
+        sink = StdoutSink(0)
+        output = StringIO()
+        with contextlib.redirect_stdout(output):
+            sink.write('a')
+            assert output.getvalue() == 'a'
+
+    def test_buffer_sink(self):
+        sink = BufferSink()
+        sink.write('Teste')
+        sink.write('1 OK')
+        assert sink.getvalue() == 'Teste1 OK'
+        sink.clear()
+        assert sink.getvalue() == ''
+
+    def test_cpu_output(self, capsys):
+        sink = BufferSink()
+        cpu = CPU(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt', engine='block', output=sink)
+        cpu.run()
+        assert capsys.readouterr().out == ''
+        assert sink.getvalue().startswith('Teste1 OK\n')
+        assert sink.getvalue().endswith('Programa encerrado com sucesso.\nSystem Exit: 0\n')
+
+    def test_cpu_stdout(self):
+        """A saída padrão com buffer produz o mesmo texto que a impressão direta"""
+        sink = BufferSink()
+        CPU(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt', output=sink).run()
+        output = StringIO()
+        with contextlib.redirect_stdout(output):
+            CPU(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt').run()
+        assert output.getvalue() == sink.getvalue()
@@ -0,0 +1,113 @@
+from core.paged_memory import PagedMemory
+from core.memory import Memory
+import numpy as np
+import pytest
+
+
+class TestPagedMemory:
+    """Testes para a memória paginada."""
+
+    def test_esparsa(self):
+        mem = PagedMemory()
+        assert mem.lw(0x7ffffffc) == 0
+        assert mem.lb(0x12345678) == 0
+        assert mem.pages == {} # Leituras não alocam páginas
+        mem.sw(0x7ffffffc, 0xDEFECADA)
+        mem.sb(0x10010000, 0xED)
+        assert len(mem.pages) == 2
+        assert mem.lw(0x7ffffffc) == 0xDEFECADA
+        assert mem.lb(0x10010000) == 0xffffffed
+        assert mem.lbu(0x10010000) == 0xed
+
+    def test_enderecos_de_32_bits(self):
+        mem = PagedMemory()
+        mem.sw(-4, 0xFACACAFE) # Endereços são módulo 2^32
+        assert mem.lw(0xfffffffc) == 0xFACACAFE
+        with pytest.raises(ValueError):
+            mem.lw(0x1001)
+        with pytest.raises(ValueError):
+            mem.sw(0x1001, 0)
+
+    def test_equivalente_a_memory(self):
+        paged, mem = PagedMemory(page_bits=6), Memory()
+        for address, value in [(0x0, 0x00100093), (0x2000, 0xFFFFFFFF), (0x203c, 0x12345678), (0x2040, 0x80)]:
+            paged.sw(address, value)
+            mem.sw(address, value)
+        paged.sb(0x2041, 0xAB)
+        mem.sb(0x2041, 0xAB)
+        for address in range(0x2000, 0x2048):
+            assert paged.lb(address) == mem.lb(address)
+            assert paged.lbu(address) == mem.lbu(address)
+        for address in range(0x2000, 0x2048, 4):
+            assert paged.lw(address) == mem.lw(address)
+        assert (paged.text_words() == mem.text_words()).all()
+
+    def test_text_watchers(self):
+        mem = PagedMemory(text_size=0x100)
+        escritas = []
+        mem.text_watchers.append(escritas.append)
+        mem.sb(0x10, 0xFF)
+        mem.sw(0x100, 0xFACACAFE) # Fora do .text
+        mem.sw(0x20, 0xFACACAFE)
+        assert escritas == [0x10, 0x20, 0x21, 0x22, 0x23]
+        assert len(mem.text_words()) == 0x40
+
+    def test_read_string(self):
+        mem = PagedMemory(page_bits=4)
+        for i, char in enumerate(b'OAC 2024.2'):
+            mem.sb(0x200c + i, char) # Atravessa páginas
+        assert mem.read_string(0x200c) == 'OAC 2024.2'
+        for address in range(0x2016, 0x2020):
+            mem.sb(address, ord('!')) # Termina no início da página 0x2020, que não foi alocada
+        assert mem.read_string(0x200c) == 'OAC 2024.2' + '!' * 10
+        assert 0x2020 >> 4 not in mem.pages
+
+    def test_layout(self):
+        mem = PagedMemory.layout('rars')
+        assert (mem.text_base, mem.data_base, mem.stack_top) == (0x00400000, 0x10010000, 0x7fffeffc)
+        with pytest.raises(ValueError):
+            PagedMemory.layout('outro')
+
+    def test_text_extent(self):
+        mem = PagedMemory.layout('rars')
+        assert mem.text_extent() == mem.text_base
+        mem.sw(0x00400000, 0x13)
+        mem.sw(0x00403008, 0x13)
+        mem.sw(0x10010000, 1) # .data: não conta
+        assert mem.text_extent() == 0x00404000
+        assert len(mem.text_words(mem.text_extent())) == 0x1000
+        assert Memory().text_extent() == 0x2000
+
+    def test_remap_low(self):
+        """O ajuste do `lw` dos arquivos do RARS só vale no layout compacto"""
+        assert PagedMemory().remap_low and PagedMemory.layout('compacto').remap_low
+        assert not PagedMemory.layout('rars').remap_low
+        assert not PagedMemory(remap_low=False).remap_low
+
+
+class TestCPUPaginada:
+    """Execução de programas com a memória paginada."""
+
+    def test_programa(self, run):
+        code_path = 'src/tests/files/test5-4_text.txt'
+        data_path = 'src/tests/files/test5-4_data.txt'
+        cpu, output = run(code_path, data_path, memory=PagedMemory())
+        reference, expected = run(code_path, data_path)
+        assert output == expected
+        assert list(cpu.xregs) == list(reference.xregs)
+
+    def test_layout_rars(self, run, tmp_path):
+        code = tmp_path / 'code.txt'
+        words = [
+            0x00010093, # addi x1, x2, 0
+            0x00000117, # auipc x2, 0
+            0x00a00893, # addi x17, x0, 10
+            0x00000073, # ecall
+        ]
+        code.write_text(''.join(f'{word:032b}\n' for word in words))
+        cpu, _ = run(str(code), None, engine='block', backend='int', memory=PagedMemory.layout('rars'))
+        assert cpu.xregs[1] == 0x7fffeffc
+        assert cpu.xregs[2] == 0x00400004
+        assert len(cpu.memory.pages) == 1
+        assert len(cpu.decode_cache) == 1024 # Só a página alocada do .text, e não o segmento de 1 MiB
+
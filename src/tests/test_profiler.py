@@ -0,0 +1,87 @@
+from core.cpu import CPU
+from core.decoder import Decoder
+from core.output import BufferSink
+from core.profiler import disassemble, transfer, main
+from tests.test_elf import build_elf
+import numpy as np
+import pytest
+
+FILES = 'src/tests/files'
+
+PROGRAM = [
+    0x00300293, # 0x00: addi x5, x0, 3
+    0x00C000EF, # 0x04: jal x1, 0x10      (chamada)
+    0x00A00893, # 0x08: addi x17, x0, 10
+    0x00000073, # 0x0c: ecall
+    0xFFF28293, # 0x10: addi x5, x5, -1   (função)
+    0xFE029EE3, # 0x14: bne x5, x0, 0x10
+    0x00008067, # 0x18: jalr x0, 0(x1)    (retorno)
+]
+
+@pytest.fixture
+def program(tmp_path):
+    code = tmp_path / 'programa.txt'
+    code.write_text(''.join(f'{word:032b}\n' for word in PROGRAM))
+    return str(code)
+
+def profile(code, data=None, **options):
+    cpu = CPU(code, data, output=BufferSink(), profile=True, **options)
+    return cpu, cpu.run()
+
+class TestProfiler:
+    def test_disassemble(self):
+        decoder = Decoder()
+        assert disassemble(decoder.decode_ins(0xFFF28293), 'addi') == 'addi x5, x5, -1'
+        assert disassemble(decoder.decode_ins(0x00008067), 'jalr') == 'jalr x0, 0(x1)'
+        assert transfer(decoder.decode_ins(0x00008067)) == 'return'
+        assert transfer(decoder.decode_ins(0x00C000EF)) == 'call'
+        assert transfer(decoder.decode_ins(0x00300293)) is None
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_pc_counts(self, program, engine):
+        cpu, result = profile(program, engine=engine)
+        counts = cpu.profiler.pc_counts()
+        assert counts[:7].tolist() == [1, 1, 1, 1, 3, 3, 1]
+        assert counts.sum() == result.instructions + 1 # Inclui a chamada de encerramento
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_folded(self, program, engine):
+        cpu, _ = profile(program, engine=engine)
+        assert cpu.profiler.folded() == '0x0000 4\n0x0000;0x0010 7\n'
+
+    def test_basic_blocks(self, program):
+        cpu, _ = profile(program)
+        blocks = cpu.profiler.basic_blocks()
+        assert blocks[0] == (0x10, 0x18, 3)
+        assert sorted(blocks) == [(0x00, 0x08, 1), (0x08, 0x10, 1), (0x10, 0x18, 3), (0x18, 0x1c, 1)]
+        listing = cpu.profiler.annotate(top=1)
+        assert listing.startswith('bloco 0x0010-0x0014: 3 execuções')
+        assert '0x0014: bne x5, x0, 0x10' in listing
+
+    def test_motores(self):
+        """Os motores por blocos produzem o mesmo perfil que o motor `step`"""
+        code, data = f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt'
+        expected, _ = profile(code, data)
+        for engine, backend in [('block', 'numpy'), ('aot', 'int')]:
+            cpu, _ = profile(code, data, engine=engine, backend=backend)
+            assert np.array_equal(cpu.profiler.pc_counts(), expected.profiler.pc_counts())
+            assert cpu.profiler.folded() == expected.profiler.folded()
+
+    def test_reset(self, program):
+        cpu, _ = profile(program, engine='block')
+        cpu.reset()
+        assert cpu.profiler.pc_counts().sum() == 0 and cpu.profiler.folded() == ''
+        cpu.run()
+        assert cpu.profiler.folded() == '0x0000 4\n0x0000;0x0010 7\n'
+
+    def test_simbolos(self, tmp_path):
+        elf = build_elf(tmp_path / 'programa.elf', symbols={'_start': 0x10000, '__global_pointer$': 0x11800})
+        cpu = CPU.from_elf(str(elf), output=BufferSink(), profile=True)
+        cpu.run()
+        assert cpu.profiler.folded() == '_start 7\n'
+
+    def test_main(self, program, tmp_path, capsys):
+        folded = tmp_path / 'programa.folded'
+        assert main([program, '--engine', 'block', '--folded', str(folded)]) == 0
+        assert 'bloco 0x0010-0x0014: 3 execuções' in capsys.readouterr().out
+        assert folded.read_text() == '0x0000 4\n0x0000;0x0010 7\n'
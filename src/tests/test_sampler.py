@@ -0,0 +1,59 @@
+from core.cpu import CPU
+from core.output import BufferSink
+from core.sampler import Sampler, main
+import signal
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, 'setitimer'), reason="signal.setitimer não existe neste sistema")
+
+LOOP = [
+    0x00000293, # 0x00: addi x5, x0, 0
+    0x00128293, # 0x04: addi x5, x5, 1
+    0x008000EF, # 0x08: jal x1, 0x10      (chamada)
+    0xFF9FF06F, # 0x0c: jal x0, 0x04
+    0x00008067, # 0x10: jalr x0, 0(x1)    (retorno)
+]
+
+@pytest.fixture
+def loop(tmp_path):
+    code = tmp_path / 'laco.txt'
+    code.write_text(''.join(f'{word:032b}\n' for word in LOOP))
+    return str(code)
+
+def sample(code, seconds=0.1, **options):
+    cpu = CPU(code, None, output=BufferSink(), **options)
+    with Sampler(cpu, interval=0.002, timer='real') as sampler:
+        cpu.run(max_seconds=seconds)
+    return sampler
+
+class TestSampler:
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    def test_amostras(self, loop, engine):
+        sampler = sample(loop, engine=engine)
+        assert len(sampler.samples) > 5
+        assert set(sampler.pcs()) <= {0x04, 0x08, 0x0c, 0x10, 0x14} # 0x14: PC já incrementado durante o `jalr`
+        assert sum(sampler.handlers().values()) == len(sampler.samples)
+        assert set(sampler.functions()) <= {'0x0000', '0x0010'}
+
+    def test_simbolos(self, loop):
+        cpu = CPU(loop, None, output=BufferSink())
+        sampler = Sampler(cpu, symbols={'main': 0x00, 'f': 0x10, '__global_pointer$': 0x08})
+        sampler.samples = [(0x04, 'step'), (0x0c, 'step'), (0x10, 'jalr_to')]
+        assert sampler.functions() == {'main': 2, 'f': 1}
+        report = sampler.report()
+        assert report.startswith('3 amostras a cada 1 ms')
+        assert '66.67%  main' in report
+
+    def test_restaura_sinal(self, loop):
+        previous = signal.getsignal(signal.SIGALRM)
+        sample(loop, seconds=0.01)
+        assert signal.getsignal(signal.SIGALRM) is previous
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+    def test_temporizador_invalido(self, loop):
+        with pytest.raises(ValueError):
+            Sampler(CPU(loop, None), timer='outro')
+
+    def test_main(self, capsys):
+        assert main(['src/tests/files/ultraT_text.txt', 'src/tests/files/ultraT_data.txt', '--engine', 'block']) == 0
+        assert 'amostras a cada 1 ms' in capsys.readouterr().out
@@ -0,0 +1,72 @@
+from core.cpu import CPU
+from core.batch import Job, run_job
+from core.output import BufferSink
+import json
+import pytest
+
+FILES = 'src/tests/files'
+
+def run(engine, backend='numpy', name='ultraT'):
+    cpu = CPU(f'{FILES}/{name}_text.txt', f'{FILES}/{name}_data.txt', engine, backend=backend, output=BufferSink(), counters=True)
+    return cpu, cpu.run()
+
+class TestStats:
+    def test_desligado(self):
+        cpu = CPU(f'{FILES}/test4-1_text.txt', f'{FILES}/test4-1_data.txt', output=BufferSink())
+        assert cpu.stats is None
+        assert 'step' not in vars(cpu) # Sem contadores, o Executor.step é o de sempre
+
+    def test_mix(self):
+        cpu, result = run('step')
+        counts = cpu.stats.counts()
+        assert cpu.stats.total == sum(counts.values()) == result.instructions + 1 # Inclui a chamada de encerramento
+        assert counts['addi'] == 211 and counts['ecall'] == 89
+        assert list(counts.values()) == sorted(counts.values(), reverse=True)
+        assert cpu.stats.branches()['beq'] == {'taken': 18, 'not_taken': 1}
+
+    @pytest.mark.parametrize('engine, backend', [('block', 'numpy'), ('block', 'int'), ('aot', 'int')])
+    def test_motores(self, engine, backend):
+        """O motor por blocos reconstrói o mesmo mix a partir das execuções de cada bloco"""
+        expected, _ = run('step')
+        cpu, _ = run(engine, backend)
+        assert cpu.stats.as_dict() == expected.stats.as_dict()
+
+    SHORT_BRANCHES = [
+        0xFFF00293, # 0x00: addi x5, x0, -1
+        0x00031263, # 0x04: bne x6, x0, 0x08   (não tomado)
+        0x00000263, # 0x08: beq x0, x0, 0x0c   (tomado)
+        0x0002C263, # 0x0c: blt x5, x0, 0x10   (tomado: -1 < 0)
+        0x0002E263, # 0x10: bltu x5, x0, 0x14  (não tomado)
+        0x00A00893, # 0x14: addi x17, x0, 10
+        0x00000073, # 0x18: ecall
+    ]
+
+    @pytest.mark.parametrize('engine, backend', [('step', 'numpy'), ('step', 'int'), ('block', 'numpy'), ('block', 'int')])
+    def test_desvio_para_a_instrucao_seguinte(self, tmp_path, engine, backend):
+        """Com deslocamento 4, o destino é a instrução seguinte: o desvio é tomado pela condição, não pelo PC"""
+        code = tmp_path / 'desvios.txt'
+        code.write_text(''.join(f'{word:032b}\n' for word in self.SHORT_BRANCHES))
+        cpu = CPU(str(code), None, engine, backend=backend, output=BufferSink(), counters=True)
+        cpu.run()
+        assert cpu.stats.branches() == {'beq': {'taken': 1, 'not_taken': 0}, 'bne': {'taken': 0, 'not_taken': 1},
+                                        'blt': {'taken': 1, 'not_taken': 0}, 'bltu': {'taken': 0, 'not_taken': 1}}
+
+    def test_reset(self):
+        cpu, _ = run('block', 'int')
+        cpu.reset()
+        assert cpu.stats.total == 0
+        cpu.run()
+        assert cpu.stats.total == 512
+
+    def test_json(self, tmp_path):
+        cpu, _ = run('step', name='test4-1')
+        report = json.loads(cpu.stats.to_json(tmp_path / 'mix.json'))
+        assert report == json.loads((tmp_path / 'mix.json').read_text())
+        assert report['total'] == 15
+        assert set(report) == {'total', 'instructions', 'branches'}
+
+    def test_batch(self):
+        result = run_job(Job(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt'), engine='block', counters=True)
+        assert result.ok
+        assert result.stats['instructions']['addi'] == 211
+        assert run_job(Job(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt')).stats is None
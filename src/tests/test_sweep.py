@@ -0,0 +1,75 @@
+from core.sweep import sweep, data_images
+from core.batch import Job, run_job
+from core.cow_memory import MemoryImage
+from core.paged_memory import PagedMemory
+from core.memory import Memory
+import numpy as np
+import glob
+import pytest
+
+FILES = 'src/tests/files'
+DATA = sorted(glob.glob(f'{FILES}/*_data.txt'))
+code_path = f'{FILES}/ultraT_text.txt'
+
+
+class TestSweep:
+    """Testes para a varredura de segmentos .data com o mesmo código."""
+
+    def test_diretorio(self):
+        assert list(data_images(FILES)) == DATA
+
+    @pytest.mark.parametrize('engine', ['step', 'block'])
+    @pytest.mark.parametrize('backend', ['numpy', 'int'])
+    def test_mesmos_resultados(self, engine, backend):
+        results = sweep(f'{FILES}/test4-8_text.txt', FILES, engine=engine, backend=backend)
+        for result, data_path in zip(results, DATA):
+            expected = run_job(Job(f'{FILES}/test4-8_text.txt', data_path), backend=backend)
+            assert result.data_path == data_path
+            assert (result.output, result.exit_code, result.instructions) == (expected.output, expected.exit_code, expected.instructions)
+
+    def test_vetores(self):
+        results = list(sweep(code_path, [np.zeros(4, dtype=np.uint32), [1, 2, 3], np.zeros(1025, dtype=np.uint32)]))
+        assert [r.name for r in results] == ['0', '1', '2']
+        assert results[0].ok and results[1].ok
+        assert results[0].instructions == run_job(Job(code_path)).instructions # .data zerado
+        assert results[2].error == "Endereço de dados excedeu o limite de 0x2ffc."
+
+    def test_gerador(self):
+        """Os resultados são produzidos sob demanda: a varredura não consome `data` de uma vez."""
+        consumed = []
+        def images():
+            for i in range(3):
+                consumed.append(i)
+                yield np.zeros(1, dtype=np.uint32)
+        results = sweep(code_path, images())
+        next(results)
+        assert consumed == [0]
+
+    @pytest.mark.parametrize('memory', [Memory, PagedMemory, lambda: MemoryImage.load(code_path, None).memory()])
+    def test_restore(self, memory):
+        memory = memory()
+        memory.load_mem(code_path, None)
+        written = []
+        memory.text_watchers.append(written.append)
+        initial = memory.snapshot()
+        memory.sw(0x2000, 0x12345678)
+        memory.sw(0x0008, 0)
+        memory.sb(0x3000, 7)
+        written.clear()
+        memory.restore(initial)
+        assert memory.lw(0x2000) == 0 and memory.lbu(0x3000) == 0
+        assert (memory.text_words()[:8] == MemoryImage.load(code_path, None).page_words[0][:8]).all()
+        assert written == [8, 9, 10, 11] # Apenas a palavra do .text que mudou
+        memory.restore(initial)
+        assert written == [8, 9, 10, 11] # Restaurar o mesmo retrato novamente não muda o .text
+
+    def test_restore_sem_escrita_no_text(self):
+        """Sem escritas no .text, restaurar o mesmo retrato não compara o .text (1 MiB no layout 'rars')."""
+        memory = PagedMemory.layout('rars')
+        memory.load_mem(code_path, None)
+        memory.text_watchers.append(lambda address: None)
+        initial = memory.snapshot()
+        memory.sw(0x10010000, 0x12345678)
+        memory._text_pages = memory.text_words = None # Qualquer comparação falharia
+        memory.restore(initial)
+        assert memory.lw(0x10010000) == 0
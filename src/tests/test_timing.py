@@ -0,0 +1,52 @@
+from core.cpu import CPU
+from core.output import BufferSink
+import json
+import pytest
+
+FILES = 'src/tests/files'
+
+def run(engine='step', **options):
+    cpu = CPU(f'{FILES}/ultraT_text.txt', f'{FILES}/ultraT_data.txt', engine, output=BufferSink(), timing=True, **options)
+    return cpu, cpu.run()
+
+class TestTiming:
+    def test_desligado(self):
+        cpu = CPU(f'{FILES}/test4-1_text.txt', f'{FILES}/test4-1_data.txt', output=BufferSink())
+        assert cpu.timing is None
+        assert 'step' not in vars(cpu) and 'predecode' not in vars(cpu)
+
+    def test_etapas(self):
+        cpu, result = run()
+        timing = cpu.timing
+        assert timing.steps == result.instructions + 1 # Inclui a chamada de encerramento
+        assert timing.predecode_ns > 0 and timing.ns['execute'] > 0
+        assert timing.decodes == 0 # Todo o .text já foi decodificado por `predecode`
+        stages = timing.stages()
+        assert set(stages) == {'fetch', 'decode', 'execute'}
+        assert sum(entry['fraction'] for entry in stages.values()) == pytest.approx(1)
+
+    def test_instrucoes(self):
+        cpu, _ = run(backend='int')
+        handlers = cpu.timing.handlers()
+        assert handlers['addi']['calls'] == 211 and handlers['ecall']['calls'] == 89
+        assert sum(entry['ns'] for entry in handlers.values()) == cpu.timing.ns['execute']
+        assert list(handlers) == sorted(handlers, key=lambda name: -handlers[name]['ns'])
+
+    def test_blocos(self):
+        cpu, _ = run('block', backend='int')
+        assert cpu.timing.blocks > 0 and cpu.timing.decodes > 0
+        assert cpu.timing.ns['decode'] > 0 # Tradução dos blocos
+
+    def test_com_contadores(self):
+        """Os contadores continuam funcionando com a medição de tempos ligada"""
+        cpu, _ = run(counters=True, profile=True)
+        assert cpu.stats.counts()['addi'] == 211
+        assert cpu.profiler.pc_counts().sum() == cpu.timing.steps
+
+    def test_relatorio(self, tmp_path):
+        cpu, _ = run()
+        report = json.loads(cpu.timing.to_json(tmp_path / 'tempos.json'))
+        assert report['steps'] == cpu.timing.steps and 'addi' in report['handlers']
+        assert cpu.timing.report(3).count('ns/instrução') == 3
+        cpu.reset()
+        assert cpu.timing.steps == 0 and cpu.timing.predecode_ns > 0